@@ -8,13 +8,14 @@ for pairwise Granger causality analysis.
 import os
 import json
 import time
+import heapq
 import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta, timezone
 from tqdm import tqdm
 
 from kalshi.client import KalshiClient
-from experiment5.data_collection import CACHE_PATH as EXP5_CACHE
+from kalshi.market_store import load_market_store
 
 # Fine-grained domain map for lead-lag analysis.
 # Splits "economics" into sub-domains so we can find cross-sub-domain causal links.
@@ -64,8 +65,6 @@ def extract_fine_domain(ticker: str) -> str:
 DATA_DIR = "data/exp1"
 RAW_DIR = os.path.join(DATA_DIR, "raw")
 
-EXP2_TARGETED_CACHE = "data/exp2/raw/targeted_markets.json"
-
 
 def load_all_markets(max_markets: int = None) -> list:
     """Load settled markets from experiment caches.
@@ -73,34 +72,17 @@ def load_all_markets(max_markets: int = None) -> list:
     Merges exp5 generic cache with exp2 targeted economics/finance cache
     to ensure cross-domain coverage for lead-lag analysis.
     """
-    seen_tickers = set()
     markets = []
 
-    # Load exp2 targeted markets first (economics, finance, politics)
-    if os.path.exists(EXP2_TARGETED_CACHE):
-        print(f"Loading targeted markets from exp2 cache ({EXP2_TARGETED_CACHE})...")
-        with open(EXP2_TARGETED_CACHE) as f:
-            targeted = json.load(f)
-        for m in targeted:
-            ticker = m.get("ticker", "")
-            if ticker and ticker not in seen_tickers:
-                seen_tickers.add(ticker)
-                markets.append(m)
-        print(f"  Loaded {len(markets)} targeted markets")
-
-    # Add exp5 generic markets (sports, weather, esports, etc.)
-    if os.path.exists(EXP5_CACHE):
-        print(f"Loading markets from exp5 cache ({EXP5_CACHE})...")
-        with open(EXP5_CACHE) as f:
-            generic = json.load(f)
-        added = 0
-        for m in generic:
-            ticker = m.get("ticker", "")
-            if ticker and ticker not in seen_tickers:
-                seen_tickers.add(ticker)
-                markets.append(m)
-                added += 1
-        print(f"  Added {added} generic markets (total: {len(markets)})")
+    # Exp2 targeted markets (economics, finance, politics) take precedence over
+    # exp5 generic markets (sports, weather, esports, etc.); the store keeps
+    # that source order and has already deduplicated by ticker.
+    store = load_market_store()
+    if store is not None:
+        print(f"Loading targeted + exp5 markets from the market store ({store.path})...")
+        markets = store.markets(sources=["exp2_targeted", "exp5_settled"])
+        n_targeted = len(store.tickers(sources="exp2_targeted"))
+        print(f"  Loaded {n_targeted} targeted + {len(markets) - n_targeted} generic markets")
 
     if not markets:
         # Fallback: fetch fresh from API
@@ -192,10 +174,74 @@ def prepare_market_metadata(markets: list, min_lifespan_hours: int = 24) -> pd.D
     return df
 
 
+def iter_concurrent_pairs(
+    df: pd.DataFrame,
+    min_overlap_hours: int = 48,
+    cross_domain_only: bool = True,
+):
+    """Lazily yield every pair of markets whose time windows overlap by at least min_overlap_hours.
+
+    Sweep line over markets in (open_time, row) order. Once B opens at or
+    after A, their overlap is min(close_A, close_B) - open_B, so B pairs with
+    exactly the earlier markets still open at open_B + min_overlap whenever
+    B itself lasts that long. Markets that no longer reach the current
+    threshold are dropped from the active set for good: a heap on close time
+    finds them, and the active buffer (preallocated, kept in sweep order) is
+    compacted once expired slots make up half of it. Each step still scans
+    every market active at its threshold before the same-event and
+    cross-domain filters (integer-code comparisons) run, so the sweep costs
+    O(n log n + m), where m is the number of pairs overlapping by
+    min_overlap_hours before filtering; the pairs yielded are a subset.
+
+    Pairs are (ticker_A, ticker_B) with A before B in df row order, yielded
+    in sweep order (deterministic for a given df).
+    """
+    tickers = df["ticker"].to_numpy()
+    event_codes = pd.factorize(df["event_ticker"], use_na_sentinel=False)[0]
+    domain_codes = pd.factorize(df["domain"], use_na_sentinel=False)[0]
+    opens = df["open_time"].to_numpy(dtype="datetime64[ns]")
+    closes = df["close_time"].to_numpy(dtype="datetime64[ns]")
+    min_overlap = np.timedelta64(min_overlap_hours, "h")
+
+    order = np.lexsort((np.arange(len(df)), opens))
+    # A market shorter than min_overlap can't overlap anything by that much
+    order = order[closes[order] - opens[order] >= min_overlap]
+
+    open_ns = opens.view(np.int64)
+    close_ns = closes.view(np.int64)
+    overlap_ns = int(min_overlap / np.timedelta64(1, "ns"))
+
+    active = np.empty(len(order), dtype=np.int64)
+    alive = np.zeros(len(df), dtype=bool)
+    n_active = n_expired = 0
+    expiry = []  # heap of (close_ns, row) over active markets
+    for j in order.tolist():
+        threshold = int(open_ns[j]) + overlap_ns
+        while expiry and expiry[0][0] < threshold:
+            alive[heapq.heappop(expiry)[1]] = False
+            n_expired += 1
+        if 2 * n_expired > n_active:
+            live = active[:n_active][alive[active[:n_active]]]
+            n_active, n_expired = len(live), 0
+            active[:n_active] = live
+
+        current = active[:n_active]
+        keep = alive[current] & (event_codes[current] != event_codes[j])
+        if cross_domain_only:
+            keep &= domain_codes[current] != domain_codes[j]
+        for i in current[keep]:
+            yield (tickers[i], tickers[j]) if i < j else (tickers[j], tickers[i])
+
+        active[n_active] = j
+        n_active += 1
+        alive[j] = True
+        heapq.heappush(expiry, (int(close_ns[j]), j))
+
+
 def find_concurrent_pairs(
     df: pd.DataFrame,
     min_overlap_hours: int = 48,
-    max_pairs: int = 50000,
+    max_pairs: int = None,
     cross_domain_only: bool = True,
 ) -> list[tuple[str, str]]:
     """Find all pairs of markets with overlapping time windows.
@@ -203,52 +249,21 @@ def find_concurrent_pairs(
     Args:
         df: Market metadata with open_time, close_time columns
         min_overlap_hours: Minimum overlap in hours to form a pair
-        max_pairs: Cap on total pairs to prevent explosion
+        max_pairs: Optional cap on total pairs; if the pair universe is
+            larger, the first max_pairs in sweep order are kept and the
+            number dropped is reported
         cross_domain_only: If True, only pair markets from different domains
 
     Returns:
         List of (ticker_A, ticker_B) tuples
     """
-    pairs = []
-    n = len(df)
-
-    # Pre-compute for speed
-    tickers = df["ticker"].values
-    event_tickers = df["event_ticker"].values
-    domains = df["domain"].values
-    opens = df["open_time"].values
-    closes = df["close_time"].values
-
-    min_overlap = np.timedelta64(min_overlap_hours, "h")
+    print(f"Finding concurrent pairs from {len(df)} markets (min overlap: {min_overlap_hours}h)...")
+    pairs = list(iter_concurrent_pairs(df, min_overlap_hours, cross_domain_only))
+    print(f"  Found {len(pairs)} concurrent pairs")
 
-    print(f"Finding concurrent pairs from {n} markets (min overlap: {min_overlap_hours}h)...")
-    checked = 0
-    for i in range(n):
-        for j in range(i + 1, n):
-            # Skip same-event pairs (trivially correlated)
-            if event_tickers[i] == event_tickers[j]:
-                continue
-
-            # Skip same-domain if cross_domain_only
-            if cross_domain_only and domains[i] == domains[j]:
-                continue
-
-            # Compute overlap
-            overlap_start = max(opens[i], opens[j])
-            overlap_end = min(closes[i], closes[j])
-            overlap = overlap_end - overlap_start
-
-            if overlap >= min_overlap:
-                pairs.append((tickers[i], tickers[j]))
-
-            checked += 1
-            if len(pairs) >= max_pairs:
-                break
-        if len(pairs) >= max_pairs:
-            print(f"  Hit max_pairs cap ({max_pairs})")
-            break
-
-    print(f"  Found {len(pairs)} concurrent pairs (checked {checked} combinations)")
+    if max_pairs is not None and len(pairs) > max_pairs:
+        print(f"  Hit max_pairs cap ({max_pairs}): dropping {len(pairs) - max_pairs} pairs")
+        pairs = pairs[:max_pairs]
     return pairs
 
 
@@ -256,10 +271,12 @@ def fetch_hourly_prices(
     client: KalshiClient,
     df: pd.DataFrame,
     max_markets: int = None,
+    max_concurrency: int = 8,
 ) -> dict[str, pd.Series]:
     """Fetch hourly candlestick data for all markets, return as {ticker: pd.Series}.
 
-    Reuses experiment2's candle fetching and caching infrastructure.
+    Reuses experiment2's candle fetching and caching infrastructure. Uncached
+    markets are prefetched with up to max_concurrency requests in flight.
     """
     cache_path = os.path.join(DATA_DIR, "hourly_prices.json")
     if os.path.exists(cache_path):
@@ -276,9 +293,14 @@ def fetch_hourly_prices(
         print(f"  Loaded prices for {len(result)} markets")
         return result
 
-    from experiment2.data_collection import fetch_candles_for_market, extract_candle_price
+    from experiment2.data_collection import (
+        fetch_candles_for_market, extract_candle_price, prefetch_candles,
+    )
 
     markets_to_fetch = df if max_markets is None else df.head(max_markets)
+    if max_concurrency > 1:
+        prefetch_candles(client, markets_to_fetch, period_interval=60,
+                         max_concurrency=max_concurrency)
     result = {}
     raw_for_cache = {}
 
@@ -8,25 +8,36 @@ Methodology notes:
 - Series are differenced (returns) before Granger testing to ensure stationarity.
   Raw price levels are non-stationary and produce spurious Granger results.
 - ADF test is used as a sanity check; if differenced series is still non-stationary,
-  the pair is skipped.
+  the pair is skipped. The differencing order is memoized per (ticker, window) by
+  StationarityCache, so a ticker in many pairs is ADF-tested once per distinct
+  aligned window rather than once per pair.
 - F-stat overflow guards are in experiment2/validation.py.
+- With n_workers > 1 the pairs are sharded across a process pool that reads
+  prices from one shared-memory block; rows are merged in pair order, so the
+  output matches the single-process run.
 """
 
 import os
+import time
+import multiprocessing
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing.shared_memory import SharedMemory
+
 import numpy as np
 import pandas as pd
 from tqdm import tqdm
 from statsmodels.tsa.stattools import adfuller
 
-from experiment2.validation import granger_causality_test
+from experiment2.validation import granger_causality_batch, granger_causality_pair
 
 DATA_DIR = "data/exp1"
 
 
-def _ensure_stationary(series: pd.Series, max_diffs: int = 2) -> pd.Series | None:
-    """Difference series until stationary (ADF p < 0.05). Returns None if can't achieve it."""
+def _stationary_order(series: pd.Series, max_diffs: int = 2) -> int | None:
+    """Number of differences until stationary (ADF p < 0.05). Returns None if can't achieve it."""
     s = series.dropna()
-    for _ in range(max_diffs + 1):
+    for d in range(max_diffs + 1):
         if len(s) < 30:
             return None
         try:
@@ -34,17 +45,107 @@ def _ensure_stationary(series: pd.Series, max_diffs: int = 2) -> pd.Series | Non
         except Exception:
             return None
         if adf_p < 0.05:
-            return s
+            return d
         s = s.diff().dropna()
     return None
 
 
+def _difference(series: pd.Series, order: int) -> pd.Series:
+    s = series.dropna()
+    for _ in range(order):
+        s = s.diff().dropna()
+    return s
+
+
+def _ensure_stationary(series: pd.Series, max_diffs: int = 2) -> pd.Series | None:
+    """Difference series until stationary (ADF p < 0.05). Returns None if can't achieve it."""
+    order = _stationary_order(series, max_diffs)
+    return None if order is None else _difference(series, order)
+
+
+class StationarityCache:
+    """Differencing orders for the tickers in hourly_prices, memoized.
+
+    Arguments:
+        hourly_prices: {ticker: pd.Series} the windows are drawn from
+        mode: "window" (default) keys the order by ticker and the exact aligned
+            window (its timestamps), so results match calling
+            _ensure_stationary on every pair. "global" ADF-tests each ticker
+            once on its full series and applies that order to every window
+            the ticker appears in.
+        max_diffs: Maximum number of differences before giving up
+    """
+
+    def __init__(self, hourly_prices: dict[str, pd.Series], mode: str = "window", max_diffs: int = 2):
+        if mode not in ("window", "global"):
+            raise ValueError(f"Unknown stationarity mode {mode!r}; expected 'window' or 'global'")
+        self.hourly_prices = hourly_prices
+        self.mode = mode
+        self.max_diffs = max_diffs
+        self._orders: dict = {}
+        self.hits = 0
+        self.misses = 0
+
+    def precompute(self, tickers) -> None:
+        """Global mode: difference and ADF-test each ticker once up front."""
+        if self.mode != "global":
+            return
+        for ticker in tqdm(sorted(set(tickers) & self.hourly_prices.keys()), desc="Stationarity"):
+            self._order(ticker, self.hourly_prices[ticker])
+
+    def _order(self, key, series: pd.Series) -> int | None:
+        if key in self._orders:
+            self.hits += 1
+        else:
+            self._orders[key] = _stationary_order(series, self.max_diffs)
+            self.misses += 1
+        return self._orders[key]
+
+    def order(self, ticker: str, series: pd.Series) -> int | None:
+        """Differencing order for series (ticker's prices on an aligned window), or None."""
+        if self.mode == "global":
+            return self._order(ticker, self.hourly_prices[ticker])
+        key = (ticker, len(series), hash(series.index.asi8.tobytes()))
+        return self._order(key, series)
+
+    def stationary(self, ticker: str, series: pd.Series) -> pd.Series | None:
+        """series (ticker's prices on an aligned window) differenced to stationarity, or None."""
+        order = self.order(ticker, series)
+        return None if order is None else _difference(series, order)
+
+
+def _align_pair(series_a: pd.Series, series_b: pd.Series) -> tuple[pd.DatetimeIndex, np.ndarray, np.ndarray]:
+    """Common non-NaN timestamps of two series and their values there.
+
+    Same rows as pd.concat([a, b], axis=1).dropna(); sorted unique indexes (the
+    hourly candle series) are intersected with numpy instead.
+    """
+    series_a = series_a.dropna()
+    series_b = series_b.dropna()
+    index_a, index_b = series_a.index, series_b.index
+    if not (index_a.is_monotonic_increasing and index_a.is_unique
+            and index_b.is_monotonic_increasing and index_b.is_unique):
+        combined = pd.concat([series_a.rename("a"), series_b.rename("b")], axis=1).dropna()
+        return combined.index, combined["a"].to_numpy(), combined["b"].to_numpy()
+    _, pos_a, pos_b = np.intersect1d(index_a.asi8, index_b.asi8, assume_unique=True, return_indices=True)
+    return index_a[pos_a], series_a.to_numpy()[pos_a], series_b.to_numpy()[pos_b]
+
+
+_RESULT_COLUMNS = [
+    "leader_ticker", "follower_ticker", "leader_domain", "follower_domain",
+    "leader_title", "follower_title", "best_lag", "f_stat", "p_value", "n_obs",
+]
+
+
 def run_pairwise_granger(
     hourly_prices: dict[str, pd.Series],
     pairs: list[tuple[str, str]],
     market_df: pd.DataFrame,
     max_lag: int = 24,
     min_overlap: int = 48,
+    stationarity: str = "window",
+    batched: bool = False,
+    n_workers: int = 1,
 ) -> pd.DataFrame:
     """Run Granger causality test for each pair in BOTH directions.
 
@@ -58,6 +159,13 @@ def run_pairwise_granger(
         market_df: Market metadata for domain lookup
         max_lag: Maximum lag in hours to test
         min_overlap: Minimum overlapping observations
+        stationarity: Differencing-order memoization mode, "window" (exact) or
+            "global" (one order per ticker); see StationarityCache
+        batched: Group pairs by stationary window length and test each group
+            with granger_causality_batch instead of one pair at a time
+        n_workers: Worker processes; above 1, pairs are sharded across a
+            process pool reading prices from shared memory. Output is the
+            same as the single-process run with the same batched setting.
 
     Returns:
         DataFrame with leader_ticker, follower_ticker, best_lag, f_stat, p_value, etc.
@@ -66,10 +174,40 @@ def run_pairwise_granger(
     domain_lookup = dict(zip(market_df["ticker"], market_df["domain"]))
     title_lookup = dict(zip(market_df["ticker"], market_df["title"]))
 
+    stationary = StationarityCache(hourly_prices, mode=stationarity)
+    stationary.precompute(t for pair in pairs for t in pair)
+
+    if n_workers > 1:
+        results, skipped = _granger_parallel(
+            hourly_prices, pairs, domain_lookup, title_lookup, stationary,
+            max_lag=max_lag, min_overlap=min_overlap, batched=batched, n_workers=n_workers,
+        )
+    else:
+        run = _granger_rows_batched if batched else _granger_rows
+        results, skipped = run(
+            hourly_prices, pairs, domain_lookup, title_lookup, stationary, max_lag=max_lag, min_overlap=min_overlap,
+        )
+
+    print(f"  Completed {len(results)} directional tests (skipped {skipped} pairs)")
+    print(f"  Stationarity ({stationarity}): {stationary.misses} ADF series, {stationary.hits} cache hits")
+    return results
+
+
+def _granger_rows(
+    hourly_prices: Mapping[str, pd.Series],
+    pairs: list[tuple[str, str]],
+    domain_lookup: dict,
+    title_lookup: dict,
+    stationary: StationarityCache,
+    max_lag: int = 24,
+    min_overlap: int = 48,
+    progress: bool = True,
+) -> tuple[pd.DataFrame, int]:
+    """One granger_causality_pair per pair. Returns (results, skipped pairs)."""
     results = []
     skipped = 0
 
-    for ticker_a, ticker_b in tqdm(pairs, desc="Granger tests"):
+    for ticker_a, ticker_b in tqdm(pairs, desc="Granger tests", disable=not progress):
         if ticker_a not in hourly_prices or ticker_b not in hourly_prices:
             skipped += 1
             continue
@@ -84,8 +222,8 @@ def run_pairwise_granger(
             continue
 
         # Difference to ensure stationarity (critical for valid Granger causality)
-        a_stat = _ensure_stationary(combined["a"])
-        b_stat = _ensure_stationary(combined["b"])
+        a_stat = stationary.stationary(ticker_a, combined["a"])
+        b_stat = stationary.stationary(ticker_b, combined["b"])
         if a_stat is None or b_stat is None:
             skipped += 1
             continue
@@ -96,8 +234,8 @@ def run_pairwise_granger(
             skipped += 1
             continue
 
-        # Test A -> B
-        result_ab = granger_causality_test(stat_combined["a"], stat_combined["b"], max_lag=max_lag)
+        # Test A -> B and B -> A (one shared unrestricted fit)
+        result_ab, result_ba = granger_causality_pair(stat_combined["a"], stat_combined["b"], max_lag=max_lag)
         if result_ab["best_lag"] is not None:
             results.append({
                 "leader_ticker": ticker_a,
@@ -112,8 +250,6 @@ def run_pairwise_granger(
                 "n_obs": result_ab["n_obs"],
             })
 
-        # Test B -> A
-        result_ba = granger_causality_test(stat_combined["b"], stat_combined["a"], max_lag=max_lag)
         if result_ba["best_lag"] is not None:
             results.append({
                 "leader_ticker": ticker_b,
@@ -128,8 +264,289 @@ def run_pairwise_granger(
                 "n_obs": result_ba["n_obs"],
             })
 
-    print(f"  Completed {len(results)} directional tests (skipped {skipped} pairs)")
-    return pd.DataFrame(results)
+    return pd.DataFrame(results, columns=_RESULT_COLUMNS), skipped
+
+
+def _granger_rows_batched(
+    hourly_prices: Mapping[str, pd.Series],
+    pairs: list[tuple[str, str]],
+    domain_lookup: dict,
+    title_lookup: dict,
+    stationary: StationarityCache,
+    max_lag: int = 24,
+    min_overlap: int = 48,
+    progress: bool = True,
+) -> tuple[pd.DataFrame, int]:
+    """_granger_rows with the Granger fits batched across pairs.
+
+    Pairs are aligned and differenced as in the serial loop, then grouped by
+    stationary window length; each group is one granger_causality_batch
+    call over stacked (pairs, n) arrays. Rows come back in the serial order
+    (pair order, A -> B before B -> A) with lags picked by the serial rule;
+    see granger_causality_batch for where the numbers can differ.
+    """
+    skipped = 0
+    windows: dict[int, list[tuple[int, np.ndarray, np.ndarray]]] = {}
+    for position, (ticker_a, ticker_b) in enumerate(tqdm(pairs, desc="Aligning pairs", disable=not progress)):
+        if ticker_a not in hourly_prices or ticker_b not in hourly_prices:
+            skipped += 1
+            continue
+
+        index, a_vals, b_vals = _align_pair(hourly_prices[ticker_a], hourly_prices[ticker_b])
+        if len(index) < min_overlap:
+            skipped += 1
+            continue
+
+        order_a = stationary.order(ticker_a, pd.Series(a_vals, index=index))
+        order_b = stationary.order(ticker_b, pd.Series(b_vals, index=index))
+        if order_a is None or order_b is None:
+            skipped += 1
+            continue
+
+        # Differencing drops leading rows; keep the rows both series still have
+        order = max(order_a, order_b)
+        a_stat = np.diff(a_vals, order_a)[order - order_a:]
+        b_stat = np.diff(b_vals, order_b)[order - order_b:]
+        if len(a_stat) < min_overlap:
+            skipped += 1
+            continue
+        windows.setdefault(len(a_stat), []).append((position, a_stat, b_stat))
+
+    parts = []
+    for _, group in tqdm(sorted(windows.items()), desc="Granger batches", disable=not progress):
+        positions = np.array([position for position, _, _ in group])
+        tables = granger_causality_batch(
+            np.stack([a for _, a, _ in group]), np.stack([b for _, _, b in group]), max_lag=max_lag,
+        )
+        for direction, table in enumerate(tables):
+            found = table["best_lag"].notna().to_numpy()
+            parts.append(pd.DataFrame({
+                "order": positions[found] * 2 + direction,
+                "best_lag": table["best_lag"][found].astype("int64"),
+                "f_stat": table["f_stat"][found],
+                "p_value": table["p_value"][found],
+                "n_obs": table["n_obs"][found],
+            }))
+
+    found = pd.concat(parts, ignore_index=True).sort_values("order") if parts else pd.DataFrame()
+    if found.empty:
+        return pd.DataFrame(columns=_RESULT_COLUMNS), skipped
+
+    # direction 0 is A -> B (A leads), direction 1 is B -> A
+    pair_array = np.array(pairs, dtype=object).reshape(-1, 2)
+    position, direction = np.divmod(found["order"].to_numpy(), 2)
+    leaders = pair_array[position, direction]
+    followers = pair_array[position, 1 - direction]
+    return pd.DataFrame({
+        "leader_ticker": leaders,
+        "follower_ticker": followers,
+        "leader_domain": [domain_lookup.get(t, "unknown") for t in leaders],
+        "follower_domain": [domain_lookup.get(t, "unknown") for t in followers],
+        "leader_title": [title_lookup.get(t, "") for t in leaders],
+        "follower_title": [title_lookup.get(t, "") for t in followers],
+        "best_lag": found["best_lag"].to_numpy(),
+        "f_stat": found["f_stat"].to_numpy(),
+        "p_value": found["p_value"].to_numpy(),
+        "n_obs": found["n_obs"].to_numpy(),
+    }, columns=_RESULT_COLUMNS), skipped
+
+
+class _SharedPrices(Mapping):
+    """Read-only {ticker: pd.Series} view of prices packed by _pack_prices.
+
+    Series are rebuilt from the shared timestamp/value slices on first access
+    and kept for the life of the worker.
+    """
+
+    def __init__(self, block: SharedMemory, layout: dict):
+        offsets = layout["offsets"]
+        total = int(offsets[-1])
+        self._ts = np.ndarray(total, dtype=np.int64, buffer=block.buf)
+        self._values = np.ndarray(total, dtype=np.float64, buffer=block.buf, offset=8 * total)
+        self._offsets = offsets
+        self._positions = {ticker: i for i, ticker in enumerate(layout["tickers"])}
+        self._index_dtype = layout["index_dtype"]
+        self._series: dict[str, pd.Series] = {}
+
+    def __getitem__(self, ticker: str) -> pd.Series:
+        if ticker not in self._series:
+            i = self._positions[ticker]
+            start, end = self._offsets[i], self._offsets[i + 1]
+            dtype = self._index_dtype
+            index = pd.DatetimeIndex(self._ts[start:end].view(f"datetime64[{dtype.unit}]"))
+            if getattr(dtype, "tz", None) is not None:
+                index = index.tz_localize("UTC").tz_convert(dtype.tz)
+            self._series[ticker] = pd.Series(self._values[start:end].copy(), index=index, name=ticker)
+        return self._series[ticker]
+
+    def __contains__(self, ticker) -> bool:
+        return ticker in self._positions
+
+    def __iter__(self):
+        return iter(self._positions)
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+
+def _pack_prices(hourly_prices: dict[str, pd.Series], tickers: list[str]) -> tuple[SharedMemory, dict]:
+    """Copy tickers' non-NaN prices into one shared-memory block.
+
+    Ragged layout, as in kalshi.price_cube: all int64 timestamps, then all
+    float64 values, ticker i occupying offsets[i]:offsets[i + 1] of each.
+
+    Returns:
+        (block, layout): the block (caller closes and unlinks it) and the small
+        picklable description workers attach with
+    """
+    series = [hourly_prices[ticker].dropna() for ticker in tickers]
+    index_dtypes = {s.index.dtype for s in series}
+    if len(index_dtypes) > 1:
+        raise ValueError(f"hourly_prices indexes must share one dtype to be packed, got {index_dtypes}")
+
+    offsets = np.zeros(len(series) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(s) for s in series])
+    total = int(offsets[-1])
+    block = SharedMemory(create=True, size=max(16 * total, 1))
+    ts = np.ndarray(total, dtype=np.int64, buffer=block.buf)
+    values = np.ndarray(total, dtype=np.float64, buffer=block.buf, offset=8 * total)
+    for s, start, end in zip(series, offsets[:-1], offsets[1:]):
+        ts[start:end] = s.index.asi8
+        values[start:end] = s.to_numpy(dtype=float)
+    del ts, values  # release the buffer exports so the block can be closed
+
+    layout = {
+        "name": block.name,
+        "tickers": tickers,
+        "offsets": offsets,
+        "index_dtype": index_dtypes.pop() if index_dtypes else None,
+    }
+    return block, layout
+
+
+# Per-process state set by _init_granger_worker
+_worker: dict = {}
+
+
+def _init_granger_worker(
+    layout: dict,
+    domain_lookup: dict,
+    title_lookup: dict,
+    stationarity: str,
+    global_orders: dict,
+    max_lag: int,
+    min_overlap: int,
+    batched: bool,
+) -> None:
+    block = SharedMemory(name=layout["name"], track=False)
+    prices = _SharedPrices(block, layout)
+    stationary = StationarityCache(prices, mode=stationarity)
+    # Global orders were computed once in the parent; window orders are per worker
+    stationary._orders.update(global_orders)
+    _worker.update(
+        block=block, prices=prices, domain_lookup=domain_lookup, title_lookup=title_lookup,
+        stationary=stationary, max_lag=max_lag, min_overlap=min_overlap,
+        run=_granger_rows_batched if batched else _granger_rows,
+    )
+
+
+def _granger_shard(shard: int, pairs: list[tuple[str, str]]) -> dict:
+    """Test one shard of pairs in a worker; returns its rows and counters."""
+    stationary = _worker["stationary"]
+    hits, misses = stationary.hits, stationary.misses
+    start = time.perf_counter()
+    results, skipped = _worker["run"](
+        _worker["prices"], pairs, _worker["domain_lookup"], _worker["title_lookup"], stationary,
+        max_lag=_worker["max_lag"], min_overlap=_worker["min_overlap"], progress=False,
+    )
+    return {
+        "shard": shard,
+        "results": results,
+        "skipped": skipped,
+        "hits": stationary.hits - hits,
+        "misses": stationary.misses - misses,
+        "pairs": len(pairs),
+        "seconds": time.perf_counter() - start,
+        "pid": os.getpid(),
+    }
+
+
+def _granger_parallel(
+    hourly_prices: dict[str, pd.Series],
+    pairs: list[tuple[str, str]],
+    domain_lookup: dict,
+    title_lookup: dict,
+    stationary: StationarityCache,
+    max_lag: int = 24,
+    min_overlap: int = 48,
+    batched: bool = False,
+    n_workers: int = 2,
+    shards_per_worker: int | None = None,
+) -> tuple[pd.DataFrame, int]:
+    """_granger_rows (or _granger_rows_batched) sharded across a process pool.
+
+    Prices for the tickers in pairs go into shared memory once instead of being
+    pickled to each worker. Pairs are split into contiguous shards, and shard
+    results are concatenated in shard order, so rows come back in the same
+    order as the single-process run whatever order the shards finish in.
+    Worker stationarity hits and misses are added to stationary's counters.
+    Batched runs default to fewer, larger shards so each batch stays wide.
+    """
+    if shards_per_worker is None:
+        shards_per_worker = 2 if batched else 8
+    tickers = sorted({t for pair in pairs for t in pair} & hourly_prices.keys())
+    shard_size = max(1, -(-len(pairs) // (n_workers * shards_per_worker)))
+    shards = [pairs[i:i + shard_size] for i in range(0, len(pairs), shard_size)]
+    global_orders = stationary._orders if stationary.mode == "global" else {}
+
+    block, layout = _pack_prices(hourly_prices, tickers)
+    done: dict[int, dict] = {}
+    start = time.perf_counter()
+    try:
+        # forkserver: forking this (BLAS-threaded) process directly can deadlock.
+        # Preloading this module lets workers skip the scipy/statsmodels imports.
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload([__name__])
+        with ProcessPoolExecutor(
+            max_workers=n_workers,
+            mp_context=context,
+            initializer=_init_granger_worker,
+            initargs=(
+                layout,
+                {t: domain_lookup[t] for t in tickers if t in domain_lookup},
+                {t: title_lookup[t] for t in tickers if t in title_lookup},
+                stationary.mode, global_orders, max_lag, min_overlap, batched,
+            ),
+        ) as pool:
+            futures = [pool.submit(_granger_shard, i, shard) for i, shard in enumerate(shards)]
+            with tqdm(total=len(pairs), desc=f"Granger tests ({n_workers} workers)") as bar:
+                for future in as_completed(futures):
+                    shard = future.result()
+                    done[shard["shard"]] = shard
+                    bar.update(shard["pairs"])
+    finally:
+        block.close()
+        block.unlink()
+    elapsed = time.perf_counter() - start
+
+    ordered = [done[i] for i in range(len(shards))]
+    for shard in ordered:
+        stationary.hits += shard["hits"]
+        stationary.misses += shard["misses"]
+
+    by_worker: dict[int, list[float]] = {}
+    for shard in ordered:
+        pairs_done, seconds = by_worker.setdefault(shard["pid"], [0, 0.0])
+        by_worker[shard["pid"]] = [pairs_done + shard["pairs"], seconds + shard["seconds"]]
+    print(f"  {len(pairs)} pairs in {elapsed:.1f}s across {n_workers} workers "
+          f"({len(pairs) / max(elapsed, 1e-9):.0f} pairs/s)")
+    for pid, (pairs_done, seconds) in sorted(by_worker.items()):
+        print(f"    worker {pid}: {pairs_done} pairs, {seconds:.1f}s busy "
+              f"({pairs_done / max(seconds, 1e-9):.0f} pairs/s)")
+
+    frames = [shard["results"] for shard in ordered if not shard["results"].empty]
+    results = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=_RESULT_COLUMNS)
+    return results, sum(shard["skipped"] for shard in ordered)
 
 
 def apply_bonferroni_correction(
@@ -179,13 +596,19 @@ def run_granger_stage(
     market_df: pd.DataFrame,
     max_lag: int = 24,
     alpha: float = 0.01,
+    stationarity: str = "window",
+    batched: bool = False,
+    n_workers: int = 1,
 ) -> tuple[pd.DataFrame, pd.DataFrame]:
     """Full Stage 1 pipeline: Granger + Bonferroni.
 
     Returns:
         (all_results, significant_results)
     """
-    all_results = run_pairwise_granger(hourly_prices, pairs, market_df, max_lag=max_lag)
+    all_results = run_pairwise_granger(
+        hourly_prices, pairs, market_df, max_lag=max_lag, stationarity=stationarity, batched=batched,
+        n_workers=n_workers,
+    )
 
     # Save all results
     os.makedirs(DATA_DIR, exist_ok=True)
@@ -12,6 +12,8 @@ import numpy as np
 import pandas as pd
 from scipy import stats as scipy_stats
 
+from kalshi.resampling import permutation_test
+
 DATA_DIR = "data/exp1"
 
 # Indicator-level classification: more granular than domain
@@ -1176,17 +1178,18 @@ def _analyze_by_lag_percentile(sig_df: pd.DataFrame) -> dict:
     }
 
 
-def run_permutation_test(sig_df: pd.DataFrame, n_perms: int = 1000) -> dict:
+def run_permutation_test(sig_df: pd.DataFrame, n_perms: int = 1000, alpha: float = None) -> dict:
     """Permutation test: shuffle domain labels to establish null distribution.
 
     Tests whether the observed cross-domain pair count and asymmetry
     could arise by chance if domain labels were randomly assigned.
+    Domains are integer-coded per ticker and each block of permutations is
+    scored with array comparisons over the pair rows; with alpha set, the
+    test stops once both p-values are resolved relative to it.
 
     Also identifies and flags bidirectional Granger pairs (A→B AND B→A),
     which indicate co-movement rather than directional information flow.
     """
-    rng = np.random.default_rng(42)
-
     # Observed cross-domain pair counts
     cross_domain = sig_df[sig_df["leader_domain"] != sig_df["follower_domain"]]
     n_cross_observed = len(cross_domain)
@@ -1207,32 +1210,33 @@ def run_permutation_test(sig_df: pd.DataFrame, n_perms: int = 1000) -> dict:
 
     domain_labels = [ticker_domains[t] for t in all_tickers]
 
-    null_cross_counts = []
-    null_asymmetries = []
-
-    for _ in range(n_perms):
-        shuffled = rng.permutation(domain_labels)
-        shuffled_map = dict(zip(all_tickers, shuffled))
-
-        perm_df = sig_df.copy()
-        perm_df["leader_domain"] = perm_df["leader_ticker"].map(shuffled_map)
-        perm_df["follower_domain"] = perm_df["follower_ticker"].map(shuffled_map)
-
-        n_cross = len(perm_df[perm_df["leader_domain"] != perm_df["follower_domain"]])
-        null_cross_counts.append(n_cross)
-
-        perm_inf_mp = len(perm_df[(perm_df["leader_domain"] == "inflation") &
-                                   (perm_df["follower_domain"] == "monetary_policy")])
-        perm_mp_inf = len(perm_df[(perm_df["leader_domain"] == "monetary_policy") &
-                                   (perm_df["follower_domain"] == "inflation")])
-        null_asymmetries.append(perm_inf_mp - perm_mp_inf)
-
-    null_cross_counts = np.array(null_cross_counts)
-    null_asymmetries = np.array(null_asymmetries)
+    # Integer-coded domains; a permutation gives ticker j the domain of ticker perms[:, j]
+    domain_codes, domains = pd.factorize(pd.Series(domain_labels))
+    code_of = {d: i for i, d in enumerate(domains)}
+    inf_code = code_of.get("inflation", -1)
+    mp_code = code_of.get("monetary_policy", -1)
+    ticker_pos = {t: i for i, t in enumerate(all_tickers)}
+    leader_pos = sig_df["leader_ticker"].map(ticker_pos).to_numpy()
+    follower_pos = sig_df["follower_ticker"].map(ticker_pos).to_numpy()
+
+    def _null_stats(perms):
+        shuffled = domain_codes[perms]
+        leader = shuffled[:, leader_pos]
+        follower = shuffled[:, follower_pos]
+        n_cross = (leader != follower).sum(axis=1)
+        perm_inf_mp = ((leader == inf_code) & (follower == mp_code)).sum(axis=1)
+        perm_mp_inf = ((leader == mp_code) & (follower == inf_code)).sum(axis=1)
+        return np.column_stack([n_cross, perm_inf_mp - perm_mp_inf])
+
+    perm = permutation_test(
+        _null_stats, len(all_tickers), n_perm=n_perms, seed=42,
+        alternative=["greater", "two-sided"], alpha=alpha,
+    )
+    null_cross_counts = perm["null"][:, 0]
+    null_asymmetries = perm["null"][:, 1]
 
     # p-values
-    cross_p = float((null_cross_counts >= n_cross_observed).mean())
-    asym_p = float((np.abs(null_asymmetries) >= abs(observed_asymmetry)).mean())
+    cross_p, asym_p = (float(p) for p in perm["p_value"])
 
     # Bidirectional pair analysis
     pair_set = set()
@@ -1271,7 +1275,7 @@ def run_permutation_test(sig_df: pd.DataFrame, n_perms: int = 1000) -> dict:
 
     return {
         "permutation_test": {
-            "n_permutations": n_perms,
+            "n_permutations": perm["n_permutations"],
             "observed_cross_domain_pairs": n_cross_observed,
             "null_cross_domain_mean": float(null_cross_counts.mean()),
             "null_cross_domain_std": float(null_cross_counts.std()),
@@ -49,7 +49,7 @@ def phase1_data_collection(quick_test: bool = False, max_markets: int = None):
     pairs = find_concurrent_pairs(
         df,
         min_overlap_hours=48,
-        max_pairs=50000 if not quick_test else 5000,
+        max_pairs=None if not quick_test else 5000,
         cross_domain_only=True,
     )
 
@@ -72,7 +72,7 @@ def phase1_data_collection(quick_test: bool = False, max_markets: int = None):
     return df, pairs, hourly_prices
 
 
-def phase2_granger(hourly_prices, pairs, market_df):
+def phase2_granger(hourly_prices, pairs, market_df, stationarity="window", batched=False, n_workers=1):
     """Phase 2: Pairwise Granger causality + Bonferroni correction."""
     print("\n" + "=" * 70)
     print("PHASE 2: GRANGER CAUSALITY ANALYSIS")
@@ -81,7 +81,8 @@ def phase2_granger(hourly_prices, pairs, market_df):
     from experiment1.granger_pipeline import run_granger_stage
 
     all_results, significant = run_granger_stage(
-        hourly_prices, pairs, market_df, max_lag=24, alpha=0.01
+        hourly_prices, pairs, market_df, max_lag=24, alpha=0.01, stationarity=stationarity,
+        batched=batched, n_workers=n_workers,
     )
 
     print(f"\n  Total directional tests: {len(all_results)}")
@@ -273,6 +274,12 @@ def main():
     parser.add_argument("--skip-granger", action="store_true", help="Use cached Granger results")
     parser.add_argument("--skip-llm", action="store_true", help="Use cached LLM assessments")
     parser.add_argument("--skip-trading", action="store_true", help="Skip trading simulation")
+    parser.add_argument("--stationarity", choices=["window", "global"], default="window",
+                        help="Differencing order per aligned window (exact) or one per ticker")
+    parser.add_argument("--batched-granger", action="store_true",
+                        help="Batch Granger fits across pairs with equal window lengths")
+    parser.add_argument("--granger-workers", type=int, default=1,
+                        help="Worker processes for the Granger stage (1 = in-process)")
     args = parser.parse_args()
 
     os.makedirs(DATA_DIR, exist_ok=True)
@@ -320,7 +327,10 @@ def main():
         significant = pd.read_csv(granger_path)
         all_granger = pd.read_csv(all_granger_path) if os.path.exists(all_granger_path) else significant
     else:
-        all_granger, significant = phase2_granger(hourly_prices, pairs, market_df)
+        all_granger, significant = phase2_granger(
+            hourly_prices, pairs, market_df, args.stationarity, batched=args.batched_granger,
+            n_workers=args.granger_workers,
+        )
 
     # Phase 3: LLM Filtering
     llm_path = os.path.join(DATA_DIR, "llm_filtered_pairs.csv")
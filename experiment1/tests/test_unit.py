@@ -95,6 +95,33 @@ class TestDataCollection:
         pairs = find_concurrent_pairs(df, min_overlap_hours=48, cross_domain_only=False)
         assert len(pairs) == 0
 
+    def test_concurrent_pairs_match_brute_force(self):
+        """Sweep-line pairs equal the all-pairs overlap check."""
+        from experiment1.data_collection import iter_concurrent_pairs
+
+        rng = np.random.default_rng(0)
+        n = 60
+        base = pd.Timestamp("2025-06-01", tz="UTC")
+        opens = base + pd.to_timedelta(rng.integers(0, 24 * 60, n), unit="h")
+        df = pd.DataFrame({
+            "ticker": [f"MARKET-{i}" for i in range(n)],
+            "event_ticker": [f"EVENT-{i // 3}" for i in range(n)],
+            "domain": rng.choice(["economics", "crypto", "politics"], n),
+            "open_time": opens,
+            "close_time": opens + pd.to_timedelta(rng.integers(1, 24 * 10, n), unit="h"),
+        })
+        expected = set()
+        for i in range(n):
+            for j in range(i + 1, n):
+                a, b = df.iloc[i], df.iloc[j]
+                overlap = min(a["close_time"], b["close_time"]) - max(a["open_time"], b["open_time"])
+                if (overlap >= pd.Timedelta(hours=48) and a["event_ticker"] != b["event_ticker"]
+                        and a["domain"] != b["domain"]):
+                    expected.add((a["ticker"], b["ticker"]))
+        pairs = list(iter_concurrent_pairs(df, min_overlap_hours=48, cross_domain_only=True))
+        assert len(pairs) == len(expected) > 0
+        assert set(pairs) == expected
+
     def test_build_aligned_pair_series(self):
         """Aligned series should have matching timestamps."""
         from experiment1.data_collection import build_aligned_pair_series
@@ -189,6 +216,67 @@ class TestGrangerPipeline:
         # but we just check the raw p-value is higher than for the causal pair
         assert len(results) > 0
 
+    def test_pairwise_granger_batched_matches_serial(self):
+        """Batched mode returns the serial rows, in the serial order."""
+        from experiment1.granger_pipeline import run_pairwise_granger
+
+        x, y = self._make_causal_pair(n=300, lag=2)
+        rng = np.random.RandomState(7)
+        z = pd.Series(rng.randn(260).cumsum() * 0.01, index=x.index[30:290])
+        prices = {"X": x, "Y": y, "Z": z, "SHORT": x.iloc[:20]}
+        market_df = pd.DataFrame([
+            {"ticker": t, "domain": d, "title": t.title()}
+            for t, d in (("X", "economics"), ("Y", "crypto"), ("Z", "politics"), ("SHORT", "sports"))
+        ])
+        pairs = [("X", "Y"), ("Z", "X"), ("Y", "Z"), ("X", "SHORT"), ("X", "MISSING")]
+
+        serial = run_pairwise_granger(prices, pairs, market_df, max_lag=5)
+        batched = run_pairwise_granger(prices, pairs, market_df, max_lag=5, batched=True)
+        assert len(serial) > 0
+        pd.testing.assert_frame_equal(batched, serial)
+
+    def test_pairwise_granger_parallel_matches_serial(self):
+        """Worker processes reading shared-memory prices reproduce the serial rows."""
+        from experiment1.granger_pipeline import run_pairwise_granger
+
+        x, y = self._make_causal_pair(n=300, lag=2)
+        rng = np.random.RandomState(7)
+        z = pd.Series(rng.randn(260).cumsum() * 0.01, index=x.index[30:290])
+        z.iloc[[40, 41, 100]] = np.nan
+        prices = {"X": x, "Y": y, "Z": z}
+        market_df = pd.DataFrame([
+            {"ticker": t, "domain": d, "title": t.title()}
+            for t, d in (("X", "economics"), ("Y", "crypto"), ("Z", "politics"))
+        ])
+        pairs = [("X", "Y"), ("Z", "X"), ("Y", "Z"), ("X", "MISSING")]
+
+        for stationarity in ("window", "global"):
+            serial = run_pairwise_granger(prices, pairs, market_df, max_lag=5, stationarity=stationarity)
+            parallel = run_pairwise_granger(
+                prices, pairs, market_df, max_lag=5, stationarity=stationarity, n_workers=2,
+            )
+            assert len(serial) > 0
+            pd.testing.assert_frame_equal(parallel, serial)
+
+    def test_stationarity_cache(self):
+        """Window mode memoizes per (ticker, window) and matches _ensure_stationary."""
+        from experiment1.granger_pipeline import StationarityCache, _ensure_stationary
+
+        x, y = self._make_causal_pair(n=300)
+        cache = StationarityCache({"X": x, "Y": y})
+        window = x.iloc[50:250]
+        first = cache.stationary("X", window)
+        pd.testing.assert_series_equal(first, _ensure_stationary(window))
+        pd.testing.assert_series_equal(cache.stationary("X", window.copy()), first)
+        cache.stationary("X", x.iloc[60:250])
+        assert (cache.misses, cache.hits) == (2, 1)
+
+        global_cache = StationarityCache({"X": x, "Y": y}, mode="global")
+        global_cache.precompute(["X", "Y", "MISSING"])
+        assert global_cache.misses == 2
+        assert global_cache.stationary("X", window) is not None
+        assert global_cache.hits == 1
+
     def test_bonferroni_correction(self):
         """Bonferroni correction should multiply p-values by n_tests."""
         from experiment1.granger_pipeline import apply_bonferroni_correction
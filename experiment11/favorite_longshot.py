@@ -12,13 +12,17 @@ Key hypothesis: more liquidity → more informed traders → bias elimination.
 
 import os
 import json
-import glob
 import numpy as np
 import pandas as pd
 from datetime import datetime, timezone
 from scipy import stats
 from collections import defaultdict
 
+from kalshi.candle_store import candles_to_columns, open_store
+from kalshi.candle_manifest import load_manifest
+from kalshi.candle_query import get_candle_query
+from kalshi.market_store import load_market_store
+
 CANDLE_DIR = "data/exp2/raw/candles"
 TARGETED_MARKETS = "data/exp2/raw/targeted_markets.json"
 
@@ -68,12 +72,12 @@ def extract_t_minus_prices(
     df = df.copy()
     df["has_candle_price"] = False
     df["t_minus_spread"] = np.nan
+    manifest = load_manifest(candle_dir)
 
+    rows, tickers, targets = [], [], []
     for idx, row in df.iterrows():
         ticker = row["ticker"]
-        candle_file = os.path.join(candle_dir, f"{ticker}_60.json")
-
-        if not os.path.exists(candle_file):
+        if not manifest.has(ticker):
             continue
 
         # Parse close_time to epoch seconds
@@ -87,48 +91,21 @@ def extract_t_minus_prices(
         except (ValueError, TypeError):
             continue
 
-        target_epoch = close_epoch - hours_before * 3600
-
-        try:
-            with open(candle_file) as f:
-                candles = json.load(f)
-        except (json.JSONDecodeError, IOError):
-            continue
-
-        if not candles:
-            continue
-
-        # Find candle closest to target time
-        best_candle = None
-        best_diff = float("inf")
-        for c in candles:
-            ts = c.get("end_period_ts")
-            if ts is None:
-                continue
-            diff = abs(ts - target_epoch)
-            if diff < best_diff:
-                best_diff = diff
-                best_candle = c
-
-        if best_candle is None:
-            continue
-
-        # Extract mid-price
-        try:
-            bid_close = float(best_candle.get("yes_bid", {}).get("close_dollars", 0) or 0)
-            ask_close = float(best_candle.get("yes_ask", {}).get("close_dollars", 0) or 0)
-        except (ValueError, TypeError):
-            continue
-
-        if bid_close <= 0 and ask_close <= 0:
-            continue
+        rows.append(idx)
+        tickers.append(ticker)
+        targets.append(close_epoch - hours_before * 3600)
 
-        mid_price = (bid_close + ask_close) / 2.0
-        spread = max(0, ask_close - bid_close)
+    # Candle closest to each target time, one batched lookup
+    nearest = get_candle_query(candle_dir).at(tickers, targets)
+    bid_close = np.nan_to_num(nearest["yes_bid"].to_numpy(), nan=0.0)
+    ask_close = np.nan_to_num(nearest["yes_ask"].to_numpy(), nan=0.0)
+    ok = nearest["found"].to_numpy() & ~((bid_close <= 0) & (ask_close <= 0))
 
-        df.at[idx, "implied_prob"] = mid_price
-        df.at[idx, "has_candle_price"] = True
-        df.at[idx, "t_minus_spread"] = spread
+    # Mid-price and spread
+    hit = np.asarray(rows, dtype=object)[ok]
+    df.loc[hit, "implied_prob"] = (bid_close[ok] + ask_close[ok]) / 2.0
+    df.loc[hit, "has_candle_price"] = True
+    df.loc[hit, "t_minus_spread"] = np.maximum(0, ask_close[ok] - bid_close[ok])
 
     return df
 
@@ -157,12 +134,12 @@ def extract_pct_lifetime_prices(
     df["pct_implied_prob"] = np.nan
     df["pct_has_price"] = False
     df["pct_elapsed_actual"] = np.nan
+    manifest = load_manifest(candle_dir)
 
+    rows, tickers, targets, opens, lifetimes = [], [], [], [], []
     for idx, row in df.iterrows():
         ticker = row["ticker"]
-        candle_file = os.path.join(candle_dir, f"{ticker}_60.json")
-
-        if not os.path.exists(candle_file):
+        if not manifest.has(ticker):
             continue
 
         open_time = row.get("open_time")
@@ -182,52 +159,23 @@ def extract_pct_lifetime_prices(
         if lifetime_secs <= 0:
             continue
 
-        target_epoch = open_epoch + pct_elapsed * lifetime_secs
-
-        try:
-            with open(candle_file) as f:
-                candles = json.load(f)
-        except (json.JSONDecodeError, IOError):
-            continue
-
-        if not candles:
-            continue
-
-        # Find candle closest to target time
-        best_candle = None
-        best_diff = float("inf")
-        for c in candles:
-            ts = c.get("end_period_ts")
-            if ts is None:
-                continue
-            diff = abs(ts - target_epoch)
-            if diff < best_diff:
-                best_diff = diff
-                best_candle = c
-
-        if best_candle is None:
-            continue
-
-        # Reject if closest candle is >2h away from target
-        if best_diff > 7200:
-            continue
-
-        try:
-            bid_close = float(best_candle.get("yes_bid", {}).get("close_dollars", 0) or 0)
-            ask_close = float(best_candle.get("yes_ask", {}).get("close_dollars", 0) or 0)
-        except (ValueError, TypeError):
-            continue
+        rows.append(idx)
+        tickers.append(ticker)
+        targets.append(open_epoch + pct_elapsed * lifetime_secs)
+        opens.append(open_epoch)
+        lifetimes.append(lifetime_secs)
 
-        if bid_close <= 0 and ask_close <= 0:
-            continue
-
-        mid_price = (bid_close + ask_close) / 2.0
-        actual_ts = best_candle.get("end_period_ts", target_epoch)
-        actual_pct = (actual_ts - open_epoch) / lifetime_secs if lifetime_secs > 0 else pct_elapsed
+    # Candle closest to each target time; reject if it is >2h away
+    nearest = get_candle_query(candle_dir).at(tickers, targets, max_gap=7200)
+    bid_close = np.nan_to_num(nearest["yes_bid"].to_numpy(), nan=0.0)
+    ask_close = np.nan_to_num(nearest["yes_ask"].to_numpy(), nan=0.0)
+    ok = nearest["found"].to_numpy() & ~((bid_close <= 0) & (ask_close <= 0))
 
-        df.at[idx, "pct_implied_prob"] = mid_price
-        df.at[idx, "pct_has_price"] = True
-        df.at[idx, "pct_elapsed_actual"] = actual_pct
+    actual_pct = (nearest["ts"].to_numpy() - np.asarray(opens)) / np.asarray(lifetimes) if rows else np.array([])
+    hit = np.asarray(rows, dtype=object)[ok]
+    df.loc[hit, "pct_implied_prob"] = (bid_close[ok] + ask_close[ok]) / 2.0
+    df.loc[hit, "pct_has_price"] = True
+    df.loc[hit, "pct_elapsed_actual"] = actual_pct[ok]
 
     return df
 
@@ -282,8 +230,12 @@ def load_settled_markets() -> pd.DataFrame:
     Returns DataFrame with: ticker, result (yes/no), last_price (implied prob),
     open_interest, volume, open_time, close_time, etc.
     """
-    with open(TARGETED_MARKETS) as f:
-        markets = json.load(f)
+    store = load_market_store()
+    if store is not None and os.path.exists(TARGETED_MARKETS):
+        markets = store.markets(sources="exp2_targeted", status="finalized", result=["yes", "no"])
+    else:
+        with open(TARGETED_MARKETS) as f:
+            markets = json.load(f)
 
     records = []
     for m in markets:
@@ -332,57 +284,60 @@ def load_settled_markets() -> pd.DataFrame:
 def load_microstructure_from_candles() -> pd.DataFrame:
     """Load per-ticker microstructure summaries from hourly candles.
 
+    Each ticker is read from the columnar candle store when its copy there is
+    current, and from its JSON file otherwise (not yet migrated, or refreshed
+    since). Both go through the same column summary, so a ticker's row
+    doesn't depend on where it was read from.
+
     Returns DataFrame indexed by ticker with:
     mean_spread, mean_oi, peak_oi, mean_volume, total_volume, n_candles
     """
-    files = sorted(glob.glob(os.path.join(CANDLE_DIR, "*_60.json")))
+    store = open_store()
+    manifest = load_manifest(CANDLE_DIR)
+    tickers = set(manifest.tickers())
+    if store is not None:
+        tickers.update(store.tickers())
 
     records = []
-    for f in files:
-        ticker = os.path.basename(f).replace("_60.json", "")
+    for ticker in sorted(tickers):
+        cols = store.get(ticker) if store is not None else None
+        if cols is None:
+            f = manifest.path(ticker)
+            if f is None:
+                continue
+            with open(f) as fh:
+                cols = candles_to_columns(json.load(fh))
 
-        with open(f) as fh:
-            candles = json.load(fh)
+        record = _microstructure_record(ticker, cols)
+        if record is not None:
+            records.append(record)
 
-        if not candles:
-            continue
+    return pd.DataFrame(records).set_index("ticker")
 
-        spreads = []
-        ois = []
-        volumes = []
-
-        for c in candles:
-            bid = c.get("yes_bid", {})
-            ask = c.get("yes_ask", {})
-            try:
-                bid_close = float(bid.get("close_dollars", 0) or 0)
-                ask_close = float(ask.get("close_dollars", 0) or 0)
-                spread = max(0, ask_close - bid_close)
-                spreads.append(spread)
-            except (ValueError, TypeError):
-                pass
-
-            oi = c.get("open_interest", 0)
-            if oi is not None:
-                ois.append(int(oi))
-
-            vol = c.get("volume", 0)
-            if vol is not None:
-                volumes.append(int(vol))
-
-        if spreads:
-            records.append({
-                "ticker": ticker,
-                "mean_spread": np.mean(spreads),
-                "median_spread": np.median(spreads),
-                "mean_oi": np.mean(ois) if ois else 0,
-                "peak_oi": max(ois) if ois else 0,
-                "mean_volume": np.mean(volumes) if volumes else 0,
-                "total_volume": sum(volumes) if volumes else 0,
-                "n_candles": len(candles),
-            })
 
-    return pd.DataFrame(records).set_index("ticker")
+def _microstructure_record(ticker: str, cols: dict) -> dict | None:
+    """Summarize one ticker's candle columns (see kalshi.candle_store.candles_to_columns).
+
+    Missing bid/ask closes count as 0 and missing OI/volume are skipped.
+    n_candles counts the timestamped candles the summary was computed over.
+    """
+    if len(cols["ts"]) == 0:
+        return None
+    bid = np.nan_to_num(cols["yes_bid"], nan=0.0)
+    ask = np.nan_to_num(cols["yes_ask"], nan=0.0)
+    spreads = np.maximum(0, ask - bid)
+    ois = np.trunc(cols["open_interest"][~np.isnan(cols["open_interest"])])
+    volumes = np.trunc(cols["volume"][~np.isnan(cols["volume"])])
+    return {
+        "ticker": ticker,
+        "mean_spread": np.mean(spreads),
+        "median_spread": np.median(spreads),
+        "mean_oi": np.mean(ois) if len(ois) else 0,
+        "peak_oi": int(ois.max()) if len(ois) else 0,
+        "mean_volume": np.mean(volumes) if len(volumes) else 0,
+        "total_volume": int(volumes.sum()) if len(volumes) else 0,
+        "n_candles": len(cols["ts"]),
+    }
 
 
 def compute_calibration_curve(
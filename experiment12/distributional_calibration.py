@@ -8,23 +8,27 @@ CRPS measures the quality of a full probabilistic forecast against a realized
 scalar outcome. Lower CRPS = better calibrated distribution. CRPS generalizes
 MAE to distributional forecasts: for a point mass, CRPS = MAE.
 
-Provides benchmark comparisons against uniform, historical empirical, and
-point-forecast distributions.
+Provides benchmark comparisons against uniform, normal, Student-t,
+skew-normal, historical empirical (raw and kernel-smoothed), and
+point-forecast distributions, all in closed form.
 
 Uses cached candle data from experiment2 and CDF reconstruction logic from
 experiment7.
 """
 
 import os
-import json
 import csv
 import io
 import urllib.request
 import numpy as np
 import pandas as pd
+from scipy import special, stats
 from datetime import datetime, timezone
 from typing import Optional
 
+from kalshi.candle_query import get_candle_query
+from experiment7.implied_distributions import load_aligned_prices
+
 CANDLE_DIR = "data/exp2/raw/candles"
 
 
@@ -158,60 +162,372 @@ def _integrate_squared_linear(y0: float, y1: float, width: float) -> float:
     """
     if width <= 0:
         return 0.0
-    return width * (y0**2 + y0 * y1 + y1**2) / 3.0
+    # y*y rather than y**2: float.__pow__ goes through libm pow(), which is
+    # not always correctly rounded and so would not match the batch kernel.
+    return width * (y0 * y0 + y0 * y1 + y1 * y1) / 3.0
+
+
+def _compact_rows(xp: np.ndarray, fp: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Move each row's non-NaN (xp, fp) pairs to the front, in order.
+
+    Returns (xp, fp, counts) with padding set to +inf in xp and 0 in fp, so
+    padded rows stay sorted and never match a finite search key.
+    """
+    valid = ~(np.isnan(xp) | np.isnan(fp))
+    counts = valid.sum(axis=1)
+    order = np.argsort(~valid, axis=1, kind="stable")
+    xp = np.take_along_axis(xp, order, axis=1)
+    fp = np.take_along_axis(fp, order, axis=1)
+    pad = np.arange(xp.shape[1]) >= counts[:, None]
+    return np.where(pad, np.inf, xp), np.where(pad, 0.0, fp), counts
+
+
+def _interp_rows(xp: np.ndarray, fp: np.ndarray, counts: np.ndarray, x: np.ndarray) -> np.ndarray:
+    """np.interp(x[i], xp[i, :counts[i]], fp[i, :counts[i]]) for every row i.
+
+    xp/fp come from _compact_rows; x has shape (rows, points). Reproduces
+    np.interp's arithmetic exactly (right-most duplicate on exact matches,
+    slope * (x - xp[j]) + fp[j] otherwise, end values outside the range).
+    """
+    k = xp.shape[1]
+    rows = np.arange(len(xp))
+    j = (xp[:, None, :] <= x[:, :, None]).sum(axis=2) - 1
+    j_lo = np.clip(j, 0, k - 1)
+    j_hi = np.minimum(j_lo + 1, k - 1)
+    x_lo = np.take_along_axis(xp, j_lo, axis=1)
+    x_hi = np.take_along_axis(xp, j_hi, axis=1)
+    f_lo = np.take_along_axis(fp, j_lo, axis=1)
+    f_hi = np.take_along_axis(fp, j_hi, axis=1)
+    exact = (j_lo == counts[:, None] - 1) | (x_lo == x)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        slope = (f_hi - f_lo) / (x_hi - x_lo)
+        interp = np.where(exact, f_lo, slope * (x - x_lo) + f_lo)
+    first, last = xp[:, :1], xp[rows, counts - 1][:, None]
+    return np.where(x < first, fp[:, :1], np.where(x > last, fp[rows, counts - 1][:, None], interp))
+
+
+def compute_crps_batch(
+    cdf_strikes,
+    cdf_matrix,
+    realized,
+    tail_extension=None,
+    outer: bool = False,
+) -> np.ndarray:
+    """Vectorized compute_crps for many CDFs at once.
+
+    Gives the same floats as calling compute_crps row by row: breakpoints,
+    interpolation (np.interp's formula), segment integrals and the order of
+    summation are reproduced exactly, just laid out as (row, segment) arrays.
+
+    Parameters
+    ----------
+    cdf_strikes : array-like
+        Ascending strikes, either shared by all rows with shape (K,) or per
+        row with shape (N, K).
+    cdf_matrix : array-like
+        Survival values P(X > strike), shape (N, K). Rows with fewer strikes
+        are padded with NaN (in either the strikes or the survival values);
+        padded entries are ignored. Every row needs at least 2 real strikes.
+    realized : array-like
+        Realized values: shape (N,) scores row i against realized[i]; with
+        outer=True, shape (M,) scores every row against every value.
+    tail_extension : float, array-like of shape (N,), or None
+        As in compute_crps; None uses max(strike_range * 0.5, 1.0) per row.
+    outer : bool
+        Score all N x M (row, realized) combinations.
+
+    Returns
+    -------
+    np.ndarray
+        CRPS scores, shape (N,), or (N, M) with outer=True.
+    """
+    f_values = np.clip(1.0 - np.atleast_2d(np.asarray(cdf_matrix, dtype=float)), 0.0, 1.0)
+    n_rows, k = f_values.shape
+    strikes = np.broadcast_to(np.asarray(cdf_strikes, dtype=float), (n_rows, k))
+    realized = np.atleast_1d(np.asarray(realized, dtype=float))
+
+    strikes, f_values, counts = _compact_rows(strikes, f_values)
+    if (counts < 2).any():
+        raise ValueError("Need at least 2 strike points to compute CRPS")
+
+    if tail_extension is None:
+        strike_range = strikes[np.arange(n_rows), counts - 1] - strikes[:, 0]
+        tail_extension = np.maximum(strike_range * 0.5, 1.0)
+    tail_extension = np.broadcast_to(np.asarray(tail_extension, dtype=float), (n_rows,))
+
+    if outer:
+        n_real = len(realized)
+        rows = np.repeat(np.arange(n_rows), n_real)
+        realized = np.tile(realized, n_rows)
+    else:
+        if len(realized) != n_rows:
+            raise ValueError("realized must have one value per CDF row (or pass outer=True)")
+        rows = np.arange(n_rows)
+    strikes, f_values = strikes[rows], f_values[rows]
+    counts, tail_extension = counts[rows], tail_extension[rows]
+    n = len(rows)
+    first = strikes[:, 0]
+    last = strikes[np.arange(n), counts - 1]
+
+    x_min = np.minimum(first - tail_extension, realized - tail_extension)
+    x_max = np.maximum(last + tail_extension, realized + tail_extension)
+    extra_x = np.stack([x_min, realized, x_max], axis=1)
+
+    # F at the strikes themselves: np.interp returns fp of the last duplicate
+    k_idx = np.arange(k)
+    is_last = np.ones((n, k), dtype=bool)
+    is_last[:, :-1] = strikes[:, :-1] != strikes[:, 1:]
+    last_dup = np.minimum.accumulate(np.where(is_last, k_idx, k - 1)[:, ::-1], axis=1)[:, ::-1]
+    strike_f = np.take_along_axis(f_values, last_dup, axis=1)
+
+    # F at x_min / realized / x_max: flat tails, else np.interp's arithmetic
+    extra_f = np.where(extra_x < first[:, None], 0.0,
+                       np.where(extra_x > last[:, None], 1.0,
+                                _interp_rows(strikes, f_values, counts, extra_x)))
+
+    # Sorted breakpoints; duplicates become zero-width segments
+    xs = np.concatenate([strikes, extra_x], axis=1)
+    fs = np.concatenate([strike_f, extra_f], axis=1)
+    order = np.argsort(xs, axis=1, kind="stable")
+    xs = np.take_along_axis(xs, order, axis=1)
+    fs = np.take_along_axis(fs, order, axis=1)
+
+    a, b = xs[:, :-1], xs[:, 1:]
+    # Segments end at or below realized integrate F^2, the rest (F - 1)^2
+    shift = np.where(b <= realized[:, None], 0.0, 1.0)
+    y0 = fs[:, :-1] - shift
+    y1 = fs[:, 1:] - shift
+    with np.errstate(invalid="ignore"):
+        width = b - a
+        segment = width * (y0 * y0 + y0 * y1 + y1 * y1) / 3.0
+    segment = np.where(np.isfinite(b) & (width > 0), segment, 0.0)
+    crps = np.add.accumulate(segment, axis=1)[:, -1]
+
+    return crps.reshape(n_rows, len(realized) // n_rows) if outer else crps
 
 
 # ---------------------------------------------------------------------------
-# Benchmark CRPS: uniform distribution
+# Benchmark CRPS: closed-form parametric distributions
 # ---------------------------------------------------------------------------
+#
+# These share compute_crps_batch's conventions: parameters and realized
+# values are array-likes that broadcast against each other (one distribution
+# per realized value), or with outer=True every distribution is scored
+# against every realized value (result shape params.shape + (M,)). Scalar
+# inputs return a float.
+
+
+def _benchmark_args(params: tuple, realized_value, outer: bool) -> tuple:
+    params = tuple(np.asarray(p, dtype=float) for p in params)
+    y = np.asarray(realized_value, dtype=float)
+    if outer:
+        params = tuple(p[..., None] for p in params)
+        y = np.atleast_1d(y)
+    return params, y
+
+
+def _benchmark_result(crps: np.ndarray):
+    return float(crps) if np.ndim(crps) == 0 else crps
+
+
+def _normal_abs_moment(mu, sigma):
+    """E|N(mu, sigma^2)|, the building block of normal and mixture CRPS."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = mu / sigma
+        return np.where(
+            sigma > 0,
+            mu * (2.0 * stats.norm.cdf(z) - 1.0) + 2.0 * sigma * stats.norm.pdf(z),
+            np.abs(mu),
+        )
 
 
 def compute_uniform_crps(
-    min_val: float,
-    max_val: float,
-    realized_value: float,
-) -> float:
+    min_val,
+    max_val,
+    realized_value,
+    outer: bool = False,
+):
     """Compute CRPS for a uniform distribution U(min_val, max_val).
 
-    Uses numerical integration via the same piecewise approach as compute_crps,
-    treating F(x) = (x - min_val) / (max_val - min_val) for x in [min, max].
+    Closed form: with w = max_val - min_val and z = (y - min_val) / w
+    clipped to [0, 1],
+
+        CRPS = |y - clip(y, min_val, max_val)| + w * (1/3 - z * (1 - z))
 
     Parameters
     ----------
-    min_val : float
+    min_val : float or array-like
         Lower bound of the uniform distribution.
-    max_val : float
+    max_val : float or array-like
         Upper bound of the uniform distribution.
-    realized_value : float
+    realized_value : float or array-like
         The actual observed outcome.
+    outer : bool
+        Score every distribution against every realized value.
 
     Returns
     -------
-    float
+    float or np.ndarray
         CRPS score.
     """
-    if max_val <= min_val:
+    (lo, hi), y = _benchmark_args((min_val, max_val), realized_value, outer)
+    if np.any(hi <= lo):
         raise ValueError("max_val must be greater than min_val")
 
-    span = max_val - min_val
-    y = realized_value
+    span = hi - lo
+    z = np.clip((y - lo) / span, 0.0, 1.0)
+    outside = np.abs(y - np.clip(y, lo, hi))
+    return _benchmark_result(outside + span * (1.0 / 3.0 - z * (1.0 - z)))
 
-    # Closed-form CRPS for Uniform(a, b):
-    #   If y < a: CRPS = (a - y) + span/3
-    #   If y > b: CRPS = (y - b) + span/3
-    #   If a <= y <= b:
-    #     t = (y - a) / span
-    #     CRPS = span * (t^2 + (1-t)^2 - 1) / 3  +  ... actually integrate directly
 
-    # More reliable: build a synthetic CDF and use compute_crps logic.
-    # Uniform CDF: F(x) = 0 for x < a, (x-a)/(b-a) for a <= x <= b, 1 for x > b.
-    # Survival S(x) = 1 - F(x).
+def compute_normal_crps(
+    mean,
+    std,
+    realized_value,
+    outer: bool = False,
+):
+    """Compute CRPS for a normal distribution N(mean, std^2).
 
-    n_points = 50
-    strikes = np.linspace(min_val, max_val, n_points).tolist()
-    survival_values = [1.0 - (s - min_val) / span for s in strikes]
+    Closed form (Gneiting & Raftery 2007), with z = (y - mean) / std:
 
-    return compute_crps(strikes, survival_values, realized_value, tail_extension=0.0)
+        CRPS = std * [z (2 Phi(z) - 1) + 2 phi(z) - 1 / sqrt(pi)]
+
+    Parameters
+    ----------
+    mean : float or array-like
+        Distribution mean.
+    std : float or array-like
+        Standard deviation (> 0).
+    realized_value : float or array-like
+        The actual observed outcome.
+    outer : bool
+        Score every distribution against every realized value.
+
+    Returns
+    -------
+    float or np.ndarray
+        CRPS score.
+    """
+    (mu, sigma), y = _benchmark_args((mean, std), realized_value, outer)
+    if np.any(sigma <= 0):
+        raise ValueError("std must be positive")
+
+    z = (y - mu) / sigma
+    crps = sigma * (z * (2.0 * stats.norm.cdf(z) - 1.0) + 2.0 * stats.norm.pdf(z) - 1.0 / np.sqrt(np.pi))
+    return _benchmark_result(crps)
+
+
+def compute_student_t_crps(
+    df,
+    loc,
+    scale,
+    realized_value,
+    outer: bool = False,
+):
+    """Compute CRPS for a location-scale Student-t distribution.
+
+    Closed form (Jordan, Krueger & Lerch 2019), with z = (y - loc) / scale
+    and nu = df > 1 (the CRPS is infinite for nu <= 1):
+
+        CRPS = scale * [z (2 F(z) - 1) + 2 f(z) (nu + z^2) / (nu - 1)
+                        - 2 sqrt(nu) B(1/2, nu - 1/2) / ((nu - 1) B(1/2, nu/2)^2)]
+
+    Parameters
+    ----------
+    df : float or array-like
+        Degrees of freedom (> 1).
+    loc : float or array-like
+        Location.
+    scale : float or array-like
+        Scale (> 0).
+    realized_value : float or array-like
+        The actual observed outcome.
+    outer : bool
+        Score every distribution against every realized value.
+
+    Returns
+    -------
+    float or np.ndarray
+        CRPS score.
+    """
+    (nu, mu, sigma), y = _benchmark_args((df, loc, scale), realized_value, outer)
+    if np.any(nu <= 1):
+        raise ValueError("df must be greater than 1 for a finite CRPS")
+    if np.any(sigma <= 0):
+        raise ValueError("scale must be positive")
+
+    z = (y - mu) / sigma
+    spread = 2.0 * np.sqrt(nu) * special.beta(0.5, nu - 0.5) / ((nu - 1.0) * special.beta(0.5, nu / 2.0) ** 2)
+    crps = sigma * (
+        z * (2.0 * stats.t.cdf(z, nu) - 1.0)
+        + 2.0 * stats.t.pdf(z, nu) * (nu + z * z) / (nu - 1.0)
+        - spread
+    )
+    return _benchmark_result(crps)
+
+
+def compute_skew_normal_crps(
+    loc,
+    scale,
+    alpha,
+    realized_value,
+    outer: bool = False,
+):
+    """Compute CRPS for a skew-normal distribution SN(loc, scale, alpha).
+
+    Same parameterization as scipy.stats.skewnorm(alpha, loc, scale). Uses
+    CRPS = E|X - y| - E|X - X'| / 2 with both expectations in closed form.
+    With z = (y - loc) / scale, delta = alpha / sqrt(1 + alpha^2):
+
+        E|Z - z| = z (2 F(z) - 1) + sqrt(2/pi) delta (1 - 2 Phi(sqrt(1 + alpha^2) z))
+                   + 4 phi(z) Phi(alpha z)
+
+    and E|Z - Z'| reduces to Gaussian orthant probabilities (arcsines) via
+    the representation Z = delta |U0| + sqrt(1 - delta^2) U1. For alpha = 0
+    both reduce to the normal CRPS.
+
+    Parameters
+    ----------
+    loc : float or array-like
+        Location.
+    scale : float or array-like
+        Scale (> 0).
+    alpha : float or array-like
+        Shape (skewness) parameter.
+    realized_value : float or array-like
+        The actual observed outcome.
+    outer : bool
+        Score every distribution against every realized value.
+
+    Returns
+    -------
+    float or np.ndarray
+        CRPS score.
+    """
+    (mu, sigma, a), y = _benchmark_args((loc, scale, alpha), realized_value, outer)
+    if np.any(sigma <= 0):
+        raise ValueError("scale must be positive")
+
+    z = (y - mu) / sigma
+    delta = a / np.sqrt(1.0 + a * a)
+    abs_error = (
+        z * (2.0 * stats.skewnorm.cdf(z, a) - 1.0)
+        + np.sqrt(2.0 / np.pi) * delta * (1.0 - 2.0 * stats.norm.cdf(np.sqrt(1.0 + a * a) * z))
+        + 4.0 * stats.norm.pdf(z) * stats.norm.cdf(a * z)
+    )
+
+    # E|Z - Z'| = sqrt(2) E|d M + s V|, M = min(|P|, |Q|); P, Q, V iid N(0, 1)
+    d = np.abs(delta)
+    s = np.sqrt(1.0 - d * d)
+    orthant = (
+        0.25 - np.arcsin(s / np.sqrt(1.0 + s * s)) / (2.0 * np.pi)
+        + d / 4.0
+        - d / np.sqrt(2.0) * (0.25 + np.arcsin(d / np.sqrt(2.0 - d * d)) / (2.0 * np.pi))
+    ) / np.sqrt(2.0 * np.pi)
+    mean_min = 4.0 * (1.0 - 1.0 / np.sqrt(2.0)) / np.sqrt(2.0 * np.pi)
+    spread = np.sqrt(2.0) * (16.0 * orthant - d * mean_min)
+
+    return _benchmark_result(sigma * (abs_error - 0.5 * spread))
 
 
 # ---------------------------------------------------------------------------
@@ -221,78 +537,102 @@ def compute_uniform_crps(
 
 def compute_historical_crps(
     past_values: list[float],
-    realized_value: float,
-) -> float:
+    realized_value,
+):
     """Compute CRPS for an empirical CDF built from historical observations.
 
     The empirical CDF is a step function: F(x) = (# of past_values <= x) / n.
-    CRPS is computed by piecewise integration over each step.
+    Its CRPS has the closed (energy) form
+
+        CRPS = mean|X - y| - 0.5 * mean|X - X'|
+
+    over the historical sample X. With the sample sorted, both terms come
+    from prefix sums, so scoring m realized values costs O((n + m) log n).
 
     Parameters
     ----------
     past_values : list[float]
         Historical observations used to build the empirical distribution.
-    realized_value : float
-        The actual observed outcome.
+    realized_value : float or array-like
+        The actual observed outcome, or several outcomes scored against the
+        same history.
 
     Returns
     -------
-    float
-        CRPS score.
+    float or np.ndarray
+        CRPS score (an array matching realized_value if it is array-like).
 
     Raises
     ------
     ValueError
         If past_values is empty.
     """
-    if not past_values:
+    if len(past_values) == 0:
         raise ValueError("past_values must be non-empty")
 
-    sorted_vals = np.sort(past_values)
+    sorted_vals = np.sort(np.asarray(past_values, dtype=float))
     n = len(sorted_vals)
+    prefix = np.concatenate([[0.0], np.cumsum(sorted_vals)])
 
-    # Build step function breakpoints: at each observed value, CDF jumps by 1/n.
-    # Between observations, CDF is flat.
-    # CRPS = integral [F(x) - H(x - y)]^2 dx
+    # sum_{i,j} |x_i - x_j| = 2 * sum_i (2i - n + 1) * x_(i), i zero-based
+    spread = 2.0 * np.dot(2.0 * np.arange(n) - n + 1.0, sorted_vals) / (n * n)
 
-    y = realized_value
+    y = np.asarray(realized_value, dtype=float)
+    k = np.searchsorted(sorted_vals, y, side="right")
+    abs_error = (k * y - prefix[k]) + (prefix[-1] - prefix[k] - (n - k) * y)
+    crps = abs_error / n - 0.5 * spread
 
-    # Integration domain: extend slightly beyond data range
-    margin = 0.1 * (sorted_vals[-1] - sorted_vals[0]) if n > 1 else 1.0
-    x_min = min(sorted_vals[0], y) - margin
-    x_max = max(sorted_vals[-1], y) + margin
+    return float(crps) if crps.ndim == 0 else crps
 
-    # Build all breakpoints
-    breakpoints = sorted(set([x_min] + sorted_vals.tolist() + [y, x_max]))
 
-    crps = 0.0
+def compute_empirical_mixture_crps(
+    past_values: list[float],
+    realized_value,
+    bandwidth: float | None = None,
+):
+    """Compute CRPS for a Gaussian kernel mixture over historical observations.
 
-    for i in range(len(breakpoints) - 1):
-        a = breakpoints[i]
-        b = breakpoints[i + 1]
-        if b <= a:
-            continue
+    A smoothed version of compute_historical_crps: an equal-weight mixture
+    of N(x_i, h^2) components centred on the past values. Closed form
+    (Grimit et al. 2006), with A(m, s) = E|N(m, s^2)|:
 
-        # Empirical CDF is constant between breakpoints:
-        # F(x) = (# of sorted_vals <= a) / n for x in (a, b]
-        # Use value at midpoint for the step function level
-        f_val = np.searchsorted(sorted_vals, a, side="right") / n
-        width = b - a
+        CRPS = mean_i A(y - x_i, h) - 0.5 * mean_ij A(x_i - x_j, sqrt(2) h)
 
-        if b <= y:
-            # Below realized: integrand = F(x)^2
-            crps += width * f_val**2
-        elif a >= y:
-            # Above realized: integrand = (F(x) - 1)^2
-            crps += width * (f_val - 1.0) ** 2
-        else:
-            # Straddles realized_value
-            w_left = y - a
-            w_right = b - y
-            crps += w_left * f_val**2
-            crps += w_right * (f_val - 1.0) ** 2
+    Parameters
+    ----------
+    past_values : list[float]
+        Historical observations (mixture component centres).
+    realized_value : float or array-like
+        The actual observed outcome.
+    bandwidth : float or None
+        Kernel standard deviation h. If None, Silverman's rule
+        1.06 * std * n^(-1/5). A bandwidth of 0 gives the unsmoothed
+        empirical CRPS of compute_historical_crps.
 
-    return float(crps)
+    Returns
+    -------
+    float or np.ndarray
+        CRPS score.
+
+    Raises
+    ------
+    ValueError
+        If past_values is empty.
+    """
+    if len(past_values) == 0:
+        raise ValueError("past_values must be non-empty")
+
+    centers = np.asarray(past_values, dtype=float)
+    n = len(centers)
+    if bandwidth is None:
+        bandwidth = 1.06 * np.std(centers, ddof=1) * n ** -0.2 if n > 1 else 0.0
+    if bandwidth <= 0:
+        return compute_historical_crps(centers, realized_value)
+
+    y = np.asarray(realized_value, dtype=float)
+    abs_error = _normal_abs_moment(y[..., None] - centers, bandwidth).mean(axis=-1)
+    spread = _normal_abs_moment(centers[:, None] - centers[None, :], np.sqrt(2.0) * bandwidth).mean()
+    return _benchmark_result(abs_error - 0.5 * spread)
 
 
 # ---------------------------------------------------------------------------
@@ -358,79 +698,293 @@ def extract_event_cdf_at_time(
         - 'timestamp': actual timestamp used (closest available)
         Returns None if insufficient data (< 2 strikes with prices).
     """
-    if target_time_utc.tzinfo is None:
-        target_time_utc = target_time_utc.replace(tzinfo=timezone.utc)
+    return extract_event_cdfs_at_times(event_markets_df, [target_time_utc], candle_dir)[0]
 
-    target_ts = target_time_utc.timestamp()
 
-    cdf_points = []
+def extract_event_cdfs_at_times(
+    event_markets_df: pd.DataFrame,
+    target_times_utc: list[datetime],
+    candle_dir: str = CANDLE_DIR,
+) -> list[Optional[dict]]:
+    """Extract the implied CDF for an event at many timestamps in one lookup.
 
-    for _, row in event_markets_df.iterrows():
-        ticker = row["ticker"]
-        strike = float(row["floor_strike"])
+    Each strike's candles are loaded once and every (strike, target) pair is
+    resolved by binary search, so e.g. T-24h, T-48h and mid-life snapshots
+    cost one pass instead of one file parse and scan per target.
 
-        candle_path = os.path.join(candle_dir, f"{ticker}_60.json")
-        if not os.path.exists(candle_path):
-            continue
+    Parameters
+    ----------
+    event_markets_df : pd.DataFrame
+        Markets belonging to one event (ticker, floor_strike).
+    target_times_utc : list[datetime]
+        Target timestamps; naive datetimes are taken as UTC.
+    candle_dir : str
+        Directory containing candle JSON files ({TICKER}_60.json).
 
-        try:
-            with open(candle_path) as f:
-                candles = json.load(f)
-        except (json.JSONDecodeError, IOError):
+    Returns
+    -------
+    list
+        One entry per target, as returned by extract_event_cdf_at_time().
+    """
+    target_ts = np.array([
+        (t if t.tzinfo is not None else t.replace(tzinfo=timezone.utc)).timestamp()
+        for t in target_times_utc
+    ])
+    tickers = event_markets_df["ticker"].tolist()
+    strikes = event_markets_df["floor_strike"].astype(float).to_numpy()
+    n_strikes, n_targets = len(tickers), len(target_ts)
+
+    # Row-major (target, strike) pairs, resolved in one batched nearest-candle lookup
+    nearest = get_candle_query(candle_dir).at(np.tile(tickers, n_targets), np.repeat(target_ts, n_strikes))
+    close = nearest["close"].to_numpy().reshape(n_targets, n_strikes)
+    found = nearest["found"].to_numpy().reshape(n_targets, n_strikes)
+    actual_ts = nearest["ts"].to_numpy().reshape(n_targets, n_strikes)
+
+    # Stable sort by strike (ascending), as cdf_points.sort() did
+    order = np.argsort(strikes, kind="stable")
+    results = []
+    for k in range(n_targets):
+        # Market close price = P(X > strike); strikes without a price are skipped
+        cols = order[found[k, order] & ~np.isnan(close[k, order])]
+        if len(cols) < 2:
+            results.append(None)
             continue
 
-        if not candles:
-            continue
+        # Use the median actual timestamp as the representative timestamp
+        median_ts = int(np.sort(actual_ts[k, cols])[len(cols) // 2])
+        results.append({
+            "strikes": strikes[cols].tolist(),
+            "cdf_values": close[k, cols].tolist(),
+            "timestamp": datetime.fromtimestamp(median_ts, tz=timezone.utc),
+        })
+    return results
 
-        # Find candle closest to target timestamp
-        best_candle = None
-        best_dist = float("inf")
 
-        for c in candles:
-            ts = c.get("end_period_ts")
-            if ts is None:
-                continue
-            dist = abs(ts - target_ts)
-            if dist < best_dist:
-                best_dist = dist
-                best_candle = c
+# ---------------------------------------------------------------------------
+# PIT (probability integral transform) engine
+# ---------------------------------------------------------------------------
 
-        if best_candle is None:
-            continue
 
-        # Extract close price (market price = P(X > strike))
-        price_obj = best_candle.get("price", {})
-        close_price = price_obj.get("close_dollars")
-        if close_price is None:
-            continue
+def compute_pit_batch(
+    cdf_strikes,
+    cdf_matrix,
+    realized,
+    clip: bool = False,
+) -> np.ndarray:
+    """PIT = 1 - S(realized) for many implied survival curves at once.
+
+    S is interpolated exactly as np.interp(realized, strikes, survival) does
+    (end values held flat outside the strike range), which is how every
+    per-event PIT loop in the repo computed it.
+
+    Parameters
+    ----------
+    cdf_strikes : array-like
+        Ascending strikes, shape (K,) shared or (N, K) per row.
+    cdf_matrix : array-like
+        Survival values P(X > strike), shape (N, K); NaN entries (in either
+        array) are padding and ignored. Rows need at least 1 real strike.
+    realized : array-like
+        Realized values, shape (N,).
+    clip : bool
+        Clip PIT to [0, 1] (survival prices can sit slightly outside it).
+
+    Returns
+    -------
+    np.ndarray
+        PIT values, shape (N,).
+    """
+    pit = 1.0 - _survival_at(cdf_strikes, cdf_matrix, realized)
+    return np.clip(pit, 0.0, 1.0) if clip else pit
+
+
+def _survival_at(cdf_strikes, cdf_matrix, realized) -> np.ndarray:
+    survival = np.atleast_2d(np.asarray(cdf_matrix, dtype=float))
+    n_rows, k = survival.shape
+    strikes = np.broadcast_to(np.asarray(cdf_strikes, dtype=float), (n_rows, k))
+    realized = np.atleast_1d(np.asarray(realized, dtype=float))
+    if len(realized) != n_rows:
+        raise ValueError("realized must have one value per CDF row")
+
+    strikes, survival, counts = _compact_rows(strikes, survival)
+    if (counts < 1).any():
+        raise ValueError("Every row needs at least 1 strike to compute PIT")
+    return _interp_rows(strikes, survival, counts, realized[:, None])[:, 0]
+
 
-        try:
-            price = float(close_price)
-        except (ValueError, TypeError):
+def legacy_candle_prices(candles: list) -> dict:
+    """{timestamp: close probability} from cached candles, any schema.
+
+    Timestamp is end_period_ts (else period_start). Price is yes_price.close,
+    else price.close, else the yes bid/ask close midpoint (or whichever side
+    exists), in cents, converted to a probability. Later candles win on
+    duplicate timestamps.
+    """
+    prices = {}
+    for c in candles:
+        ts = c.get("end_period_ts") or c.get("period_start")
+        if not ts:
             continue
+        close_price = None
+        yes_price = c.get("yes_price", {})
+        if isinstance(yes_price, dict) and yes_price.get("close") is not None:
+            close_price = yes_price["close"]
+        if close_price is None:
+            price_obj = c.get("price", {})
+            if isinstance(price_obj, dict) and price_obj.get("close") is not None:
+                close_price = price_obj["close"]
+        if close_price is None:
+            yes_bid = c.get("yes_bid", {})
+            yes_ask = c.get("yes_ask", {})
+            bid_close = yes_bid.get("close") if isinstance(yes_bid, dict) else None
+            ask_close = yes_ask.get("close") if isinstance(yes_ask, dict) else None
+            if bid_close is not None and ask_close is not None:
+                close_price = (float(bid_close) + float(ask_close)) / 2.0
+            elif bid_close is not None:
+                close_price = float(bid_close)
+            elif ask_close is not None:
+                close_price = float(ask_close)
+        if close_price is not None:
+            try:
+                prices[ts] = float(close_price) / 100.0
+            except (ValueError, TypeError):
+                continue
+    return prices
+
 
-        actual_ts = best_candle.get("end_period_ts", target_ts)
-        cdf_points.append((strike, price, actual_ts))
+def align_candle_prices(
+    tickers_and_strikes: list[tuple[str, float]],
+    candles_by_ticker: dict[str, list],
+) -> tuple[np.ndarray, np.ndarray, np.ndarray] | None:
+    """Align raw candle lists into (timestamps, strikes, hours x strikes prices).
 
-    if len(cdf_points) < 2:
+    For candle sources outside the aligned price cache (e.g. per-series
+    candle dicts under data/new_series/), in the same shape
+    load_aligned_prices() returns, so build_pit_table() can use them.
+    Prices come from legacy_candle_prices().
+
+    Returns None if fewer than 2 tickers have any price.
+    """
+    tickers_and_strikes = sorted(tickers_and_strikes, key=lambda x: x[1])
+    price_series = {}
+    for ticker, _ in tickers_and_strikes:
+        prices = legacy_candle_prices(candles_by_ticker.get(ticker) or [])
+        if prices:
+            price_series[ticker] = prices
+    if len(price_series) < 2:
         return None
 
-    # Sort by strike (ascending)
-    cdf_points.sort(key=lambda x: x[0])
+    timestamps = sorted(set().union(*(ps.keys() for ps in price_series.values())))
+    row_of = {ts: i for i, ts in enumerate(timestamps)}
+    prices = np.full((len(timestamps), len(tickers_and_strikes)), np.nan)
+    for j, (ticker, _) in enumerate(tickers_and_strikes):
+        for ts, price in price_series.get(ticker, {}).items():
+            prices[row_of[ts], j] = price
+    strikes = np.array([strike for _, strike in tickers_and_strikes], dtype=float)
+    return np.array(timestamps), strikes, prices
+
+
+def build_pit_table(
+    events: pd.DataFrame,
+    horizons=(0.5,),
+    event_groups: dict[str, pd.DataFrame] | None = None,
+    aligned_prices: dict | None = None,
+    min_snapshots: int = 2,
+    clip: bool = False,
+) -> pd.DataFrame:
+    """PIT of the realized value for every event at every horizon.
+
+    Each event's aligned (hour x strike) price block is reduced to its
+    snapshots (hours with at least 2 priced strikes); the snapshot at
+    lifetime fraction h is index min(int(h * n), n - 1), so h = 0.5 is the
+    mid-life snapshots[n // 2] used throughout the analyses. The selected
+    rows of every event are stacked into one padded matrix and interpolated
+    in a single compute_pit_batch() call.
 
-    strikes = [p[0] for p in cdf_points]
-    cdf_values = [p[1] for p in cdf_points]
+    Parameters
+    ----------
+    events : pd.DataFrame
+        One row per event with event_ticker and realized; any other columns
+        (series, canonical_series, ...) are carried into the output.
+    horizons : sequence of float
+        Lifetime fractions in [0, 1].
+    event_groups : dict or None
+        {event_ticker: strike markets}, as experiment7's group_by_event()
+        returns; aligned through load_aligned_prices() (price cube and
+        snapshot cache).
+    aligned_prices : dict or None
+        {event_ticker: (timestamps, strikes, prices)} for events whose prices
+        come from elsewhere (see align_candle_prices()); takes precedence
+        over event_groups.
+    min_snapshots : int
+        Events with fewer snapshots are skipped.
+    clip : bool
+        Clip PIT to [0, 1].
 
-    # Use the median actual timestamp as the representative timestamp
-    actual_timestamps = [p[2] for p in cdf_points]
-    median_ts = sorted(actual_timestamps)[len(actual_timestamps) // 2]
-    timestamp = datetime.fromtimestamp(median_ts, tz=timezone.utc)
+    Returns
+    -------
+    pd.DataFrame
+        One row per (event, horizon): the event's columns plus horizon,
+        snapshot_idx, n_snapshots, timestamp, n_strikes, survival, pit.
+        Events without usable prices are absent.
+    """
+    horizons = np.asarray(horizons, dtype=float)
+    event_groups = event_groups or {}
+    aligned_prices = aligned_prices or {}
+
+    meta, strike_rows, price_rows, realized = [], [], [], []
+    for event in events.to_dict("records"):
+        event_ticker = event["event_ticker"]
+        if event_ticker in aligned_prices:
+            aligned = aligned_prices[event_ticker]
+        elif event_ticker in event_groups:
+            aligned = load_aligned_prices(event_groups[event_ticker])
+        else:
+            aligned = None
+        if aligned is None:
+            continue
+
+        timestamps, strikes, prices = aligned
+        order = np.argsort(strikes, kind="stable")
+        strikes = np.asarray(strikes, dtype=float)[order]
+        prices = np.asarray(prices, dtype=float)[:, order]
+        valid = ~np.isnan(prices)
+        snapshot_rows = np.flatnonzero(valid.sum(axis=1) >= 2)
+        n = len(snapshot_rows)
+        if n < max(min_snapshots, 1):
+            continue
 
-    return {
-        "strikes": strikes,
-        "cdf_values": cdf_values,
-        "timestamp": timestamp,
-    }
+        idx = np.minimum((horizons * n).astype(int), n - 1)
+        for h, i in zip(horizons, idx):
+            r = snapshot_rows[i]
+            meta.append({
+                **event,
+                "horizon": float(h),
+                "snapshot_idx": int(i),
+                "n_snapshots": n,
+                "timestamp": timestamps[r],
+                "n_strikes": int(valid[r].sum()),
+            })
+            strike_rows.append(np.where(valid[r], strikes, np.nan))
+            price_rows.append(prices[r])
+            realized.append(event["realized"])
+
+    table = pd.DataFrame(meta)
+    if not meta:
+        return table
+
+    width = max(len(row) for row in strike_rows)
+    strike_mat = np.full((len(strike_rows), width), np.nan)
+    price_mat = np.full((len(price_rows), width), np.nan)
+    for i, (srow, prow) in enumerate(zip(strike_rows, price_rows)):
+        strike_mat[i, :len(srow)] = srow
+        price_mat[i, :len(prow)] = prow
+
+    survival = _survival_at(strike_mat, price_mat, realized)
+    pit = 1.0 - survival
+    table["survival"] = survival
+    table["pit"] = np.clip(pit, 0.0, 1.0) if clip else pit
+    return table
 
 
 # ---------------------------------------------------------------------------
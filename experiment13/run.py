@@ -53,6 +53,7 @@ def main():
         fetch_historical_gdp,
     )
     from experiment13.horse_race import run_cpi_horse_race
+    from kalshi.resampling import bootstrap_means, bootstrap_ratios, permutation_test, ratio_of_means_ci
 
     # ================================================================
     # PHASE 1: LOAD MULTI-STRIKE MARKETS
@@ -422,44 +423,11 @@ def main():
             per_event_ratios = (valid["kalshi_crps"] / valid["point_crps"]).replace([np.inf, -np.inf], np.nan).dropna()
             median_per_event_ratio = float(per_event_ratios.median()) if len(per_event_ratios) > 0 else None
 
-            # BCa Bootstrap CI on ratio-of-means (bias-corrected and accelerated)
+            # BCa Bootstrap CI on ratio-of-means (bias-corrected and accelerated;
+            # percentile if BCa is undefined)
             crps_arr = valid["kalshi_crps"].values
             mae_arr = valid["point_crps"].values
-            paired_data = np.column_stack([crps_arr, mae_arr])
-
-            def _ratio_of_means(crps, mae, axis=None):
-                """Compute ratio of means for BCa bootstrap."""
-                crps_means = np.mean(crps, axis=axis)
-                mae_means = np.mean(mae, axis=axis)
-                with np.errstate(divide='ignore', invalid='ignore'):
-                    return crps_means / mae_means
-
-            try:
-                bca_result = stats.bootstrap(
-                    (crps_arr, mae_arr),
-                    statistic=_ratio_of_means,
-                    n_resamples=10000,
-                    method='BCa',
-                    confidence_level=0.95,
-                    random_state=np.random.default_rng(42),
-                )
-                ci_lo = float(bca_result.confidence_interval.low)
-                ci_hi = float(bca_result.confidence_interval.high)
-                bootstrap_method = "BCa"
-            except Exception:
-                # Fallback to percentile bootstrap if BCa fails
-                n_boot = 10000
-                boot_ratios = []
-                rng = np.random.default_rng(42)
-                for _ in range(n_boot):
-                    idx = rng.integers(0, len(valid), size=len(valid))
-                    boot_crps = crps_arr[idx].mean()
-                    boot_mae = mae_arr[idx].mean()
-                    if boot_mae > 0:
-                        boot_ratios.append(boot_crps / boot_mae)
-                ci_lo = float(np.percentile(boot_ratios, 2.5))
-                ci_hi = float(np.percentile(boot_ratios, 97.5))
-                bootstrap_method = "percentile"
+            _, ci_lo, ci_hi, bootstrap_method = ratio_of_means_ci(crps_arr, mae_arr, method="BCa", seed=42)
 
             crps_mae_results[series] = {
                 "n": len(valid),
@@ -497,36 +465,7 @@ def main():
             # BCa Bootstrap CI
             crps_arr = valid["kalshi_crps"].values
             mae_ta_arr = valid["point_crps_tail_aware"].values
-
-            def _ratio_of_means_ta(crps, mae, axis=None):
-                crps_means = np.mean(crps, axis=axis)
-                mae_means = np.mean(mae, axis=axis)
-                with np.errstate(divide='ignore', invalid='ignore'):
-                    return crps_means / mae_means
-
-            try:
-                bca_result_ta = stats.bootstrap(
-                    (crps_arr, mae_ta_arr),
-                    statistic=_ratio_of_means_ta,
-                    n_resamples=10000,
-                    method='BCa',
-                    confidence_level=0.95,
-                    random_state=np.random.default_rng(42),
-                )
-                ci_lo_ta = float(bca_result_ta.confidence_interval.low)
-                ci_hi_ta = float(bca_result_ta.confidence_interval.high)
-            except Exception:
-                n_boot = 10000
-                boot_ratios = []
-                rng = np.random.default_rng(42)
-                for _ in range(n_boot):
-                    idx = rng.integers(0, len(valid), size=len(valid))
-                    boot_crps = crps_arr[idx].mean()
-                    boot_mae = mae_ta_arr[idx].mean()
-                    if boot_mae > 0:
-                        boot_ratios.append(boot_crps / boot_mae)
-                ci_lo_ta = float(np.percentile(boot_ratios, 2.5))
-                ci_hi_ta = float(np.percentile(boot_ratios, 97.5))
+            _, ci_lo_ta, ci_hi_ta, _ = ratio_of_means_ci(crps_arr, mae_ta_arr, method="BCa", seed=42)
 
             crps_mae_ta_results[series] = {
                 "n": len(valid),
@@ -650,20 +589,17 @@ def main():
                         (jc_events["kalshi_crps"].mean() / jc_events["point_crps_tail_aware"].mean())
         all_crps = np.concatenate([cpi_events["kalshi_crps"].values, jc_events["kalshi_crps"].values])
         all_mae = np.concatenate([cpi_events["point_crps_tail_aware"].values, jc_events["point_crps_tail_aware"].values])
-        rng = np.random.RandomState(42)
-        n_perm = 10000
-        perm_diffs = np.zeros(n_perm)
         n_cpi = len(cpi_events)
-        for i in range(n_perm):
-            idx = rng.permutation(len(all_crps))
-            perm_cpi_crps = all_crps[idx[:n_cpi]]
-            perm_cpi_mae = all_mae[idx[:n_cpi]]
-            perm_jc_crps = all_crps[idx[n_cpi:]]
-            perm_jc_mae = all_mae[idx[n_cpi:]]
-            perm_cpi_ratio = perm_cpi_crps.mean() / max(perm_cpi_mae.mean(), 1e-10)
-            perm_jc_ratio = perm_jc_crps.mean() / max(perm_jc_mae.mean(), 1e-10)
-            perm_diffs[i] = perm_cpi_ratio - perm_jc_ratio
-        perm_p = float(np.mean(np.abs(perm_diffs) >= abs(observed_diff)))
+
+        def _ratio_diff(perms):
+            cpi_idx, jc_idx = perms[:, :n_cpi], perms[:, n_cpi:]
+            perm_cpi_ratio = all_crps[cpi_idx].mean(axis=1) / np.maximum(all_mae[cpi_idx].mean(axis=1), 1e-10)
+            perm_jc_ratio = all_crps[jc_idx].mean(axis=1) / np.maximum(all_mae[jc_idx].mean(axis=1), 1e-10)
+            return perm_cpi_ratio - perm_jc_ratio
+
+        perm_raw = permutation_test(_ratio_diff, len(all_crps), n_perm=10000, seed=np.random.RandomState(42))
+        perm_p = perm_raw["p_value"]
+        n_perm = perm_raw["n_permutations"]
         heterogeneity_results = {
             "cpi_aggregate_ratio": float(cpi_events["kalshi_crps"].mean() / cpi_events["point_crps_tail_aware"].mean()),
             "jc_aggregate_ratio": float(jc_events["kalshi_crps"].mean() / jc_events["point_crps_tail_aware"].mean()),
@@ -700,14 +636,14 @@ def main():
         # Uses interior-only ratios (stable, dimensionless) to avoid scale-mixing
         all_ratios_int = np.concatenate([cpi_per_event_int, jc_per_event_int])
         observed_ratio_diff = float(np.mean(cpi_per_event_int) - np.mean(jc_per_event_int))
-        rng_sf = np.random.RandomState(42)
-        n_perm_sf = 10000
-        perm_ratio_diffs = np.zeros(n_perm_sf)
         n_cpi_sf = len(cpi_per_event_int)
-        for i in range(n_perm_sf):
-            idx_sf = rng_sf.permutation(len(all_ratios_int))
-            perm_ratio_diffs[i] = np.mean(all_ratios_int[idx_sf[:n_cpi_sf]]) - np.mean(all_ratios_int[idx_sf[n_cpi_sf:]])
-        perm_p_scalefree = float(np.mean(np.abs(perm_ratio_diffs) >= abs(observed_ratio_diff)))
+        perm_sf = permutation_test(
+            lambda perms: (all_ratios_int[perms[:, :n_cpi_sf]].mean(axis=1)
+                           - all_ratios_int[perms[:, n_cpi_sf:]].mean(axis=1)),
+            len(all_ratios_int), n_perm=10000, seed=np.random.RandomState(42),
+        )
+        perm_p_scalefree = perm_sf["p_value"]
+        n_perm_sf = perm_sf["n_permutations"]
         heterogeneity_results["permutation_p_scalefree"] = perm_p_scalefree
         heterogeneity_results["permutation_observed_ratio_diff"] = observed_ratio_diff
         print(f"  Scale-free permutation test (interior-only ratios) p = {perm_p_scalefree:.4f} ({n_perm_sf} permutations)")
@@ -952,13 +888,7 @@ def main():
                 mae_arr = valid_mae["point_mae"].values
                 n_tp = len(valid_mae)
                 # Bootstrap ratio-of-means
-                boot_ratios = []
-                for _ in range(10000):
-                    idx = rng_temporal.integers(0, n_tp, size=n_tp)
-                    boot_crps = crps_arr[idx].mean()
-                    boot_mae = mae_arr[idx].mean()
-                    if boot_mae > 0:
-                        boot_ratios.append(boot_crps / boot_mae)
+                boot_ratios = bootstrap_ratios(crps_arr, mae_arr, n_boot=10000, seed=rng_temporal)
                 if len(boot_ratios) > 100:
                     ci_lo = float(np.percentile(boot_ratios, 2.5))
                     ci_hi = float(np.percentile(boot_ratios, 97.5))
@@ -988,13 +918,7 @@ def main():
                 crps_arr = valid_mae_ta["kalshi_crps"].values
                 mae_arr = valid_mae_ta["point_mae_ta"].values
                 n_tp = len(valid_mae_ta)
-                boot_ratios = []
-                for _ in range(10000):
-                    idx = rng_temporal_ta.integers(0, n_tp, size=n_tp)
-                    boot_crps = crps_arr[idx].mean()
-                    boot_mae = mae_arr[idx].mean()
-                    if boot_mae > 0:
-                        boot_ratios.append(boot_crps / boot_mae)
+                boot_ratios = bootstrap_ratios(crps_arr, mae_arr, n_boot=10000, seed=rng_temporal_ta)
                 if len(boot_ratios) > 100:
                     ci_lo = float(np.percentile(boot_ratios, 2.5))
                     ci_hi = float(np.percentile(boot_ratios, 97.5))
@@ -1162,12 +1086,8 @@ def main():
             n_in_tails = ((pit_df["pit"] < 0.1) | (pit_df["pit"] > 0.9)).sum()
 
             # Bootstrap CI on mean PIT
-            rng = np.random.default_rng(42)
-            boot_means = []
             pit_arr = pit_df["pit"].values
-            for _ in range(10000):
-                boot_idx = rng.integers(0, len(pit_arr), size=len(pit_arr))
-                boot_means.append(pit_arr[boot_idx].mean())
+            boot_means = bootstrap_means(pit_arr, n_boot=10000, seed=42)
             pit_ci_lo = float(np.percentile(boot_means, 2.5))
             pit_ci_hi = float(np.percentile(boot_means, 97.5))
 
@@ -1244,20 +1164,10 @@ def main():
     if len(cpi_crps_vals) >= 4:
         cpi_crps_arr = cpi_crps_vals["kalshi_crps"].values
         cpi_mae_arr = cpi_crps_vals["point_crps_tail_aware"].values
-        n_cpi_bb = len(cpi_crps_arr)
-        block_len = 2
-        n_blocks = (n_cpi_bb + block_len - 1) // block_len
-        rng_bb = np.random.RandomState(42)
-        boot_ratios_block = []
-        for _ in range(10000):
-            starts = rng_bb.randint(0, n_cpi_bb, size=n_blocks)
-            boot_idx = np.concatenate([np.arange(s, s + block_len) % n_cpi_bb for s in starts])[:n_cpi_bb]
-            boot_crps = cpi_crps_arr[boot_idx].mean()
-            boot_mae = cpi_mae_arr[boot_idx].mean()
-            if boot_mae > 0:
-                boot_ratios_block.append(boot_crps / boot_mae)
-        block_ci_lo = float(np.percentile(boot_ratios_block, 2.5))
-        block_ci_hi = float(np.percentile(boot_ratios_block, 97.5))
+        _, block_ci_lo, block_ci_hi, _ = ratio_of_means_ci(
+            cpi_crps_arr, cpi_mae_arr, method="percentile",
+            seed=np.random.RandomState(42), block_len=2,
+        )
         block_ci_excludes_1 = block_ci_lo > 1.0
         print(f"\n  Block bootstrap CPI CRPS/MAE CI (block_len=2, 10000 resamples):")
         print(f"    CI: [{block_ci_lo:.2f}, {block_ci_hi:.2f}]")
@@ -9,7 +9,6 @@ Reuses experiment5's cached settled markets where available.
 
 import os
 import json
-import time
 import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta, timezone
@@ -136,48 +135,23 @@ def load_settled_markets(client=None, max_markets: int = None) -> list:
     two_days_ago = int((datetime.now(timezone.utc) - timedelta(days=2)).timestamp())
 
     print("Fetching ALL settled markets from past 12 months...")
-    all_markets = []
-    cursor = None
-    page_limit = 1000
-
-    pbar = tqdm(desc="Fetching markets", unit=" markets")
 
-    while True:
-        params = {
+    # Resumable: a crashed crawl picks up from the last checkpointed cursor
+    from kalshi.client import fetch_all_resumable
+    all_markets = fetch_all_resumable(
+        client,
+        "/markets",
+        our_cache,
+        params={
             "status": "settled",
             "min_settled_ts": twelve_months_ago,
             "max_settled_ts": two_days_ago,
-            "limit": page_limit,
-        }
-        if cursor:
-            params["cursor"] = cursor
-
-        resp = client.get("/markets", params=params)
-        items = resp.get("markets", [])
-
-        if not items:
-            break
-
-        all_markets.extend(items)
-        pbar.update(len(items))
-
-        if max_markets and len(all_markets) >= max_markets:
-            all_markets = all_markets[:max_markets]
-            break
-
-        cursor = resp.get("cursor", "")
-        if not cursor:
-            break
-
-        time.sleep(0.7)
-
-    pbar.close()
+        },
+        result_key="markets",
+        max_items=max_markets,
+    )
     print(f"  Fetched {len(all_markets)} total settled markets")
 
-    os.makedirs(RAW_DIR, exist_ok=True)
-    with open(our_cache, "w") as f:
-        json.dump(all_markets, f, indent=2, default=str)
-
     return all_markets
 
 
@@ -247,8 +221,6 @@ def fetch_targeted_markets(client, series_tickers: list = None) -> list:
                     seen_tickers.add(ticker)
                     all_markets.append(m)
 
-            time.sleep(0.7)
-
         except Exception as e:
             print(f"  Warning: failed to fetch series {series}: {e}")
             continue
@@ -320,42 +292,53 @@ def fetch_candles_for_market(
     client, ticker: str, series_ticker: str,
     start_ts: int, end_ts: int,
     period_interval: int = 60,
+    refresh: bool = False,
 ) -> list:
     """Fetch candlestick data for a single market.
 
     Args:
         period_interval: 60 = hourly, 1440 = daily. Hourly gives better
             coverage for short-lived markets.
-
-    Returns list of candlestick dicts.
+        refresh: If the market is already cached, fetch only the periods after
+            the last cached end_period_ts (up to min(end_ts, now)) and append
+            them, instead of returning the cache as-is.
+
+    Returns list of candlestick dicts, or None if the request still failed
+    after the client's retries. Failures are not cached, so the next run
+    retries them instead of treating the market as having no data. A failed
+    refresh returns the existing cache.
     """
+    from kalshi.candles import refresh_candles
+    from kalshi.candle_manifest import record_candles
+
     cache_path = os.path.join(
         RAW_DIR, "candles", f"{ticker.replace('/', '_')}_{period_interval}.json"
     )
 
+    cached = None
     if os.path.exists(cache_path):
         with open(cache_path) as f:
-            return json.load(f)
+            cached = json.load(f)
+        if not refresh:
+            return cached
 
+    end_ts = min(end_ts, int(datetime.now(timezone.utc).timestamp()))
     try:
-        candles = client.get_all_pages(
-            f"/series/{series_ticker}/markets/{ticker}/candlesticks",
-            params={
-                "start_ts": start_ts,
-                "end_ts": end_ts,
-                "period_interval": period_interval,
-            },
-            result_key="candlesticks",
+        candles, n_new = refresh_candles(
+            client, ticker, series_ticker, cached or [],
+            start_ts, end_ts, period_interval=period_interval,
         )
+    except Exception as e:
+        print(f"  Candle fetch failed for {ticker}: {e}")
+        return cached
 
+    if cached is None or n_new:
         os.makedirs(os.path.dirname(cache_path), exist_ok=True)
         with open(cache_path, "w") as f:
             json.dump(candles, f, indent=2, default=str)
+        record_candles(os.path.dirname(cache_path), ticker.replace("/", "_"), candles, period_interval)
 
-        return candles
-
-    except Exception as e:
-        return []
+    return candles
 
 
 def extract_candle_price(candle: dict) -> float:
@@ -397,8 +380,46 @@ def extract_candle_price(candle: dict) -> float:
     return np.nan
 
 
+def prefetch_candles(
+    client, df: pd.DataFrame, period_interval: int = 60, max_concurrency: int = 8,
+) -> None:
+    """Warm the per-ticker candle cache for every uncached market in df, concurrently.
+
+    After this, fetch_candles_for_market() is a cache read for each of these
+    tickers. Failed fetches are not cached, so they are retried on the next run.
+    """
+    from kalshi.async_client import fetch_many_candles
+
+    candle_dir = os.path.join(RAW_DIR, "candles")
+    specs = []
+    for _, row in df.iterrows():
+        ticker = row["ticker"]
+        if pd.isna(row["open_time"]) or pd.isna(row["close_time"]):
+            continue
+        cache_path = os.path.join(
+            candle_dir, f"{ticker.replace('/', '_')}_{period_interval}.json"
+        )
+        if os.path.exists(cache_path):
+            continue
+        specs.append((
+            ticker, row["series_ticker"],
+            int(row["open_time"].timestamp()), int(row["close_time"].timestamp()),
+        ))
+
+    if not specs:
+        return
+
+    print(f"Prefetching candles for {len(specs)} uncached markets "
+          f"({max_concurrency} concurrent)...")
+    fetch_many_candles(
+        specs, client=client, max_concurrency=max_concurrency,
+        period_interval=period_interval, cache_dir=candle_dir,
+    )
+
+
 def fetch_all_market_candles(
-    client, df: pd.DataFrame, max_markets: int = None
+    client, df: pd.DataFrame, max_markets: int = None, max_concurrency: int = 8,
+    refresh_days: int = 0,
 ) -> dict:
     """Fetch candlestick data for all KUI-relevant markets and aggregate to daily.
 
@@ -409,12 +430,17 @@ def fetch_all_market_candles(
         client: KalshiClient
         df: Market dataset (from prepare_market_dataset)
         max_markets: Optional cap for testing
+        max_concurrency: Candle requests in flight during the prefetch.
+            1 = fetch serially inside the main loop.
+        refresh_days: If > 0, rebuild the daily-price cache and incrementally
+            refresh the candle caches of markets still open or closed within
+            the last refresh_days days (nightly update of active series).
 
     Returns:
         Dict mapping ticker -> list of (date_str, price) tuples (daily)
     """
     candles_cache = os.path.join(DATA_DIR, "daily_prices_by_ticker.json")
-    if os.path.exists(candles_cache):
+    if os.path.exists(candles_cache) and not refresh_days:
         print(f"Loading cached daily prices from {candles_cache}...")
         with open(candles_cache) as f:
             return json.load(f)
@@ -423,9 +449,16 @@ def fetch_all_market_candles(
     if max_markets:
         markets_to_fetch = df.head(max_markets)
 
+    if max_concurrency > 1:
+        prefetch_candles(client, markets_to_fetch, period_interval=60,
+                         max_concurrency=max_concurrency)
+
+    refresh_after = pd.Timestamp.now(tz="UTC") - pd.Timedelta(days=refresh_days)
+
     print(f"Fetching hourly candles for {len(markets_to_fetch)} markets...")
     daily_prices = {}
     n_empty = 0
+    n_failed = 0
 
     for _, row in tqdm(markets_to_fetch.iterrows(), total=len(markets_to_fetch),
                        desc="Fetching candles"):
@@ -444,8 +477,12 @@ def fetch_all_market_candles(
         candles = fetch_candles_for_market(
             client, ticker, series_ticker, start_ts, end_ts,
             period_interval=60,  # Hourly candles
+            refresh=refresh_days > 0 and close_time >= refresh_after,
         )
 
+        if candles is None:
+            n_failed += 1
+            continue
         if not candles:
             n_empty += 1
             continue
@@ -463,10 +500,10 @@ def fetch_all_market_candles(
         if hourly_prices:
             daily_prices[ticker] = sorted(hourly_prices.items())
 
-        time.sleep(0.1)
-
     print(f"  Markets with candle data: {len(daily_prices)}")
     print(f"  Markets with no data: {n_empty}")
+    if n_failed:
+        print(f"  Markets whose fetch failed (not cached, re-run to retry): {n_failed}")
 
     # Cache results
     os.makedirs(DATA_DIR, exist_ok=True)
@@ -314,6 +314,66 @@ class TestValidation:
         # Just check the function runs without error
         assert isinstance(result["p_value"], float)
 
+    def test_granger_nested_rss_matches_lstsq(self):
+        from experiment2.validation import _lstsq_rss, _nested_lag_rss
+
+        rng = np.random.RandomState(3)
+        x = rng.randn(80)
+        y = np.round(np.cumsum(rng.randn(80)) * 0.1, 2)
+
+        rss_r, ok_r = _nested_lag_rss([y], [y], 6)
+        rss_u, ok_u = _nested_lag_rss([y, x], [y], 6)
+        assert ok_r.all() and ok_u.all()
+        for lag in range(1, 7):
+            expected_r, expected_u = _lstsq_rss(x, y, lag)
+            assert rss_r[lag - 1, 0] == pytest.approx(expected_r, rel=1e-9)
+            assert rss_u[lag - 1, 0] == pytest.approx(expected_u, rel=1e-9)
+
+    def test_granger_causality_pair(self):
+        from experiment2.validation import granger_causality_pair, granger_causality_test
+
+        rng = np.random.RandomState(7)
+        dates = pd.date_range("2025-06-01", periods=120, freq="h")
+        a = pd.Series(rng.randn(120), index=dates)
+        b = pd.Series(np.r_[0.0, 0.6 * a.values[:-1]] + rng.randn(120) * 0.5, index=dates)
+        b.iloc[::9] = np.nan  # pair aligns on the common index
+
+        ab, ba = granger_causality_pair(a, b, max_lag=8)
+        assert ab == granger_causality_test(a, b, max_lag=8)
+        assert ba == granger_causality_test(b, a, max_lag=8)
+        assert ab["significant"]
+
+    def test_granger_causality_batch(self):
+        from experiment2.validation import granger_causality_batch, granger_causality_pair
+
+        rng = np.random.RandomState(11)
+        n = 90
+        a = rng.randn(7, n)
+        b = 0.5 * np.roll(a, 2, axis=1) + rng.randn(7, n)
+        b[3] = rng.randn(n)  # no causality
+        b[4, ::3] = 0.0
+        # Strong signals: several lags' corrected p-values round to 0.0, and
+        # the serial rule keeps the earliest of them even when a later lag's
+        # unrounded p-value is smaller
+        b[5] = 0.9 * np.roll(a[5], 2) + 0.1 * rng.randn(n)
+        b[6] = 0.6 * np.roll(a[6], 1) + 0.9 * np.roll(a[6], 2) + 0.7 * rng.randn(n)
+
+        ab, ba = granger_causality_batch(a, b, max_lag=6)
+        dates = pd.date_range("2025-06-01", periods=n, freq="h")
+        for i in range(len(a)):
+            expected_ab, expected_ba = granger_causality_pair(
+                pd.Series(a[i], index=dates), pd.Series(b[i], index=dates), max_lag=6
+            )
+            for table, expected in ((ab, expected_ab), (ba, expected_ba)):
+                row = table.iloc[i]
+                assert (None if pd.isna(row["best_lag"]) else row["best_lag"]) == expected["best_lag"]
+                assert row["f_stat"] == expected["f_stat"]
+                assert row["p_value"] == expected["p_value"]
+                assert row["n_obs"] == expected["n_obs"]
+
+        short_ab, _ = granger_causality_batch(a[:, :20], b[:, :20], max_lag=6)
+        assert short_ab["best_lag"].isna().all()
+
     def test_compute_realized_volatility(self):
         from experiment2.validation import compute_realized_volatility
 
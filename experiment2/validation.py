@@ -12,7 +12,9 @@ Tests:
 
 import numpy as np
 import pandas as pd
+from scipy import special as scipy_special
 from scipy import stats as scipy_stats
+from scipy.linalg import qr_insert
 
 
 def align_series(*series_list, min_overlap: int = 20) -> pd.DataFrame:
@@ -99,6 +101,161 @@ def compute_correlations(
     return pd.DataFrame(results)
 
 
+# Lags whose design has min|R_ii| below this fraction of max|R_ii| are refit with
+# lstsq, which handles (near-)rank-deficient designs with a cutoff of its own
+_GRANGER_RANK_TOL = 1e-6
+
+
+def _lag_matrix(series_list: list[np.ndarray], max_lag: int) -> np.ndarray:
+    """Intercept, then lag 1 of each series, lag 2 of each, ... up to max_lag.
+
+    The lag-p model is the first 1 + len(series_list) * p columns. Entries
+    before the start of the series are zero; the lag-p fit only uses rows
+    p..n-1, where every lag <= p is defined.
+    """
+    n = len(series_list[0])
+    columns = [np.ones(n)]
+    for lag in range(1, max_lag + 1):
+        for values in series_list:
+            column = np.zeros(n)
+            column[lag:] = values[:n - lag]
+            columns.append(column)
+    return np.column_stack(columns)
+
+
+def _nested_lag_rss(
+    series_list: list[np.ndarray], targets: list[np.ndarray], max_lag: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """RSS of each target on the lag-p design fitted over rows p..n-1, for p = 1..max_lag.
+
+    One QR of the augmented matrix [design | targets] over rows max_lag..n-1,
+    the rows every lag shares. Stepping down from max_lag, each lag inserts
+    one more row into that factorization (a Givens update, no refactoring).
+    The lag-p model is a column prefix of the design, so its RSS for a target
+    is the sum of squares of that target's R column below the prefix.
+
+    Returns:
+        (rss, well_conditioned): rss is (max_lag, len(targets)); well_conditioned
+        is False for lags whose design is (near-)rank-deficient
+    """
+    design = _lag_matrix(series_list, max_lag)
+    n_cols = design.shape[1]
+    augmented = np.column_stack([design, *targets])
+
+    rss = np.empty((max_lag, len(targets)))
+    well_conditioned = np.zeros(max_lag, dtype=bool)
+    r = np.linalg.qr(augmented[max_lag:], mode="r")
+    q = np.eye(len(r))
+    for lag in range(max_lag, 0, -1):
+        if lag < max_lag:
+            q, r = qr_insert(q, r, augmented[lag], 0, which="row", check_finite=False)
+        k = 1 + len(series_list) * lag
+        rss[lag - 1] = (r[k:, n_cols:] ** 2).sum(axis=0)
+        diag = np.abs(np.diag(r)[:k])
+        well_conditioned[lag - 1] = len(diag) == k and diag.min() > _GRANGER_RANK_TOL * diag.max()
+    return rss, well_conditioned
+
+
+def _lstsq_rss(x_vals: np.ndarray, y_vals: np.ndarray, lag: int) -> tuple[float, float]:
+    """Restricted and unrestricted RSS at one lag via two lstsq fits."""
+    n = len(y_vals)
+    y_target = y_vals[lag:]
+    X_restricted = np.column_stack([np.ones(n - lag)] + [y_vals[lag - i - 1: n - i - 1] for i in range(lag)])
+    X_unrestricted = np.column_stack([X_restricted] + [x_vals[lag - i - 1: n - i - 1] for i in range(lag)])
+
+    beta_r = np.linalg.lstsq(X_restricted, y_target, rcond=None)[0]
+    beta_u = np.linalg.lstsq(X_unrestricted, y_target, rcond=None)[0]
+    return (
+        float(np.sum((y_target - X_restricted @ beta_r) ** 2)),
+        float(np.sum((y_target - X_unrestricted @ beta_u) ** 2)),
+    )
+
+
+def _empty_granger_result() -> dict:
+    return {
+        "best_lag": None,
+        "f_stat": np.nan,
+        "p_value": np.nan,
+        "significant": False,
+        "n_obs": 0,
+    }
+
+
+def _granger_from_rss(
+    x_vals: np.ndarray,
+    y_vals: np.ndarray,
+    max_lag: int,
+    rss_restricted: np.ndarray,
+    rss_unrestricted: np.ndarray,
+    well_conditioned: np.ndarray,
+) -> dict:
+    """Best-lag F-test for x -> y given per-lag restricted/unrestricted RSS."""
+    n = len(y_vals)
+    best_result = {"best_lag": None, "f_stat": 0, "p_value": 1.0, "significant": False, "n_obs": n}
+
+    candidates = []
+    for lag in range(1, max_lag + 1):
+        if n <= 2 * lag + 2:
+            continue
+
+        n_obs = n - lag
+        df1 = lag  # Number of added x-lag parameters
+        df2 = n_obs - (2 * lag + 1)
+        if df2 <= 0:
+            continue
+
+        if well_conditioned[lag - 1]:
+            rss_r = rss_restricted[lag - 1]
+            rss_u = rss_unrestricted[lag - 1]
+        else:
+            try:
+                rss_r, rss_u = _lstsq_rss(x_vals, y_vals, lag)
+            except np.linalg.LinAlgError:
+                continue
+
+        if rss_u <= 0:
+            continue
+
+        # Guard against F-stat overflow from near-zero residuals
+        # (overfitting when lags ≈ n_obs)
+        if rss_u < 1e-12 or rss_r < 1e-12:
+            continue
+        if rss_r < rss_u:
+            # Unrestricted model is worse — no Granger causality
+            continue
+
+        f_stat = ((rss_r - rss_u) / df1) / (rss_u / df2)
+
+        # Reject absurd F-stats (numerical artifact)
+        if not np.isfinite(f_stat) or f_stat > 1e6:
+            continue
+        candidates.append((lag, f_stat, df1, df2, n_obs))
+
+    if not candidates:
+        return best_result
+
+    # One vectorized F survival call for every candidate lag (scipy's f.cdf is fdtr)
+    lags, f_stats, df1s, df2s, n_obss = zip(*candidates)
+    p_values = 1 - scipy_special.fdtr(df1s, df2s, f_stats)
+
+    for lag, f_stat, p_value, n_obs in zip(lags, f_stats, p_values, n_obss):
+        # Correct for testing multiple lags (within-pair Bonferroni)
+        # Without this, selecting the best of 24 lags inflates significance
+        p_corrected = min(p_value * max_lag, 1.0)
+
+        if p_corrected < best_result["p_value"]:
+            best_result = {
+                "best_lag": lag,
+                "f_stat": round(float(f_stat), 4),
+                "p_value": round(float(p_corrected), 6),
+                "p_value_raw": round(float(p_value), 6),
+                "significant": p_corrected < 0.05,
+                "n_obs": n_obs,
+            }
+
+    return best_result
+
+
 def granger_causality_test(
     x: pd.Series, y: pd.Series, max_lag: int = 5
 ) -> dict:
@@ -108,6 +265,9 @@ def granger_causality_test(
         Restricted: y(t) = a0 + a1*y(t-1) + ... + ap*y(t-p)
         Unrestricted: y(t) = a0 + a1*y(t-1) + ... + ap*y(t-p) + b1*x(t-1) + ... + bp*x(t-p)
 
+    The restricted and unrestricted RSS for every lag 1..max_lag come from one
+    nested QR per model (see _nested_lag_rss) rather than two lstsq fits per lag.
+
     Args:
         x: Potential "cause" series
         y: Potential "effect" series
@@ -119,93 +279,255 @@ def granger_causality_test(
     try:
         aligned = align_series(x.rename("x"), y.rename("y"), min_overlap=max_lag + 20)
     except ValueError:
-        return {
-            "best_lag": None,
-            "f_stat": np.nan,
-            "p_value": np.nan,
-            "significant": False,
-            "n_obs": 0,
-        }
+        return _empty_granger_result()
 
     x_vals = aligned["x"].values
     y_vals = aligned["y"].values
-    n = len(y_vals)
+    rss_r, ok_r = _nested_lag_rss([y_vals], [y_vals], max_lag)
+    rss_u, ok_u = _nested_lag_rss([y_vals, x_vals], [y_vals], max_lag)
+    return _granger_from_rss(x_vals, y_vals, max_lag, rss_r[:, 0], rss_u[:, 0], ok_r & ok_u)
 
-    best_result = {"best_lag": None, "f_stat": 0, "p_value": 1.0, "significant": False, "n_obs": n}
 
+def granger_causality_pair(
+    a: pd.Series, b: pd.Series, max_lag: int = 5
+) -> tuple[dict, dict]:
+    """Granger tests in both directions, (a -> b, b -> a), sharing work.
+
+    Both unrestricted models regress on the same lags of a and b, so a single
+    QR with both series as targets serves A -> B and B -> A; each direction
+    adds only its restricted (own-lags) QR. Results equal two
+    granger_causality_test calls.
+    """
+    try:
+        aligned = align_series(a.rename("a"), b.rename("b"), min_overlap=max_lag + 20)
+    except ValueError:
+        return _empty_granger_result(), _empty_granger_result()
+
+    a_vals = aligned["a"].values
+    b_vals = aligned["b"].values
+    rss_u, ok_u = _nested_lag_rss([a_vals, b_vals], [a_vals, b_vals], max_lag)
+    rss_ra, ok_ra = _nested_lag_rss([a_vals], [a_vals], max_lag)
+    rss_rb, ok_rb = _nested_lag_rss([b_vals], [b_vals], max_lag)
+    return (
+        _granger_from_rss(a_vals, b_vals, max_lag, rss_rb[:, 0], rss_u[:, 1], ok_rb & ok_u),
+        _granger_from_rss(b_vals, a_vals, max_lag, rss_ra[:, 0], rss_u[:, 0], ok_ra & ok_u),
+    )
+
+
+# Gram-matrix fits square the conditioning, so the batch engine refits a lag
+# with lstsq unless every Cholesky pivot keeps this fraction of its column's norm
+# and the residual keeps _GRANGER_GRAM_RSS_TOL of the target's sum of squares
+# (RSS from a Gram matrix loses digits as the fit approaches exact)
+_GRANGER_GRAM_TOL = 1e-4
+_GRANGER_GRAM_RSS_TOL = 1e-4
+
+# Lag-matrix entries per batch chunk (32 MB of float64)
+_GRANGER_BATCH_ELEMENTS = 1 << 22
+
+
+def _batched_lag_matrix(a: np.ndarray, b: np.ndarray, max_lag: int) -> np.ndarray:
+    """Stack of _lag_matrix([a, b]) per pair with the a and b columns appended."""
+    n_pairs, n = a.shape
+    matrix = np.zeros((n_pairs, n, 2 * max_lag + 3))
+    matrix[:, :, 0] = 1.0
     for lag in range(1, max_lag + 1):
-        if n <= 2 * lag + 2:
-            continue
+        matrix[:, lag:, 2 * lag - 1] = a[:, :n - lag]
+        matrix[:, lag:, 2 * lag] = b[:, :n - lag]
+    matrix[:, :, -2] = a
+    matrix[:, :, -1] = b
+    return matrix
 
-        # Build lagged matrices
-        y_target = y_vals[lag:]
-        n_obs = len(y_target)
 
-        # Restricted model: y lags only
-        X_restricted = np.column_stack([
-            y_vals[lag - i - 1: n - i - 1] for i in range(lag)
-        ])
-        X_restricted = np.column_stack([np.ones(n_obs), X_restricted])
+def _cholesky_stack(grams: np.ndarray) -> np.ndarray:
+    """Batched Cholesky; matrices that are not positive definite come back NaN.
 
-        # Unrestricted model: y lags + x lags
-        X_unrestricted = np.column_stack([
-            X_restricted,
-            *[x_vals[lag - i - 1: n - i - 1] for i in range(lag)]
-        ])
+    One singular matrix fails the whole LAPACK call, so failing stacks are
+    bisected until the bad matrices are isolated.
+    """
+    try:
+        return np.linalg.cholesky(grams)
+    except np.linalg.LinAlgError:
+        if len(grams) == 1:
+            return np.full_like(grams, np.nan)
+        mid = len(grams) // 2
+        return np.concatenate([_cholesky_stack(grams[:mid]), _cholesky_stack(grams[mid:])])
 
-        # OLS for both models
-        try:
-            # Restricted
-            beta_r, rss_r, _, _ = np.linalg.lstsq(X_restricted, y_target, rcond=None)
-            resid_r = y_target - X_restricted @ beta_r
-            rss_r = np.sum(resid_r ** 2)
 
-            # Unrestricted
-            beta_u, rss_u, _, _ = np.linalg.lstsq(X_unrestricted, y_target, rcond=None)
-            resid_u = y_target - X_unrestricted @ beta_u
-            rss_u = np.sum(resid_u ** 2)
+def _gram_tail_rss(
+    gram: np.ndarray, columns: list[int], fits: list[tuple[int, int]]
+) -> list[tuple[np.ndarray, np.ndarray]]:
+    """RSS of target columns on column prefixes, per pair, from Gram matrices.
 
-            # F-test
-            df1 = lag  # Number of added x-lag parameters
-            df2 = n_obs - X_unrestricted.shape[1]
+    The Cholesky factor L of the Gram matrix of the selected columns is the
+    transposed R of their QR, so the RSS of column t on the first k columns is
+    the sum of squares of L[t, k:t + 1].
 
-            if df2 <= 0 or rss_u <= 0:
-                continue
+    Args:
+        gram: (pairs, K, K) Gram matrices
+        columns: Columns to factor, in prefix order
+        fits: (k, t) pairs of prefix length and target position within columns
 
-            # Guard against F-stat overflow from near-zero residuals
-            # (overfitting when lags ≈ n_obs)
-            if rss_u < 1e-12 or rss_r < 1e-12:
-                continue
-            if rss_r < rss_u:
-                # Unrestricted model is worse — no Granger causality
-                continue
+    Returns:
+        (rss, well_conditioned) per fit, one entry per pair
+    """
+    columns = np.asarray(columns)
+    sub = gram[:, columns[:, None], columns]
+    chol = _cholesky_stack(sub)
+    norms = np.sqrt(np.diagonal(sub, axis1=1, axis2=2))
+    with np.errstate(invalid="ignore"):
+        conditioned = np.diagonal(chol, axis1=1, axis2=2) > _GRANGER_GRAM_TOL * norms
+        out = []
+        for k, t in fits:
+            rss = (chol[:, t, k:t + 1] ** 2).sum(axis=1)
+            well_conditioned = conditioned[:, :k].all(axis=1) & (rss > _GRANGER_GRAM_RSS_TOL * norms[:, t] ** 2)
+            out.append((rss, well_conditioned))
+    return out
+
+
+def _batched_lag_rss(a: np.ndarray, b: np.ndarray, max_lag: int) -> dict[str, np.ndarray]:
+    """Restricted and unrestricted RSS for both directions, every pair and lag.
+
+    One Gram matrix per pair over the rows all lags share; each lower lag adds
+    its extra row as a rank-1 update. Per lag, one Cholesky with columns
+    [1, a lags, b lags, a, b] gives a's own-lag and full fits and b's full
+    fit; one with [1, b lags, a lags, b] gives b's own-lag fit. Lags that are
+    not well conditioned come back as NaN for the caller to refit.
 
-            f_stat = ((rss_r - rss_u) / df1) / (rss_u / df2)
+    Returns:
+        Dict of (pairs, max_lag) arrays: rss_r_a / rss_u_a (a's own-lag and
+        full fits, for b -> a) and rss_r_b / rss_u_b (for a -> b)
+    """
+    n_pairs = a.shape[0]
+    matrix = _batched_lag_matrix(a, b, max_lag)
+    shared = matrix[:, max_lag:]
+    gram = np.matmul(shared.transpose(0, 2, 1), shared)
+    target_a, target_b = matrix.shape[2] - 2, matrix.shape[2] - 1
+
+    out = {key: np.empty((n_pairs, max_lag)) for key in ("rss_r_a", "rss_u_a", "rss_r_b", "rss_u_b")}
+    for lag in range(max_lag, 0, -1):
+        if lag < max_lag:
+            row = matrix[:, lag]
+            gram += row[:, :, None] * row[:, None, :]
+        lags_a = list(range(1, 2 * lag, 2))
+        lags_b = list(range(2, 2 * lag + 1, 2))
+        k_r, k_u = 1 + lag, 1 + 2 * lag
+        fits = _gram_tail_rss(
+            gram, [0, *lags_a, *lags_b, target_a, target_b], [(k_r, k_u), (k_u, k_u), (k_u, k_u + 1)]
+        )
+        fits += _gram_tail_rss(gram, [0, *lags_b, *lags_a, target_b], [(k_r, k_u)])
+        for key, (rss, well_conditioned) in zip(("rss_r_a", "rss_u_a", "rss_u_b", "rss_r_b"), fits):
+            out[key][:, lag - 1] = np.where(well_conditioned, rss, np.nan)
+    return out
 
-            # Reject absurd F-stats (numerical artifact)
-            if not np.isfinite(f_stat) or f_stat > 1e6:
-                continue
 
-            p_value = 1 - scipy_stats.f.cdf(f_stat, df1, df2)
+def _granger_select(
+    x: np.ndarray, y: np.ndarray, max_lag: int, rss_restricted: np.ndarray, rss_unrestricted: np.ndarray
+) -> dict[str, np.ndarray]:
+    """Vectorized _granger_from_rss over a stack of equal-length x -> y tests.
 
-            # Correct for testing multiple lags (within-pair Bonferroni)
-            # Without this, selecting the best of 24 lags inflates significance
-            p_corrected = min(p_value * max_lag, 1.0)
+    NaN RSS entries are refit with lstsq, as _granger_from_rss does for
+    lags flagged ill-conditioned.
+    """
+    n_pairs, n = y.shape
+    rss_r = rss_restricted.copy()
+    rss_u = rss_unrestricted.copy()
+    lags = np.arange(1, max_lag + 1)
+    n_obs = n - lags
+    df2 = n_obs - (2 * lags + 1)
+    testable = (n > 2 * lags + 2) & (df2 > 0)
+
+    refit = (np.isnan(rss_r) | np.isnan(rss_u)) & testable
+    for i, j in zip(*np.nonzero(refit)):
+        try:
+            rss_r[i, j], rss_u[i, j] = _lstsq_rss(x[i], y[i], j + 1)
+        except np.linalg.LinAlgError:
+            rss_r[i, j] = rss_u[i, j] = np.nan
+
+    with np.errstate(invalid="ignore", divide="ignore", over="ignore"):
+        f_stats = ((rss_r - rss_u) / lags) / (rss_u / np.maximum(df2, 1))
+        candidate = (
+            testable
+            & (rss_u >= 1e-12) & (rss_r >= 1e-12)
+            & (rss_r >= rss_u)
+            & np.isfinite(f_stats) & (f_stats <= 1e6)
+        )
+    f_stats = np.where(candidate, f_stats, 0.0)
+    p_raw = 1 - scipy_special.fdtr(lags, np.maximum(df2, 1), f_stats)
+    p_corrected = np.where(candidate, np.minimum(p_raw * max_lag, 1.0), np.inf)
+
+    # Walk the lags in order as _granger_from_rss does: a lag wins only if it
+    # beats the best p-value so far as reported (rounded to 6 places), so the
+    # earliest of several lags whose p-values round alike is kept.
+    best = np.full(n_pairs, -1)
+    best_reported = np.ones(n_pairs)
+    for j in range(max_lag):
+        better = np.nonzero(p_corrected[:, j] < best_reported)[0]
+        best[better] = j
+        best_reported[better] = [round(float(p), 6) for p in p_corrected[better, j]]
+
+    found = best >= 0
+    best = np.maximum(best, 0)
+    rows = np.arange(n_pairs)
+    best_f = f_stats[rows, best]
+    best_p = p_corrected[rows, best]
+    best_raw = p_raw[rows, best]
+    best_lag = pd.array(best + 1, dtype="Int64")
+    best_lag[~found] = pd.NA
+    return {
+        "best_lag": best_lag,
+        "f_stat": np.array([round(float(f), 4) if ok else 0.0 for f, ok in zip(best_f, found)]),
+        "p_value": np.array([round(float(p), 6) if ok else 1.0 for p, ok in zip(best_p, found)]),
+        "p_value_raw": np.array([round(float(p), 6) if ok else np.nan for p, ok in zip(best_raw, found)]),
+        "significant": found & (best_p < 0.05),
+        "n_obs": np.where(found, n - (best + 1), n),
+    }
 
-            if p_corrected < best_result["p_value"]:
-                best_result = {
-                    "best_lag": lag,
-                    "f_stat": round(float(f_stat), 4),
-                    "p_value": round(float(p_corrected), 6),
-                    "p_value_raw": round(float(p_value), 6),
-                    "significant": p_corrected < 0.05,
-                    "n_obs": n_obs,
-                }
 
-        except np.linalg.LinAlgError:
-            continue
+def granger_causality_batch(
+    a: np.ndarray, b: np.ndarray, max_lag: int = 5
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Granger tests in both directions for a stack of equal-length pairs.
 
-    return best_result
+    Row i of a and b is one pair's aligned, NaN-free values. Per-pair fits
+    become batched matmul/Cholesky calls over (pairs, n, lags) arrays, chunked
+    to bound memory. Lags are selected by the same rule as
+    granger_causality_pair; the RSS values come from a different
+    factorization, so a reported f_stat or p-value can differ from the serial
+    one in its last digit, and a lag choice can flip where two lags' rounded
+    p-values are that close.
+
+    Args:
+        a: (n_pairs, n) array of the first series of each pair
+        b: (n_pairs, n) array of the second series
+        max_lag: Maximum lag to test
+
+    Returns:
+        (a -> b, b -> a) tables with one row per pair: best_lag (<NA> when no
+        lag qualifies), f_stat, p_value, p_value_raw, significant, n_obs
+    """
+    a = np.asarray(a, dtype=float)
+    b = np.asarray(b, dtype=float)
+    n_pairs, n = a.shape
+
+    if n < max_lag + 20:
+        empty = pd.DataFrame({
+            "best_lag": pd.array([pd.NA] * n_pairs, dtype="Int64"),
+            "f_stat": np.full(n_pairs, np.nan),
+            "p_value": np.full(n_pairs, np.nan),
+            "p_value_raw": np.full(n_pairs, np.nan),
+            "significant": np.zeros(n_pairs, dtype=bool),
+            "n_obs": np.zeros(n_pairs, dtype=np.int64),
+        })
+        return empty, empty.copy()
+
+    chunk = max(1, _GRANGER_BATCH_ELEMENTS // (n * (2 * max_lag + 3)))
+    ab_parts, ba_parts = [], []
+    for start in range(0, n_pairs, chunk):
+        a_chunk, b_chunk = a[start:start + chunk], b[start:start + chunk]
+        rss = _batched_lag_rss(a_chunk, b_chunk, max_lag)
+        ab_parts.append(pd.DataFrame(_granger_select(a_chunk, b_chunk, max_lag, rss["rss_r_b"], rss["rss_u_b"])))
+        ba_parts.append(pd.DataFrame(_granger_select(b_chunk, a_chunk, max_lag, rss["rss_r_a"], rss["rss_u_a"])))
+    return pd.concat(ab_parts, ignore_index=True), pd.concat(ba_parts, ignore_index=True)
 
 
 def run_granger_tests(
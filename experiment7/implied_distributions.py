@@ -18,15 +18,23 @@ import os
 import json
 import glob
 import re
+import hashlib
 import numpy as np
 import pandas as pd
 from datetime import datetime, timezone
 from collections import defaultdict
 from tqdm import tqdm
 
+from kalshi.candle_store import open_store
+from kalshi.candle_manifest import load_manifest
+from kalshi.market_store import load_market_store
+from kalshi.price_cube import open_price_cube
+
 CANDLE_DIR = "data/exp2/raw/candles"
 TARGETED_MARKETS_PATH = "data/exp2/raw/targeted_markets.json"
 DATA_DIR = "data/exp7"
+SNAPSHOT_CACHE_DIR = os.path.join(DATA_DIR, "snapshot_cache")
+SNAPSHOT_CACHE_VERSION = 2
 
 # Series that have multiple strike levels (includes old-prefix variants)
 STRIKE_SERIES = {"KXCPI", "CPI", "KXGDP", "GDP", "KXJOBLESSCLAIMS", "FED", "KXFED"}
@@ -45,8 +53,12 @@ CANONICAL_SERIES = {
 
 def load_targeted_markets() -> pd.DataFrame:
     """Load full market metadata including floor_strike and expiration_value."""
-    with open(TARGETED_MARKETS_PATH) as f:
-        markets = json.load(f)
+    store = load_market_store()
+    if store is not None and os.path.exists(TARGETED_MARKETS_PATH):
+        markets = store.markets(sources="exp2_targeted")
+    else:
+        with open(TARGETED_MARKETS_PATH) as f:
+            markets = json.load(f)
     df = pd.DataFrame(markets)
     return df
 
@@ -99,9 +111,17 @@ def group_by_event(strike_df: pd.DataFrame) -> dict[str, pd.DataFrame]:
 
 
 def load_candle_prices(ticker: str) -> pd.Series | None:
-    """Load hourly close prices for a ticker from cached candles."""
-    candle_path = os.path.join(CANDLE_DIR, f"{ticker}_60.json")
-    if not os.path.exists(candle_path):
+    """Load hourly close prices for a ticker from cached candles.
+
+    Reads the columnar candle store when it has a current copy of the ticker,
+    else the JSON cache.
+    """
+    store = open_store()
+    if store is not None and store.has(ticker):
+        return store.close_prices(ticker)
+
+    candle_path = load_manifest(CANDLE_DIR).path(ticker)
+    if candle_path is None:
         return None
 
     with open(candle_path) as f:
@@ -124,73 +144,220 @@ def load_candle_prices(ticker: str) -> pd.Series | None:
     return pd.Series(prices, name=ticker).sort_index()
 
 
-def build_implied_cdf_snapshots(
-    event_markets: pd.DataFrame,
-) -> list[dict]:
-    """Build implied CDF snapshots at each available hour for an event.
-
-    For each hour where price data exists for all strikes,
-    construct the CDF: strike -> P(X > strike) = market price.
+def load_event_prices(event_ticker: str, tickers: list[str]) -> dict[str, pd.Series]:
+    """Hourly close prices for an event's strike markets, keyed by ticker.
 
-    Returns list of {timestamp, strikes, cdf_values, is_monotonic, violations}.
+    Slices the memory-mapped price cube when it covers the event with current
+    candle files, else loads each ticker with load_candle_prices(). Tickers
+    without data are omitted.
     """
-    tickers = event_markets["ticker"].tolist()
-    strikes = event_markets["floor_strike"].tolist()
-    strike_type = event_markets["strike_type"].iloc[0]
+    cube = open_price_cube()
+    if cube is not None and cube.is_current(event_ticker, tickers, CANDLE_DIR):
+        from_cube = cube.price_series(event_ticker)
+        return {t: from_cube[t] for t in tickers if t in from_cube}
 
-    # Load prices for all tickers
     price_series = {}
     for ticker in tickers:
         ps = load_candle_prices(ticker)
         if ps is not None:
             price_series[ticker] = ps
+    return price_series
+
 
+def align_event_prices(
+    event_markets: pd.DataFrame,
+) -> tuple[pd.DatetimeIndex, np.ndarray, np.ndarray] | None:
+    """Align an event's hourly close prices into one (hours × strikes) matrix.
+
+    Columns follow the row order of event_markets; cells are NaN where a
+    strike has no price for that hour. Uses the price cube's pre-aligned block
+    when it covers the event and none of its candle files changed since.
+
+    Returns (timestamps, strikes, prices), or None if fewer than 2 strikes
+    have any price data.
+    """
+    tickers = event_markets["ticker"].tolist()
+    strikes = event_markets["floor_strike"].to_numpy(dtype=float)
+    event_ticker = event_markets["event_ticker"].iloc[0] if "event_ticker" in event_markets else None
+
+    cube = open_price_cube()
+    if cube is not None and cube.is_current(event_ticker, tickers, CANDLE_DIR):
+        block = cube.event(event_ticker)
+        col = {t: j for j, t in enumerate(block["tickers"])}
+        prices = np.asarray(block["close"])[:, [col[t] for t in tickers]]
+        timestamps = pd.to_datetime(np.asarray(block["ts"]), unit="s", utc=True)
+        if (~np.isnan(prices)).any(axis=0).sum() < 2:
+            return None
+        return timestamps, strikes, prices
+
+    price_series = load_event_prices(event_ticker, tickers)
     if len(price_series) < 2:
-        return []
+        return None
 
-    # Find common timestamps
-    all_timestamps = set()
+    timestamps = price_series[next(iter(price_series))].index
     for ps in price_series.values():
-        all_timestamps.update(ps.index)
+        timestamps = timestamps.union(ps.index)
+    prices = np.full((len(timestamps), len(tickers)), np.nan)
+    for j, ticker in enumerate(tickers):
+        if ticker in price_series:
+            prices[:, j] = price_series[ticker].reindex(timestamps).to_numpy()
+    return timestamps, strikes, prices
+
+
+def _snapshot_cache_key(event_markets: pd.DataFrame) -> str:
+    """Content hash of everything an event's aligned prices depend on.
+
+    Covers the event's tickers and strikes (market metadata), each ticker's
+    candle file (size and mtime from the manifest), and the price cube build
+    if it is current for the event. A stale cube or store copy is never keyed:
+    align_event_prices() skips both then, so a refreshed candle file is what
+    the rebuilt entry holds.
+    """
+    tickers = event_markets["ticker"].tolist()
+    event_ticker = event_markets["event_ticker"].iloc[0] if "event_ticker" in event_markets else None
+    manifest = load_manifest(CANDLE_DIR)
+    cube = open_price_cube()
+
+    payload = {
+        "version": SNAPSHOT_CACHE_VERSION,
+        "event_ticker": event_ticker,
+        "tickers": tickers,
+        "strikes": [float(x) for x in event_markets["floor_strike"]],
+        "candles": [
+            [manifest.get(t)["size"], manifest.get(t)["mtime_ns"]] if manifest.has(t) else None
+            for t in tickers
+        ],
+        "cube": cube.built_at if cube is not None and cube.is_current(event_ticker, tickers, CANDLE_DIR) else None,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
 
-    snapshots = []
-    for ts in sorted(all_timestamps):
-        cdf_points = []
-        for ticker, strike in zip(tickers, strikes):
-            if ticker in price_series and ts in price_series[ticker].index:
-                price = price_series[ticker].loc[ts]
-                cdf_points.append((strike, price))
-
-        if len(cdf_points) < 2:
-            continue
 
-        cdf_points.sort(key=lambda x: x[0])
-        cdf_strikes = [p[0] for p in cdf_points]
-        cdf_values = [p[1] for p in cdf_points]
+def load_aligned_prices(
+    event_markets: pd.DataFrame,
+    use_cache: bool = True,
+) -> tuple[pd.DatetimeIndex, np.ndarray, np.ndarray] | None:
+    """align_event_prices() backed by a per-event on-disk cache.
+
+    The cache file (SNAPSHOT_CACHE_DIR/{event_ticker}.npz) stores the aligned
+    matrix with its content key; it is rebuilt whenever a candle file, the
+    event's markets/strikes, or the price cube change. Experiments 7, 12 and
+    13 all build snapshots through this, so each event is aligned once.
+    """
+    event_ticker = event_markets["event_ticker"].iloc[0] if "event_ticker" in event_markets else None
+    if not use_cache or event_ticker is None:
+        return align_event_prices(event_markets)
+
+    key = _snapshot_cache_key(event_markets)
+    cache_path = os.path.join(SNAPSHOT_CACHE_DIR, f"{event_ticker.replace('/', '_')}.npz")
+    if os.path.exists(cache_path):
+        try:
+            with np.load(cache_path, allow_pickle=False) as data:
+                if str(data["key"]) == key:
+                    if not data["available"]:
+                        return None
+                    timestamps = pd.to_datetime(data["ts"], unit="s", utc=True)
+                    return timestamps, data["strikes"], data["prices"]
+        except (OSError, ValueError, KeyError):
+            pass  # unreadable or old-format cache entry: rebuild it
+
+    aligned = align_event_prices(event_markets)
+    if aligned is None:
+        arrays = {"available": False, "ts": np.array([], dtype=np.int64),
+                  "strikes": np.array([]), "prices": np.empty((0, 0))}
+    else:
+        timestamps, strikes, prices = aligned
+        arrays = {"available": True, "ts": timestamps.as_unit("s").asi8,
+                  "strikes": strikes, "prices": prices}
+
+    os.makedirs(SNAPSHOT_CACHE_DIR, exist_ok=True)
+    tmp_path = f"{cache_path}.tmp.npz"
+    np.savez(tmp_path, key=key, **arrays)
+    os.replace(tmp_path, cache_path)
+    return aligned
+
+
+def cdf_snapshot_arrays(strikes: np.ndarray, prices: np.ndarray) -> dict:
+    """Monotonicity check for every hourly snapshot of an event at once.
+
+    Columns are stably sorted by strike. In each row, every priced strike is
+    compared with the nearest priced strike below it; P(X > strike) rising
+    with the strike is a no-arbitrage violation.
+
+    Returns dict of arrays (rows = hours, columns = sorted strikes):
+        strikes, prices, valid, n_strikes, prev (column of the previous priced
+        strike, -1 if none), violation (bool), violation_size, is_monotonic
+    """
+    order = np.argsort(strikes, kind="stable")
+    strikes = np.asarray(strikes, dtype=float)[order]
+    prices = prices[:, order]
+    n_hours, n_cols = prices.shape
 
-        # For "greater" type: P(X > strike) should DECREASE as strike increases
-        # For "greater_or_equal": same logic
-        is_monotonic = True
+    valid = ~np.isnan(prices)
+    col_idx = np.where(valid, np.arange(n_cols), -1)
+    last_valid = np.maximum.accumulate(col_idx, axis=1) if n_cols else col_idx
+    prev = np.concatenate([np.full((n_hours, 1), -1), last_valid[:, :-1]], axis=1)
+
+    prev_price = np.take_along_axis(prices, np.maximum(prev, 0), axis=1)
+    violation = valid & (prev >= 0) & (prev_price < prices)
+    violation_size = np.where(violation, prices - prev_price, 0.0)
+
+    return {
+        "strikes": strikes,
+        "prices": prices,
+        "valid": valid,
+        "n_strikes": valid.sum(axis=1),
+        "prev": prev,
+        "violation": violation,
+        "violation_size": violation_size,
+        "is_monotonic": ~violation.any(axis=1),
+    }
+
+
+def build_implied_cdf_snapshots(
+    event_markets: pd.DataFrame,
+    use_cache: bool = True,
+) -> list[dict]:
+    """Build implied CDF snapshots at each available hour for an event.
+
+    For each hour where at least 2 strikes have a price,
+    construct the CDF: strike -> P(X > strike) = market price.
+    Aligned prices come from the snapshot cache unless use_cache=False.
+
+    Returns list of {timestamp, strikes, cdf_values, is_monotonic, violations}.
+    """
+    aligned = load_aligned_prices(event_markets, use_cache=use_cache)
+    if aligned is None:
+        return []
+    timestamps, strikes, prices = aligned
+
+    # For "greater" type: P(X > strike) should DECREASE as strike increases
+    # For "greater_or_equal": same logic
+    arr = cdf_snapshot_arrays(strikes, prices)
+    sorted_strikes = arr["strikes"]
+
+    snapshots = []
+    for r in np.flatnonzero(arr["n_strikes"] >= 2):
+        row_prices = arr["prices"][r]
+        cols = np.flatnonzero(arr["valid"][r])
         violations = []
-        for i in range(len(cdf_values) - 1):
-            if cdf_values[i] < cdf_values[i + 1]:
-                is_monotonic = False
-                violations.append({
-                    "lower_strike": cdf_strikes[i],
-                    "upper_strike": cdf_strikes[i + 1],
-                    "lower_price": cdf_values[i],
-                    "upper_price": cdf_values[i + 1],
-                    "violation_size": cdf_values[i + 1] - cdf_values[i],
-                })
+        for j in np.flatnonzero(arr["violation"][r]):
+            i = arr["prev"][r, j]
+            violations.append({
+                "lower_strike": float(sorted_strikes[i]),
+                "upper_strike": float(sorted_strikes[j]),
+                "lower_price": float(row_prices[i]),
+                "upper_price": float(row_prices[j]),
+                "violation_size": float(arr["violation_size"][r, j]),
+            })
 
         snapshots.append({
-            "timestamp": ts,
-            "strikes": cdf_strikes,
-            "cdf_values": cdf_values,
-            "is_monotonic": is_monotonic,
+            "timestamp": timestamps[r],
+            "strikes": sorted_strikes[cols].tolist(),
+            "cdf_values": row_prices[cols].tolist(),
+            "is_monotonic": bool(arr["is_monotonic"][r]),
             "n_violations": len(violations),
             "violations": violations,
-            "n_strikes": len(cdf_points),
+            "n_strikes": len(cols),
         })
 
     return snapshots
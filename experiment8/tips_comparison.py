@@ -18,6 +18,9 @@ from datetime import datetime, timezone
 from tqdm import tqdm
 from scipy import stats
 
+from kalshi.candle_store import open_store
+from kalshi.candle_manifest import load_manifest
+
 CANDLE_DIR = "data/exp2/raw/candles"
 DATA_DIR = "data/exp8"
 
@@ -73,12 +76,31 @@ def build_kalshi_cpi_index(candle_dir: str = CANDLE_DIR) -> pd.Series:
     We weight by inverse distance from 50% (markets far from 50% carry
     more directional information).
     """
-    import glob
-
-    cpi_files = sorted(glob.glob(os.path.join(candle_dir, "KXCPI*_60.json")))
-
     daily_prices = {}
 
+    # The store serves the tickers whose copy is current; new or refreshed
+    # markets are read from their JSON files.
+    store = open_store(candle_dir=candle_dir) if candle_dir == CANDLE_DIR else None
+    manifest = load_manifest(candle_dir)
+    tickers = {
+        t for s in manifest.series() if s.startswith("KXCPI")
+        for t in manifest.tickers_for_series(s)
+    }
+    if store is not None:
+        tickers.update(t for s in store.series_list() if s.startswith("KXCPI") for t in store.tickers(s))
+
+    cpi_files = []
+    for ticker in sorted(tickers):
+        if store is not None and store.has(ticker):
+            prices = store.close_prices(ticker)
+            if prices is None:
+                continue
+            days = prices.index.normalize().tz_localize(None)
+            for day, price in zip(days, prices.to_numpy()):
+                daily_prices.setdefault(day, []).append(float(price))
+        elif manifest.path(ticker) is not None:
+            cpi_files.append(manifest.path(ticker))
+
     for f in cpi_files:
         ticker = os.path.basename(f).replace("_60.json", "")
         with open(f) as fh:
@@ -126,7 +148,7 @@ def run_granger_both_directions(
 
     Returns dict with both directions and lag selection.
     """
-    from experiment2.validation import granger_causality_test
+    from experiment2.validation import granger_causality_pair
     from experiment1.granger_pipeline import _ensure_stationary
 
     # Ensure stationarity (difference if needed)
@@ -146,8 +168,7 @@ def run_granger_both_directions(
         return {"error": "insufficient_overlap", "n_obs": len(combined)}
 
     # Test both directions
-    xy = granger_causality_test(combined["x"], combined["y"], max_lag=max_lag)
-    yx = granger_causality_test(combined["y"], combined["x"], max_lag=max_lag)
+    xy, yx = granger_causality_pair(combined["x"], combined["y"], max_lag=max_lag)
 
     return {
         "x_causes_y": {
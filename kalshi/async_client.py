@@ -0,0 +1,203 @@
+"""
+kalshi/async_client.py
+
+asyncio front-end for KalshiClient with bounded concurrency.
+
+Candle backfills are latency-bound: each /candlesticks call spends most of its
+time waiting on the network. AsyncKalshiClient keeps up to `max_concurrency`
+requests in flight on the pooled session of a regular KalshiClient (requests are
+dispatched to worker threads). Every request still goes through the client's
+token bucket, so the aggregate rate stays under the API cap.
+
+Usage:
+    from kalshi.async_client import AsyncKalshiClient, fetch_many_candles
+
+    # From sync code:
+    candles = fetch_many_candles(specs, cache_dir="data/exp2/raw/candles")
+
+    # From async code:
+    async with AsyncKalshiClient(max_concurrency=8) as aclient:
+        markets = await aclient.get_all_pages("/markets", params={"series_ticker": "KXCPI"})
+"""
+
+import os
+import json
+import asyncio
+from tqdm import tqdm
+
+from kalshi.client import KalshiClient
+from kalshi.candle_manifest import record_candles
+
+# (ticker, series_ticker, start_ts, end_ts)
+CandleSpec = tuple[str, str, int, int]
+
+
+class AsyncKalshiClient:
+    """
+    Coroutine wrapper around KalshiClient.
+
+    Arguments:
+        client:          Existing KalshiClient to share (left open by close()).
+                         A new one is created (with pool_size=max_concurrency)
+                         if omitted, and closed by close().
+        max_concurrency: Max requests in flight at once. Rate limiting is done
+                         by the client's token bucket, shared with sync callers.
+    """
+
+    def __init__(self, client: KalshiClient = None, max_concurrency: int = 8):
+        self._owns_client = client is None
+        self.client = client or KalshiClient(pool_size=max_concurrency)
+        self.max_concurrency = max_concurrency
+        self._semaphore = None
+
+    async def get(self, path: str, params: dict = None) -> dict:
+        """Async version of KalshiClient.get()."""
+        # asyncio primitives bind to the running loop, so create them lazily.
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._semaphore:
+            return await asyncio.to_thread(self.client.get, path, params)
+
+    async def get_all_pages(
+        self,
+        path: str,
+        params: dict = None,
+        result_key: str = "markets",
+        page_limit: int = 1000,
+    ) -> list:
+        """
+        Async version of KalshiClient.get_all_pages().
+
+        Pages of one endpoint are inherently sequential (each needs the previous
+        cursor); concurrency comes from running many of these at once.
+        """
+        params = dict(params or {})
+        params["limit"] = page_limit
+        all_results = []
+
+        while True:
+            resp = await self.get(path, params)
+            items = resp.get(result_key, [])
+            all_results.extend(items)
+
+            cursor = resp.get("cursor", "")
+            if not cursor or len(items) < page_limit:
+                break
+            params["cursor"] = cursor
+
+        return all_results
+
+    async def fetch_candles(
+        self,
+        ticker: str,
+        series_ticker: str,
+        start_ts: int,
+        end_ts: int,
+        period_interval: int = 60,
+    ) -> list:
+        """Fetch all candlesticks for one market."""
+        return await self.get_all_pages(
+            f"/series/{series_ticker}/markets/{ticker}/candlesticks",
+            params={
+                "start_ts": start_ts,
+                "end_ts": end_ts,
+                "period_interval": period_interval,
+            },
+            result_key="candlesticks",
+        )
+
+    async def fetch_many_candles(
+        self,
+        tickers: list[CandleSpec],
+        period_interval: int = 60,
+        cache_dir: str = None,
+        show_progress: bool = True,
+    ) -> dict[str, list | None]:
+        """
+        Fetch candles for many markets with at most `max_concurrency` in flight.
+
+        Arguments:
+            tickers:         List of (ticker, series_ticker, start_ts, end_ts).
+            period_interval: 60 = hourly, 1440 = daily.
+            cache_dir:       If given, use the experiment2 cache layout
+                             ({cache_dir}/{ticker}_{period_interval}.json): cached
+                             tickers are read instead of fetched, and successful
+                             fetches are written back.
+            show_progress:   Show a progress bar over markets.
+
+        Returns:
+            {ticker: candles}. Failed fetches map to None (not []) so callers can
+            tell "no data" apart from "request failed" and retry later.
+        """
+        results = {}
+        pbar = tqdm(total=len(tickers), desc="Fetching candles", disable=not show_progress)
+
+        async def one(spec: CandleSpec):
+            ticker, series_ticker, start_ts, end_ts = spec
+            cache_path = None
+            if cache_dir:
+                cache_path = os.path.join(
+                    cache_dir, f"{ticker.replace('/', '_')}_{period_interval}.json"
+                )
+                if os.path.exists(cache_path):
+                    with open(cache_path) as f:
+                        results[ticker] = json.load(f)
+                    pbar.update(1)
+                    return
+
+            try:
+                candles = await self.fetch_candles(
+                    ticker, series_ticker, start_ts, end_ts, period_interval
+                )
+            except Exception as e:
+                print(f"  Candle fetch failed for {ticker}: {e}")
+                results[ticker] = None
+            else:
+                results[ticker] = candles
+                if cache_path:
+                    os.makedirs(cache_dir, exist_ok=True)
+                    with open(cache_path, "w") as f:
+                        json.dump(candles, f, indent=2, default=str)
+                    record_candles(cache_dir, ticker.replace("/", "_"), candles, period_interval)
+            pbar.update(1)
+
+        await asyncio.gather(*(one(spec) for spec in tickers))
+        pbar.close()
+        return results
+
+    def close(self):
+        """Close the client's pooled connections if this wrapper created it."""
+        if self._owns_client:
+            self.client.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.close()
+
+
+def fetch_many_candles(
+    tickers: list[CandleSpec],
+    client: KalshiClient = None,
+    max_concurrency: int = 8,
+    period_interval: int = 60,
+    cache_dir: str = None,
+    show_progress: bool = True,
+) -> dict[str, list | None]:
+    """
+    Sync entry point for concurrent candle backfills.
+
+    Runs AsyncKalshiClient.fetch_many_candles() in a fresh event loop. Pass an
+    existing `client` to reuse its session; see the method for argument details.
+    """
+    aclient = AsyncKalshiClient(client, max_concurrency=max_concurrency)
+    try:
+        return asyncio.run(aclient.fetch_many_candles(
+            tickers,
+            period_interval=period_interval,
+            cache_dir=cache_dir,
+            show_progress=show_progress,
+        ))
+    finally:
+        aclient.close()
@@ -0,0 +1,250 @@
+"""
+kalshi/candle_manifest.py
+
+Manifest for the per-ticker candle cache (data/exp2/raw/candles/{ticker}_60.json).
+
+Loaders used to glob the cache directory ("{event_ticker}*_60.json") or call
+os.path.exists once per ticker. The manifest records every cached file once:
+
+    ticker -> {file, rows, first_ts, last_ts, series, event, size, mtime_ns}
+
+with in-memory secondary indexes by series and event, so "all candles for this
+event" and "which of these tickers are missing" are dictionary lookups.
+
+It lives next to the cache as manifest.60m.json, plus an append-only
+manifest.60m.journal.jsonl that writers use to record new files in O(1) instead of
+rewriting the whole manifest. On first load in a process the directory is
+synced: new or modified files (by size and mtime) are re-read and deleted
+files are dropped, so files written by scripts that don't record themselves
+are still picked up.
+
+Usage:
+    from kalshi.candle_manifest import load_manifest
+    manifest = load_manifest()
+    for ticker in manifest.tickers_for_event("KXCPI-25JAN"):
+        path = manifest.path(ticker)
+"""
+
+import os
+import json
+from collections import defaultdict
+
+CANDLE_DIR = "data/exp2/raw/candles"
+# Named so they never match the "*_{interval}.json" pattern of cache files
+MANIFEST_NAME = "manifest.{interval}m.json"
+JOURNAL_NAME = "manifest.{interval}m.journal.jsonl"
+
+
+def series_of(ticker: str) -> str:
+    return ticker.split("-")[0]
+
+
+def event_of(ticker: str) -> str:
+    """Event ticker of a market ticker (KXCPI-25JAN-T0.3 -> KXCPI-25JAN)."""
+    parts = ticker.split("-")
+    return "-".join(parts[:-1]) if len(parts) >= 3 else ticker
+
+
+def _summarize(candles: list) -> dict:
+    stamps = [c["end_period_ts"] for c in candles if c.get("end_period_ts") is not None]
+    return {
+        "rows": len(candles),
+        "first_ts": min(stamps) if stamps else None,
+        "last_ts": max(stamps) if stamps else None,
+    }
+
+
+class CandleManifest:
+    """
+    In-memory view of the candle cache manifest.
+
+    Arguments:
+        candle_dir: Cache directory holding {ticker}_{interval}.json files.
+        interval:   Candle width in minutes; part of the cache file name.
+    """
+
+    def __init__(self, candle_dir: str = CANDLE_DIR, interval: int = 60):
+        self.candle_dir = candle_dir
+        self.interval = interval
+        self.entries: dict[str, dict] = {}
+        self._by_event = defaultdict(set)
+        self._by_series = defaultdict(set)
+
+    @property
+    def _suffix(self) -> str:
+        return f"_{self.interval}.json"
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.candle_dir, MANIFEST_NAME.format(interval=self.interval))
+
+    @property
+    def journal_path(self) -> str:
+        return os.path.join(self.candle_dir, JOURNAL_NAME.format(interval=self.interval))
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, ticker: str) -> bool:
+        return ticker in self.entries
+
+    def has(self, ticker: str) -> bool:
+        return ticker in self.entries
+
+    def get(self, ticker: str) -> dict | None:
+        return self.entries.get(ticker)
+
+    def path(self, ticker: str) -> str | None:
+        """Path of the cached file, or None if the ticker is not cached."""
+        entry = self.entries.get(ticker)
+        return os.path.join(self.candle_dir, entry["file"]) if entry else None
+
+    def tickers(self) -> list[str]:
+        return sorted(self.entries)
+
+    def tickers_for_event(self, event_ticker: str) -> list[str]:
+        return sorted(self._by_event.get(event_ticker, ()))
+
+    def tickers_for_series(self, series: str) -> list[str]:
+        return sorted(self._by_series.get(series, ()))
+
+    def series(self) -> list[str]:
+        return sorted(s for s, tickers in self._by_series.items() if tickers)
+
+    def missing(self, tickers) -> list[str]:
+        """Tickers (in input order) that have no cached candles."""
+        return [t for t in tickers if t not in self.entries]
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+
+    def _set(self, ticker: str, entry: dict | None):
+        old = self.entries.pop(ticker, None)
+        if old is not None:
+            self._by_event[old["event"]].discard(ticker)
+            self._by_series[old["series"]].discard(ticker)
+        if entry is not None:
+            self.entries[ticker] = entry
+            self._by_event[entry["event"]].add(ticker)
+            self._by_series[entry["series"]].add(ticker)
+
+    def _entry(self, ticker: str, candles: list, stat: os.stat_result) -> dict:
+        return {
+            "file": f"{ticker}{self._suffix}",
+            "series": series_of(ticker),
+            "event": event_of(ticker),
+            **_summarize(candles),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+        }
+
+    def record(self, ticker: str, candles: list):
+        """Record a file the caller has just written (appends to the journal)."""
+        path = os.path.join(self.candle_dir, f"{ticker}{self._suffix}")
+        entry = self._entry(ticker, candles, os.stat(path))
+        self._set(ticker, entry)
+        with open(self.journal_path, "a") as f:
+            f.write(json.dumps({"ticker": ticker, "entry": entry}) + "\n")
+
+    def sync(self) -> int:
+        """Reconcile with the directory. Returns the number of entries added, changed or dropped."""
+        if not os.path.isdir(self.candle_dir):
+            return 0
+
+        n_changed = 0
+        seen = set()
+        with os.scandir(self.candle_dir) as it:
+            for de in it:
+                if not de.name.endswith(self._suffix):
+                    continue
+                ticker = de.name[: -len(self._suffix)]
+                seen.add(ticker)
+                stat = de.stat()
+                entry = self.entries.get(ticker)
+                if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+                    continue
+                try:
+                    with open(de.path) as f:
+                        candles = json.load(f)
+                except (json.JSONDecodeError, IOError):
+                    candles = None
+                self._set(ticker, self._entry(ticker, candles, stat) if isinstance(candles, list) else None)
+                n_changed += 1
+
+        for ticker in set(self.entries) - seen:
+            self._set(ticker, None)
+            n_changed += 1
+        return n_changed
+
+    def save(self):
+        """Write the manifest atomically and clear the journal."""
+        os.makedirs(self.candle_dir, exist_ok=True)
+        tmp = self.manifest_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"interval": self.interval, "entries": self.entries}, f)
+        os.replace(tmp, self.manifest_path)
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+
+    @classmethod
+    def load(cls, candle_dir: str = CANDLE_DIR, interval: int = 60, sync: bool = True) -> "CandleManifest":
+        """Read the manifest and replay the journal; then sync with the directory.
+
+        If syncing or the journal changed anything, the manifest is saved back.
+        """
+        manifest = cls(candle_dir, interval)
+        dirty = False
+        if os.path.exists(manifest.manifest_path):
+            try:
+                with open(manifest.manifest_path) as f:
+                    data = json.load(f)
+                if data.get("interval") == interval:
+                    for ticker, entry in data.get("entries", {}).items():
+                        manifest._set(ticker, entry)
+            except (json.JSONDecodeError, IOError):
+                dirty = True
+
+        if os.path.exists(manifest.journal_path):
+            with open(manifest.journal_path) as f:
+                for line in f:
+                    try:
+                        rec = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # torn final line from an interrupted writer
+                    manifest._set(rec["ticker"], rec["entry"])
+            dirty = True
+
+        if sync and manifest.sync():
+            dirty = True
+        if dirty and os.path.isdir(candle_dir):
+            manifest.save()
+        return manifest
+
+
+_manifests: dict[tuple[str, int], CandleManifest] = {}
+
+
+def load_manifest(candle_dir: str = CANDLE_DIR, interval: int = 60, refresh: bool = False) -> CandleManifest:
+    """Process-wide manifest for candle_dir, loaded and synced on first use.
+
+    Later calls return the same instance (kept current by record_candles());
+    pass refresh=True to re-sync with files written by other processes.
+    """
+    key = (candle_dir, interval)
+    if refresh or key not in _manifests:
+        _manifests[key] = CandleManifest.load(candle_dir, interval)
+    return _manifests[key]
+
+
+def record_candles(candle_dir: str, ticker: str, candles: list, interval: int = 60):
+    """Record a just-written cache file in the manifest for candle_dir."""
+    key = (candle_dir, interval)
+    manifest = _manifests.get(key)
+    if manifest is None:
+        manifest = CandleManifest(candle_dir, interval)
+    manifest.record(ticker, candles)
@@ -0,0 +1,132 @@
+"""
+kalshi/candle_query.py
+
+Point-in-time lookups over cached hourly candles.
+
+Point-in-time extractors (experiment12's CDF-at-time, experiment11's T-24h
+and mid-life prices) used to re-parse a ticker's candle JSON for every target
+time and scan it linearly for the closest end_period_ts. CandleQuery loads each
+ticker once as sorted typed columns (from the columnar store if it has the
+ticker, else the JSON cache) and answers batches of (ticker, target time)
+queries with binary search.
+
+Nearest-candle semantics match the old linear scans: the candle with the
+smallest |end_period_ts - target| wins, ties go to the earlier candle, and
+among duplicate timestamps the first one cached wins.
+
+Usage:
+    from kalshi.candle_query import get_candle_query
+    q = get_candle_query()
+    rows = q.at(["KXCPI-25JAN-T0.3", "KXCPI-25JAN-T0.4"], [t_minus_24h, t_minus_24h])
+    rows["close"], rows["gap"]
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+
+from kalshi.candle_store import CANDLE_DIR, STORE_DIR, VALUE_FIELDS, candles_to_columns, open_store
+from kalshi.candle_manifest import load_manifest
+
+
+def nearest_rows(ts: np.ndarray, targets: np.ndarray) -> np.ndarray:
+    """Index of the candle nearest each target in an ascending ts array (-1 if ts is empty)."""
+    targets = np.asarray(targets, dtype=float)
+    if len(ts) == 0:
+        return np.full(len(targets), -1, dtype=np.int64)
+
+    right = np.searchsorted(ts, targets, side="left")
+    left = np.clip(right - 1, 0, len(ts) - 1)
+    right = np.clip(right, 0, len(ts) - 1)
+    take_left = np.abs(targets - ts[left]) <= np.abs(ts[right] - targets)
+    best = np.where(take_left, left, right)
+    # First of any run of duplicate timestamps
+    return np.searchsorted(ts, ts[best], side="left")
+
+
+class CandleQuery:
+    """
+    Per-ticker candle columns, loaded lazily and cached for the process.
+
+    Arguments:
+        candle_dir: Per-ticker JSON cache (used for tickers not in the store).
+        store_root: Columnar candle store (see kalshi.candle_store).
+    """
+
+    def __init__(self, candle_dir: str = CANDLE_DIR, store_root: str = STORE_DIR):
+        self.candle_dir = candle_dir
+        self.store = open_store(store_root, candle_dir=candle_dir)
+        self._columns: dict[str, dict | None] = {}
+
+    def columns(self, ticker: str) -> dict[str, np.ndarray] | None:
+        """Sorted ts/close/yes_bid/yes_ask/volume/open_interest arrays, or None if not cached."""
+        if ticker not in self._columns:
+            cols = None
+            if self.store is not None and self.store.has(ticker):
+                cols = self.store.get(ticker)
+            else:
+                path = load_manifest(self.candle_dir).path(ticker)
+                if path is not None:
+                    try:
+                        with open(path) as f:
+                            cols = candles_to_columns(json.load(f))
+                    except (json.JSONDecodeError, IOError):
+                        cols = None
+            self._columns[ticker] = cols
+        return self._columns[ticker]
+
+    def at(self, tickers, targets, max_gap: float = None) -> pd.DataFrame:
+        """Nearest candle for each (ticker, target unix time) pair.
+
+        Args:
+            tickers: Sequence of tickers (may repeat, e.g. one per target)
+            targets: Unix times, same length as tickers
+            max_gap: If given, matches further than this many seconds from the
+                target are treated as not found
+
+        Returns:
+            DataFrame aligned with the inputs: ticker, target_ts, found, ts,
+            gap (|ts - target| seconds), and close / yes_bid / yes_ask /
+            volume / open_interest (NaN where not found or missing)
+        """
+        tickers = np.asarray(tickers, dtype=object)
+        targets = np.asarray(targets, dtype=float)
+        n = len(tickers)
+        out = {
+            "ticker": tickers,
+            "target_ts": targets,
+            "found": np.zeros(n, dtype=bool),
+            "ts": np.zeros(n, dtype=np.int64),
+            "gap": np.full(n, np.nan),
+        }
+        for field in VALUE_FIELDS:
+            out[field] = np.full(n, np.nan)
+
+        positions = pd.Series(np.arange(n)).groupby(tickers, sort=False).indices
+        for ticker, pos in positions.items():
+            cols = self.columns(ticker)
+            if cols is None or not len(cols["ts"]):
+                continue
+            rows = nearest_rows(cols["ts"], targets[pos])
+            gap = np.abs(cols["ts"][rows] - targets[pos])
+            ok = gap <= max_gap if max_gap is not None else np.ones(len(pos), dtype=bool)
+            pos, rows = pos[ok], rows[ok]
+            out["found"][pos] = True
+            out["ts"][pos] = cols["ts"][rows]
+            out["gap"][pos] = gap[ok]
+            for field in VALUE_FIELDS:
+                out[field][pos] = cols[field][rows]
+
+        return pd.DataFrame(out)
+
+
+_queries: dict[tuple[str, str], CandleQuery] = {}
+
+
+def get_candle_query(candle_dir: str = CANDLE_DIR, store_root: str = STORE_DIR) -> CandleQuery:
+    """Process-wide CandleQuery for candle_dir, so tickers are parsed once per run."""
+    key = (candle_dir, store_root)
+    if key not in _queries:
+        _queries[key] = CandleQuery(candle_dir, store_root)
+    return _queries[key]
@@ -0,0 +1,362 @@
+"""
+kalshi/candle_store.py
+
+Columnar on-disk store for hourly candles.
+
+The fetchers cache one pretty-printed JSON file per market
+(data/exp2/raw/candles/{ticker}_60.json), and every analysis re-parses those
+nested dicts. CandleStore keeps the same data as typed NumPy arrays, one
+compressed .npz file per series:
+
+    tickers  (n,)    market tickers, sorted
+    offsets  (n+1,)  candles of tickers[i] are rows offsets[i]:offsets[i+1]
+    ts       int64   end_period_ts, ascending within each ticker
+    close    float64 price.close_dollars   (NaN if missing)
+    yes_bid  float64 yes_bid.close_dollars (NaN if missing)
+    yes_ask  float64 yes_ask.close_dollars (NaN if missing)
+    volume, open_interest  float64        (NaN if missing)
+
+    source_size, source_mtime_ns  int64   (n,) size/mtime of the JSON file each
+                                          ticker was built from (-1 if unknown)
+
+Loading a series is a single np.load; slicing a ticker is a view. The JSON
+cache stays the source of truth for the fetchers, which don't write the
+store. A store opened with a candle_dir (open_store() does) only serves a
+ticker while its recorded source still matches that ticker's candle-manifest
+entry; refreshed or newly fetched tickers read as absent, so callers fall
+back to the JSON file. Build or rebuild the store with:
+
+    uv run python -m kalshi.candle_store --migrate
+
+Usage:
+    from kalshi.candle_store import open_store
+    store = open_store()            # None if the store hasn't been built
+    arrays = store.get("KXCPI-25JAN-T0.3")
+    arrays["ts"], arrays["close"]
+"""
+
+import os
+import json
+import glob
+import argparse
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+from kalshi.candle_manifest import load_manifest
+
+CANDLE_DIR = "data/exp2/raw/candles"
+STORE_DIR = "data/exp2/candle_store"
+
+VALUE_FIELDS = ("close", "yes_bid", "yes_ask", "volume", "open_interest")
+
+
+def series_of(ticker: str) -> str:
+    """Series prefix used to partition the store (KXCPI-25JAN-T0.3 -> KXCPI)."""
+    return ticker.split("-")[0] if "-" in ticker else ticker
+
+
+def _to_float(value) -> float:
+    if value is None:
+        return np.nan
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return np.nan
+
+
+def _close_dollars(candle: dict, key: str) -> float:
+    obj = candle.get(key)
+    return _to_float(obj.get("close_dollars")) if isinstance(obj, dict) else np.nan
+
+
+def candles_to_columns(candles: list) -> dict[str, np.ndarray]:
+    """Convert a list of candle dicts to sorted typed columns.
+
+    Candles without end_period_ts are dropped (no loader can place them in time).
+    """
+    rows = [c for c in candles if c.get("end_period_ts") is not None]
+    ts = np.array([int(c["end_period_ts"]) for c in rows], dtype=np.int64)
+    cols = {
+        "ts": ts,
+        "close": np.array([_close_dollars(c, "price") for c in rows], dtype=np.float64),
+        "yes_bid": np.array([_close_dollars(c, "yes_bid") for c in rows], dtype=np.float64),
+        "yes_ask": np.array([_close_dollars(c, "yes_ask") for c in rows], dtype=np.float64),
+        "volume": np.array([_to_float(c.get("volume")) for c in rows], dtype=np.float64),
+        "open_interest": np.array([_to_float(c.get("open_interest")) for c in rows], dtype=np.float64),
+    }
+    order = np.argsort(ts, kind="stable")
+    return {k: v[order] for k, v in cols.items()}
+
+
+class SeriesCandles:
+    """All candles of one series, loaded from a single .npz file."""
+
+    def __init__(
+        self,
+        tickers: np.ndarray,
+        offsets: np.ndarray,
+        columns: dict[str, np.ndarray],
+        sources: np.ndarray = None,
+    ):
+        self.tickers = tickers
+        self.offsets = offsets
+        self.columns = columns
+        # (n, 2) source size / mtime_ns per ticker; None for files written before they were recorded
+        self.sources = sources
+        self._index = {t: i for i, t in enumerate(tickers.tolist())}
+
+    def __contains__(self, ticker: str) -> bool:
+        return ticker in self._index
+
+    def __len__(self) -> int:
+        return len(self.tickers)
+
+    def get(self, ticker: str) -> dict[str, np.ndarray] | None:
+        """Column views for one ticker, or None if it isn't in this series."""
+        i = self._index.get(ticker)
+        if i is None:
+            return None
+        lo, hi = self.offsets[i], self.offsets[i + 1]
+        return {k: v[lo:hi] for k, v in self.columns.items()}
+
+    def source(self, ticker: str) -> tuple[int, int] | None:
+        """(size, mtime_ns) of the JSON file the ticker was built from, if recorded."""
+        i = self._index.get(ticker)
+        if i is None or self.sources is None or self.sources[i, 0] < 0:
+            return None
+        return int(self.sources[i, 0]), int(self.sources[i, 1])
+
+    def items(self):
+        for ticker in self.tickers.tolist():
+            yield ticker, self.get(ticker)
+
+
+class CandleStore:
+    """
+    Directory of per-series .npz candle files, with an in-memory cache of loaded series.
+
+    Arguments:
+        root:       Store directory.
+        interval:   Candle width in minutes.
+        candle_dir: JSON cache the store mirrors. If given, has()/get() skip
+                    tickers whose JSON file has changed (or was never
+                    recorded) since the store copy was written.
+    """
+
+    def __init__(self, root: str = STORE_DIR, interval: int = 60, candle_dir: str = None):
+        self.root = root
+        self.interval = interval
+        self.candle_dir = candle_dir
+        self._loaded: dict[str, SeriesCandles | None] = {}
+
+    def path_for(self, series: str) -> str:
+        return os.path.join(self.root, f"{series}_{self.interval}.npz")
+
+    def series_list(self) -> list[str]:
+        suffix = f"_{self.interval}.npz"
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(f[: -len(suffix)] for f in os.listdir(self.root) if f.endswith(suffix))
+
+    def load_series(self, series: str) -> SeriesCandles | None:
+        if series not in self._loaded:
+            path = self.path_for(series)
+            if not os.path.exists(path):
+                self._loaded[series] = None
+            else:
+                with np.load(path, allow_pickle=False) as data:
+                    columns = {k: data[k] for k in ("ts",) + VALUE_FIELDS}
+                    sources = None
+                    if "source_size" in data:
+                        sources = np.column_stack([data["source_size"], data["source_mtime_ns"]])
+                    self._loaded[series] = SeriesCandles(data["tickers"], data["offsets"], columns, sources)
+        return self._loaded[series]
+
+    def is_current(self, ticker: str) -> bool:
+        """False if the ticker's JSON file differs from the one its store copy was built from.
+
+        Always True without a candle_dir, or for tickers the JSON cache doesn't
+        have (the store copy is then all there is).
+        """
+        if self.candle_dir is None:
+            return True
+        entry = load_manifest(self.candle_dir, self.interval).get(ticker)
+        if entry is None:
+            return True
+        sc = self.load_series(series_of(ticker))
+        return sc is not None and sc.source(ticker) == (entry["size"], entry["mtime_ns"])
+
+    def has(self, ticker: str) -> bool:
+        sc = self.load_series(series_of(ticker))
+        return sc is not None and ticker in sc and self.is_current(ticker)
+
+    def get(self, ticker: str) -> dict[str, np.ndarray] | None:
+        """Columns for one ticker (ts, close, yes_bid, yes_ask, volume, open_interest).
+
+        None if the store doesn't have the ticker or its copy is stale.
+        """
+        if not self.has(ticker):
+            return None
+        return self.load_series(series_of(ticker)).get(ticker)
+
+    def tickers(self, series: str = None) -> list[str]:
+        """Tickers stored (current or not) for one series, or for all series."""
+        names = [series] if series else self.series_list()
+        out = []
+        for s in names:
+            sc = self.load_series(s)
+            if sc is not None:
+                out.extend(sc.tickers.tolist())
+        return out
+
+    def close_prices(self, ticker: str) -> pd.Series | None:
+        """Hourly close prices as a UTC-indexed Series (same shape as JSON-based loaders)."""
+        cols = self.get(ticker)
+        if cols is None:
+            return None
+        mask = ~np.isnan(cols["close"]) & (cols["ts"] != 0)
+        if not mask.any():
+            return None
+        idx = pd.to_datetime(cols["ts"][mask], unit="s", utc=True)
+        prices = pd.Series(cols["close"][mask], index=idx, name=ticker)
+        # Repeated periods: the later candle wins, as with a dict keyed by ts
+        return prices[~prices.index.duplicated(keep="last")]
+
+    def write_series(
+        self,
+        series: str,
+        candles_by_ticker: dict[str, list],
+        sources: dict[str, tuple[int, int]] = None,
+    ) -> int:
+        """(Re)write one series file from {ticker: candle dicts}. Returns candle count.
+
+        sources maps tickers to the (size, mtime_ns) of the JSON file their
+        candles were read from.
+        """
+        tickers = sorted(candles_by_ticker)
+        per_ticker = [candles_to_columns(candles_by_ticker[t]) for t in tickers]
+        sources = sources or {}
+        return self._write_columns(series, tickers, per_ticker, [sources.get(t) for t in tickers])
+
+    def _write_columns(
+        self, series: str, tickers: list[str], per_ticker: list[dict], sources: list[tuple | None],
+    ) -> int:
+        lengths = [len(cols["ts"]) for cols in per_ticker]
+        offsets = np.zeros(len(tickers) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(lengths)
+
+        known = [src if src is not None else (-1, -1) for src in sources]
+        arrays = {
+            "tickers": np.array(tickers, dtype=str),
+            "offsets": offsets,
+            "source_size": np.array([src[0] for src in known], dtype=np.int64),
+            "source_mtime_ns": np.array([src[1] for src in known], dtype=np.int64),
+        }
+        for key, dtype in (("ts", np.int64),) + tuple((f, np.float64) for f in VALUE_FIELDS):
+            parts = [cols[key] for cols in per_ticker]
+            arrays[key] = np.concatenate(parts).astype(dtype) if parts else np.array([], dtype=dtype)
+
+        os.makedirs(self.root, exist_ok=True)
+        path = self.path_for(series)
+        tmp_path = f"{path}.tmp.npz"
+        np.savez_compressed(tmp_path, **arrays)
+        os.replace(tmp_path, path)
+        self._loaded.pop(series, None)
+        return int(offsets[-1])
+
+    def put(self, ticker: str, candles: list, source: tuple[int, int] = None) -> None:
+        """Insert or replace one ticker, rewriting its series file.
+
+        source is the (size, mtime_ns) of the JSON file the candles came from.
+        """
+        series = series_of(ticker)
+        sc = self.load_series(series)
+        existing = {}
+        if sc is not None:
+            for t, cols in sc.items():
+                existing[t] = (cols, sc.source(t))
+        existing[ticker] = (candles_to_columns(candles), source)
+        tickers = sorted(existing)
+        self._write_columns(
+            series, tickers, [existing[t][0] for t in tickers], [existing[t][1] for t in tickers],
+        )
+
+
+def open_store(root: str = STORE_DIR, interval: int = 60, candle_dir: str = CANDLE_DIR) -> CandleStore | None:
+    """Return the CandleStore at root, or None if it hasn't been built yet.
+
+    The store is checked against candle_dir's manifest, so tickers refreshed
+    or fetched after the last migration read from JSON instead (see
+    CandleStore.is_current).
+    """
+    if not os.path.isdir(root):
+        return None
+    return CandleStore(root, interval, candle_dir=candle_dir)
+
+
+def migrate_json_cache(
+    candle_dir: str = CANDLE_DIR,
+    store_root: str = STORE_DIR,
+    interval: int = 60,
+) -> dict:
+    """Build the columnar store from the per-ticker JSON cache (one-shot, idempotent).
+
+    Every {ticker}_{interval}.json in candle_dir is parsed once and grouped by
+    series; each series file is rewritten in full. Unreadable files are skipped.
+
+    Returns summary counts.
+    """
+    suffix = f"_{interval}.json"
+    by_series = defaultdict(dict)
+    sources = {}
+    n_skipped = 0
+    for path in sorted(glob.glob(os.path.join(candle_dir, f"*{suffix}"))):
+        ticker = os.path.basename(path)[: -len(suffix)]
+        try:
+            stat = os.stat(path)
+            with open(path) as f:
+                candles = json.load(f)
+        except (json.JSONDecodeError, IOError):
+            n_skipped += 1
+            continue
+        by_series[series_of(ticker)][ticker] = candles
+        sources[ticker] = (stat.st_size, stat.st_mtime_ns)
+
+    store = CandleStore(store_root, interval)
+    n_candles = 0
+    for series, candles_by_ticker in sorted(by_series.items()):
+        n_candles += store.write_series(series, candles_by_ticker, sources)
+
+    return {
+        "n_series": len(by_series),
+        "n_tickers": sum(len(v) for v in by_series.values()),
+        "n_candles": n_candles,
+        "n_skipped": n_skipped,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the columnar candle store")
+    parser.add_argument("--migrate", action="store_true",
+                        help="Rebuild the store from the per-ticker JSON cache")
+    parser.add_argument("--candle-dir", default=CANDLE_DIR)
+    parser.add_argument("--store-dir", default=STORE_DIR)
+    args = parser.parse_args()
+
+    if args.migrate:
+        summary = migrate_json_cache(args.candle_dir, args.store_dir)
+        print(f"✓ Migrated {summary['n_tickers']} tickers / {summary['n_candles']} candles "
+              f"into {summary['n_series']} series files ({summary['n_skipped']} unreadable skipped)")
+    else:
+        store = open_store(args.store_dir)
+        if store is None:
+            print(f"No store at {args.store_dir}; run with --migrate")
+            return
+        for series in store.series_list():
+            print(f"  {series}: {len(store.tickers(series))} tickers")
+
+
+if __name__ == "__main__":
+    main()
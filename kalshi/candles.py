@@ -0,0 +1,78 @@
+"""
+kalshi/candles.py
+
+Helpers shared by the per-ticker candle caches (experiment2's
+data/exp2/raw/candles/{ticker}_60.json and kalshi.market_data's
+data/raw/candles_{ticker}.json).
+
+Usage:
+    from kalshi.candles import refresh_candles
+    candles, n_new = refresh_candles(client, ticker, series_ticker, cached, start_ts, end_ts)
+"""
+
+
+def last_candle_ts(candles: list) -> int | None:
+    """Largest end_period_ts in a candle list, or None if there is none."""
+    stamps = [c["end_period_ts"] for c in candles if c.get("end_period_ts") is not None]
+    return max(stamps) if stamps else None
+
+
+def refresh_candles(
+    client,
+    ticker: str,
+    series_ticker: str,
+    cached: list,
+    start_ts: int,
+    end_ts: int,
+    period_interval: int = 60,
+) -> tuple[list, int]:
+    """Bring a cached candle list up to end_ts, fetching only the missing periods.
+
+    The last cached candle is re-fetched along with anything newer, because
+    for a market that was still trading at the previous refresh that candle
+    may have been a partial period. If the cache already reaches end_ts, no
+    request is made.
+
+    Args:
+        client: KalshiClient
+        cached: Candles already on disk (may be empty)
+        start_ts: Market open (used only when the cache is empty)
+        end_ts: Market close, or "now" for an open market
+        period_interval: Candle width in minutes (60 = hourly)
+
+    Returns:
+        (merged candles sorted by end_period_ts, number of candles added or replaced)
+    """
+    period_s = period_interval * 60
+    last_ts = last_candle_ts(cached)
+
+    if last_ts is not None and last_ts >= end_ts:
+        return cached, 0
+
+    fetch_from = start_ts if last_ts is None else last_ts - period_s
+    new = client.get_all_pages(
+        f"/series/{series_ticker}/markets/{ticker}/candlesticks",
+        params={
+            "start_ts": fetch_from,
+            "end_ts": end_ts,
+            "period_interval": period_interval,
+        },
+        result_key="candlesticks",
+    )
+
+    # Fetched candles win over cached ones for the same period
+    by_ts = {c.get("end_period_ts"): c for c in cached}
+    n_changed = 0
+    for c in new:
+        ts = c.get("end_period_ts")
+        if ts is None:
+            continue
+        if by_ts.get(ts) != c:
+            n_changed += 1
+        by_ts[ts] = c
+
+    merged = sorted(
+        (c for ts, c in by_ts.items() if ts is not None),
+        key=lambda c: c["end_period_ts"],
+    )
+    return merged, n_changed
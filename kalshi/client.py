@@ -2,23 +2,149 @@
 backtest/kalshi_client.py
 
 Thin wrapper around the Kalshi v2 REST API.
-Handles RSA-PSS request signing and cursor-based pagination.
+Handles RSA-PSS request signing, cursor-based pagination, a pooled
+keep-alive HTTP session so repeated calls reuse TCP+TLS connections,
+token-bucket rate limiting shared by every client in the process, and
+retries with exponential backoff for idempotent requests.
 """
 
 import os
+import json
 import time
+import random
 import base64
 import datetime
+import threading
+from email.utils import parsedate_to_datetime
 import requests as http_lib  # aliased to avoid shadowing
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
 from cryptography.hazmat.primitives import serialization, hashes
 from cryptography.hazmat.primitives.asymmetric import padding
 from cryptography.hazmat.backends import default_backend
 from dotenv import load_dotenv
 from tqdm import tqdm
 
+from kalshi.rate_limit import TokenBucket, shared_bucket
+
 load_dotenv()
 
 
+class _CountingAdapter(HTTPAdapter):
+    """
+    HTTPAdapter that counts requests sent and TCP connections opened.
+
+    urllib3's own pool counters miss silent reconnects (a dropped keep-alive
+    connection is re-opened on the same connection object), so we count
+    `connect()` calls on the connection class itself.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self._lock = threading.Lock()
+        self.n_requests = 0
+        self.n_connects = 0
+        super().__init__(*args, **kwargs)
+
+    def _count_connect(self):
+        with self._lock:
+            self.n_connects += 1
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        on_connect = self._count_connect
+
+        class _HTTPConn(HTTPConnection):
+            def connect(self):
+                on_connect()
+                super().connect()
+
+        class _HTTPSConn(HTTPSConnection):
+            def connect(self):
+                on_connect()
+                super().connect()
+
+        class _HTTPPool(HTTPConnectionPool):
+            ConnectionCls = _HTTPConn
+
+        class _HTTPSPool(HTTPSConnectionPool):
+            ConnectionCls = _HTTPSConn
+
+        self.poolmanager.pool_classes_by_scheme = {"http": _HTTPPool, "https": _HTTPSPool}
+
+    def send(self, request, **kwargs):
+        with self._lock:
+            self.n_requests += 1
+        return super().send(request, **kwargs)
+
+
+class RetryPolicy:
+    """
+    When and how long to retry a failed request.
+
+    Retries connection errors, timeouts, and responses whose status is in
+    `retry_statuses`, but only for idempotent methods — a POST that may have
+    reached the server is never replayed. Backoff is "full jitter": a uniform
+    draw from [0, min(backoff_max, backoff_base * 2**attempt)]. A 429/503 with a
+    Retry-After header waits at least that long instead.
+
+    Arguments:
+        max_retries:    Retries after the first attempt (0 disables retrying).
+        backoff_base:   Seconds; upper bound of the first backoff.
+        backoff_max:    Cap on any single backoff, including Retry-After.
+        retry_statuses: HTTP statuses treated as transient.
+    """
+
+    IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+    def __init__(
+        self,
+        max_retries: int = 5,
+        backoff_base: float = 1.0,
+        backoff_max: float = 60.0,
+        retry_statuses: frozenset = frozenset({429, 500, 502, 503, 504}),
+    ):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_statuses = retry_statuses
+
+    def should_retry(self, method: str, attempt: int, response=None, error: Exception = None) -> bool:
+        """True if attempt number `attempt` (0-based) failed transiently and may be retried."""
+        if attempt >= self.max_retries or method.upper() not in self.IDEMPOTENT_METHODS:
+            return False
+        if error is not None:
+            return isinstance(error, (http_lib.ConnectionError, http_lib.Timeout))
+        return response is not None and response.status_code in self.retry_statuses
+
+    def backoff(self, attempt: int, response=None) -> float:
+        """Seconds to wait before retrying after failed attempt number `attempt`."""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        retry_after = self._retry_after(response)
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.backoff_max))
+        return delay
+
+    @staticmethod
+    def _retry_after(response) -> float | None:
+        """Parse a Retry-After header given either as seconds or as an HTTP date."""
+        if response is None:
+            return None
+        value = response.headers.get("Retry-After")
+        if not value:
+            return None
+        try:
+            return max(float(value), 0.0)
+        except ValueError:
+            pass
+        try:
+            when = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        now = datetime.datetime.now(datetime.timezone.utc)
+        return max((when - now).total_seconds(), 0.0)
+
+
 class KalshiClient:
     """
     Authenticated client for the Kalshi trading API.
@@ -26,13 +152,40 @@ class KalshiClient:
     Usage:
         client = KalshiClient()
         markets = client.get("/markets", params={"series_ticker": "KCPI", "status": "settled"})
+        print(client.connection_stats(), client.rate_limit_stats())
+
+    All requests go through one `requests.Session` with a pooled HTTPAdapter,
+    so consecutive pages and candle fetches reuse the same TLS connection.
+    Every request first takes a token from the rate limiter, so callers never
+    need to sleep between calls.
     """
 
     BASE_URL = "https://api.elections.kalshi.com/trade-api/v2"
     # Sandbox for testing (no real money):
     # BASE_URL = "https://demo-api.kalshi.co/trade-api/v2"
 
-    def __init__(self):
+    def __init__(
+        self,
+        pool_size: int = 10,
+        keep_alive: bool = True,
+        rate_limiter: TokenBucket = None,
+        retry: RetryPolicy = None,
+        timeout: float = 30.0,
+    ):
+        """
+        Arguments:
+            pool_size:    Max connections kept open per host. Only matters when the
+                          client is shared across threads; serial use needs one.
+            keep_alive:   If False, send `Connection: close` so every request opens
+                          a fresh connection (useful for debugging proxies).
+            rate_limiter: Token bucket every request draws from. Defaults to the
+                          process-wide shared_bucket() (file-backed across
+                          processes if KALSHI_RATE_LIMIT_FILE is set).
+            retry:        RetryPolicy for transient failures. Defaults to
+                          RetryPolicy(); pass RetryPolicy(max_retries=0) to disable.
+            timeout:      Per-attempt (connect, read) timeout in seconds, so a
+                          stalled connection fails and is retried instead of hanging.
+        """
         self.key_id = os.getenv("KALSHI_KEY_ID")
         if not self.key_id:
             raise ValueError("KALSHI_KEY_ID not found in .env")
@@ -46,6 +199,56 @@ class KalshiClient:
                 f.read(), password=None, backend=default_backend()
             )
 
+        self.pool_size = pool_size
+        self.keep_alive = keep_alive
+        self.session = self._make_session()
+        self.rate_limiter = rate_limiter or shared_bucket()
+        self.retry = retry or RetryPolicy()
+        self.timeout = timeout
+        self.n_retries = 0
+
+    def _make_session(self) -> http_lib.Session:
+        """Build a Session whose HTTPS adapter keeps up to `pool_size` connections alive."""
+        session = http_lib.Session()
+        adapter = _CountingAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers["Connection"] = "keep-alive" if self.keep_alive else "close"
+        return session
+
+    def close(self):
+        """Close all pooled connections."""
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def connection_stats(self) -> dict:
+        """
+        Report how well the connection pool is being used.
+
+        A healthy serial crawl has connections_opened == 1 and reuse_rate
+        close to 1.0; with keep_alive=False every request opens a connection.
+        """
+        adapters = {id(a): a for a in self.session.adapters.values()}.values()
+        n_requests = sum(a.n_requests for a in adapters)
+        n_connections = sum(a.n_connects for a in adapters)
+
+        reused = max(n_requests - n_connections, 0)
+        return {
+            "requests": n_requests,
+            "connections_opened": n_connections,
+            "connections_reused": reused,
+            "reuse_rate": reused / n_requests if n_requests else 0.0,
+        }
+
+    def rate_limit_stats(self) -> dict:
+        """Current tokens and wait-time metrics of this client's rate limiter."""
+        return self.rate_limiter.stats()
+
     def _sign(self, timestamp_ms: int, method: str, path: str) -> str:
         """
         Create RSA-PSS SHA256 signature over: "{timestamp}{METHOD}{path}"
@@ -81,17 +284,41 @@ class KalshiClient:
         Make a single authenticated GET request.
 
         `path` is relative to BASE_URL, e.g. "/markets" or "/markets/KCPI-25JAN-T0.3".
-        `params` are query parameters passed to requests.get().
+        `params` are query parameters passed to the pooled session.
         Returns the parsed JSON response body as a dict.
-        Raises on HTTP errors (4xx, 5xx).
+        Transient failures (connection errors, timeouts, 429, 5xx) are retried
+        per self.retry; raises once retries are exhausted or on any other 4xx.
+        Every attempt blocks until the rate limiter grants a token.
         """
-        r = http_lib.get(
-            self.BASE_URL + path,
-            headers=self._headers("GET", path),
-            params=params,
-        )
-        r.raise_for_status()
-        return r.json()
+        return self._request("GET", path, params=params).json()
+
+    def _request(self, method: str, path: str, params: dict = None) -> http_lib.Response:
+        """Send one signed request, retrying transient failures per self.retry."""
+        attempt = 0
+        while True:
+            self.rate_limiter.acquire()
+            response, error = None, None
+            try:
+                # Sign per attempt: the signature embeds a timestamp.
+                response = self.session.request(
+                    method,
+                    self.BASE_URL + path,
+                    headers=self._headers(method, path),
+                    params=params,
+                    timeout=self.timeout,
+                )
+            except http_lib.RequestException as e:
+                error = e
+
+            if not self.retry.should_retry(method, attempt, response, error):
+                if error is not None:
+                    raise error
+                response.raise_for_status()
+                return response
+
+            time.sleep(self.retry.backoff(attempt, response))
+            attempt += 1
+            self.n_retries += 1
 
     def get_all_pages(
         self,
@@ -99,7 +326,7 @@ class KalshiClient:
         params: dict = None,
         result_key: str = "markets",
         page_limit: int = 1000,
-        delay: float = 0.7,
+        delay: float = 0.0,
         show_progress: bool = False,
     ) -> list:
         """
@@ -116,39 +343,176 @@ class KalshiClient:
                          For /series this is "series".
                          For /candlesticks this is "candlesticks".
             page_limit:  Max items per page (sent as `limit` param). Kalshi max is 1000.
-            delay:       Seconds to sleep between pages to stay under rate limit.
-                         0.7s ≈ 85 requests/min, safely under the 100/min cap.
+            delay:       Extra seconds to sleep between pages. Not needed for the
+                         100/min cap, which the client's rate limiter enforces.
             show_progress: Show progress bar during pagination.
 
         Returns:
             A flat list of all result items across all pages.
+            Use iter_pages() instead for large or resumable crawls.
+        """
+        return list(self.iter_pages(
+            path, params, result_key=result_key, page_limit=page_limit,
+            delay=delay, show_progress=show_progress,
+        ))
+
+    def iter_pages(
+        self,
+        path: str,
+        params: dict = None,
+        result_key: str = "markets",
+        page_limit: int = 1000,
+        checkpoint_path: str = None,
+        delay: float = 0.0,
+        show_progress: bool = False,
+    ):
+        """
+        Stream the items of a paginated endpoint, one page in memory at a time.
+
+        With `checkpoint_path`, the cursor of the next page is written there
+        (atomically) once every item of the current page has been consumed. If
+        the checkpoint exists at start-up, the crawl resumes from it with the
+        params it was started with — so time-relative params such as
+        min_settled_ts do not drift between the crash and the resume. The
+        checkpoint is deleted when the last page has been consumed.
+
+        Items of a page interrupted mid-way are yielded again on resume, so
+        consumers persisting items should de-duplicate (e.g. by ticker).
+
+        Arguments are as for get_all_pages(), plus:
+            checkpoint_path: JSON file holding {path, params, cursor, pages, n_items}.
+
+        Yields:
+            Result items, in API order.
         """
         params = dict(params or {})
         params["limit"] = page_limit
-        all_results = []
+        page_num = 0
+        n_items = 0
+
+        if checkpoint_path and os.path.exists(checkpoint_path):
+            with open(checkpoint_path) as f:
+                ckpt = json.load(f)
+            if ckpt.get("path") != path:
+                raise ValueError(
+                    f"Checkpoint {checkpoint_path} is for {ckpt.get('path')}, not {path}"
+                )
+            params = ckpt["params"]
+            page_num = ckpt["pages"]
+            n_items = ckpt["n_items"]
+            print(f"Resuming {path} from page {page_num + 1} ({n_items} items already fetched)")
 
         # Progress bar (unknown total, so counts items fetched)
-        pbar = tqdm(desc=f"Fetching {result_key}", unit=" items", disable=not show_progress)
+        pbar = tqdm(desc=f"Fetching {result_key}", unit=" items", initial=n_items,
+                    disable=not show_progress)
 
-        page_num = 0
         while True:
             resp = self.get(path, params)
             items = resp.get(result_key, [])
-            all_results.extend(items)
+            yield from items
 
+            page_num += 1
+            n_items += len(items)
             if show_progress:
                 pbar.update(len(items))
-                pbar.set_postfix({"pages": page_num + 1})
+                pbar.set_postfix({"pages": page_num})
 
             cursor = resp.get("cursor", "")
             if not cursor or len(items) < page_limit:
                 break
 
             params["cursor"] = cursor
-            page_num += 1
-            time.sleep(delay)
+            if checkpoint_path:
+                _write_json_atomic(checkpoint_path, {
+                    "path": path,
+                    "params": params,
+                    "cursor": cursor,
+                    "pages": page_num,
+                    "n_items": n_items,
+                })
+            if delay:
+                time.sleep(delay)
+
+        pbar.close()
+        if checkpoint_path and os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+
+
+def _write_json_atomic(path: str, obj) -> None:
+    """Write JSON via a temp file + rename so a crash never leaves a torn file."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(obj, f, default=str)
+    os.replace(tmp_path, path)
+
+
+def fetch_all_resumable(
+    client: KalshiClient,
+    path: str,
+    cache_path: str,
+    params: dict = None,
+    result_key: str = "markets",
+    page_limit: int = 1000,
+    max_items: int = None,
+    show_progress: bool = True,
+) -> list:
+    """
+    Crawl a paginated endpoint into a JSON cache file, surviving crashes.
+
+    Items are appended to `{cache_path}.partial.jsonl` as they stream in and the
+    cursor is checkpointed to `{cache_path}.cursor.json`, so re-running after a
+    failure on page 40 resumes at page 40 instead of page 1. When the crawl
+    finishes (or reaches max_items), the de-duplicated items are written to
+    cache_path in the usual indent=2 JSON format and the side files removed.
+
+    Returns:
+        The list of items written to cache_path.
+    """
+    spool_path = f"{cache_path}.partial.jsonl"
+    ckpt_path = f"{cache_path}.cursor.json"
+    if os.path.dirname(cache_path):
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+
+    # Items kept from a previous, interrupted run
+    n_spooled = 0
+    if os.path.exists(spool_path) and os.path.exists(ckpt_path):
+        with open(spool_path) as f:
+            n_spooled = sum(1 for _ in f)
+    elif os.path.exists(spool_path):
+        os.remove(spool_path)  # no cursor to resume from, so start over
+
+    if not max_items or n_spooled < max_items:
+        pages = client.iter_pages(
+            path, params, result_key=result_key, page_limit=page_limit,
+            checkpoint_path=ckpt_path, show_progress=show_progress,
+        )
+        # Line-buffered so every spooled item is on disk before the generator
+        # checkpoints past its page.
+        with open(spool_path, "a", buffering=1) as spool:
+            for n_spooled, item in enumerate(pages, start=n_spooled + 1):
+                spool.write(json.dumps(item, default=str) + "\n")
+                if max_items and n_spooled >= max_items:
+                    break
+        pages.close()
+
+    items = []
+    seen = set()
+    with open(spool_path) as f:
+        for line in f:
+            item = json.loads(line)
+            key = item.get("ticker") if isinstance(item, dict) else None
+            if key is not None:
+                if key in seen:
+                    continue
+                seen.add(key)
+            items.append(item)
+    if max_items:
+        items = items[:max_items]
 
-        if show_progress:
-            pbar.close()
+    with open(cache_path, "w") as f:
+        json.dump(items, f, indent=2, default=str)
+    for side_file in (spool_path, ckpt_path):
+        if os.path.exists(side_file):
+            os.remove(side_file)
 
-        return all_results
\ No newline at end of file
+    return items
@@ -10,14 +10,14 @@ Usage:
 
 import os
 import json
-import time
 import argparse
 import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta, timezone
 from tqdm import tqdm
 
-from kalshi.client import KalshiClient
+from kalshi.client import KalshiClient, fetch_all_resumable
+from kalshi.candles import refresh_candles
 
 # Configuration
 RAW_DIR = "data/raw"
@@ -78,44 +78,19 @@ def fetch_all_settled_markets(client: KalshiClient, quick_test: bool = False, n_
     else:
         print(f"Fetching ~{target_fetch} settled markets (settled 2+ days ago)...")
 
-        # Fetch in batches until we have enough
-        all_markets = []
-        cursor = None
-        page_limit = 1000
-
-        pbar = tqdm(desc="Fetching markets", unit=" items", total=target_fetch)
-
-        while len(all_markets) < target_fetch:
-            params = {
+        # Resumable: a crashed crawl picks up from the last checkpointed cursor
+        markets = fetch_all_resumable(
+            client,
+            "/markets",
+            cache_path,
+            params={
                 "status": "settled",
                 "min_settled_ts": twelve_months_ago,
                 "max_settled_ts": two_days_ago,
-                "limit": page_limit,
-            }
-            if cursor:
-                params["cursor"] = cursor
-
-            resp = client.get("/markets", params=params)
-            items = resp.get("markets", [])
-
-            if not items:
-                break
-
-            all_markets.extend(items)
-            pbar.update(len(items))
-            pbar.set_postfix({"fetched": len(all_markets)})
-
-            cursor = resp.get("cursor", "")
-            if not cursor:
-                break
-
-            time.sleep(0.7)  # Rate limiting
-
-        pbar.close()
-        markets = all_markets
-
-        with open(cache_path, "w") as f:
-            json.dump(markets, f, indent=2, default=str)
+            },
+            result_key="markets",
+            max_items=target_fetch,
+        )
 
     print(f"✓ Fetched {len(markets)} settled markets")
     return pd.DataFrame(markets)
@@ -162,7 +137,8 @@ def sample_markets(df: pd.DataFrame, n: int) -> pd.DataFrame:
 
 
 def fetch_candlesticks(client: KalshiClient, ticker: str, series_ticker: str,
-                       start_ts: int, end_ts: int, debug: bool = False) -> list:
+                       start_ts: int, end_ts: int, debug: bool = False,
+                       refresh: bool = False) -> list:
     """
     Fetch daily candlesticks for a market.
 
@@ -172,45 +148,48 @@ def fetch_candlesticks(client: KalshiClient, ticker: str, series_ticker: str,
         start_ts: Start timestamp (Unix seconds)
         end_ts: End timestamp (Unix seconds)
         debug: Print debug info
+        refresh: If cached, fetch only candles after the last cached
+                 end_period_ts and append them (for open/recently settled markets)
 
     Returns:
-        List of candlestick dicts
+        List of candlestick dicts, or None if the fetch failed after the
+        client's retries (not cached, so a re-run retries it). A failed
+        refresh returns the existing cache.
     """
     cache_path = os.path.join(RAW_DIR, f"candles_{ticker.replace('/', '_')}.json")
 
+    cached = None
     if os.path.exists(cache_path):
         with open(cache_path) as f:
-            candles = json.load(f)
-            if debug:
-                print(f"  ✓ Loaded {len(candles)} cached candles for {ticker}")
-            return candles
+            cached = json.load(f)
+        if debug:
+            print(f"  ✓ Loaded {len(cached)} cached candles for {ticker}")
+        if not refresh:
+            return cached
 
     try:
         if debug:
             print(f"  Fetching /series/{series_ticker}/markets/{ticker}/candlesticks")
 
-        candles = client.get_all_pages(
-            f"/series/{series_ticker}/markets/{ticker}/candlesticks",
-            params={
-                "start_ts": start_ts,
-                "end_ts": end_ts,
-                "period_interval": CANDLE_INTERVAL,  # Hourly (60) for short-lived markets
-            },
-            result_key="candlesticks",
+        end_ts = min(end_ts, int(datetime.now(timezone.utc).timestamp()))
+        candles, n_new = refresh_candles(
+            client, ticker, series_ticker, cached or [],
+            start_ts, end_ts, period_interval=CANDLE_INTERVAL,
         )
 
-        with open(cache_path, "w") as f:
-            json.dump(candles, f, indent=2, default=str)
+        if cached is None or n_new:
+            with open(cache_path, "w") as f:
+                json.dump(candles, f, indent=2, default=str)
 
         if debug:
-            print(f"  ✓ Fetched {len(candles)} candles for {ticker}")
+            print(f"  ✓ Fetched {n_new} new candles for {ticker}")
 
         return candles
 
     except Exception as e:
         if debug:
             print(f"  ✗ Candlestick fetch failed for {ticker}: {e}")
-        return []
+        return cached
 
 
 def extract_price_at_midpoint(candles: list, midpoint_ts: float) -> float:
@@ -390,9 +369,6 @@ def compute_features(client: KalshiClient, markets_df: pd.DataFrame) -> pd.DataF
             'y_true': y_true,
         })
 
-        # Rate limiting
-        time.sleep(0.1)
-
     return pd.DataFrame(results)
 
 
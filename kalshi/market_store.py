@@ -0,0 +1,274 @@
+"""
+kalshi/market_store.py
+
+Unified, indexed store for market metadata.
+
+Market metadata lives in several JSON caches written by different fetchers:
+
+    data/exp2/raw/targeted_markets.json     experiment2 targeted economics/finance
+    data/exp5/all_settled_markets.json      experiment5 generic settled markets
+    data/exp2/raw/all_settled_markets.json  experiment2 resumable crawl
+    data/raw/settled_markets_{n}.json       kalshi.market_data
+    data/new_series/{series}_markets.json   scripts/fetch_*_series.py
+
+Each loader used to re-read and re-deduplicate these in Python loops. The
+store merges them once into SQLite (stdlib, no server) keyed by ticker, with
+typed columns for strikes, volume, OI and times, and indexes on series,
+event and settlement time. Duplicates across caches resolve by source order
+(earlier sources win), matching experiment1.load_all_markets().
+
+The store rebuilds itself when any source file is added, removed or
+modified, so callers never see stale metadata.
+
+Usage:
+    from kalshi.market_store import load_market_store
+    store = load_market_store()
+    store.markets(series="KXCPI")                       # raw market dicts
+    store.frame(event="KXCPI-25JAN")                    # typed DataFrame
+    store.markets(settled_after=..., settled_before=...)
+"""
+
+import os
+import glob
+import json
+import sqlite3
+from datetime import datetime
+
+import pandas as pd
+
+STORE_PATH = "data/market_store.sqlite"
+
+# (source name, glob pattern), highest priority first
+DEFAULT_SOURCES = [
+    ("exp2_targeted", "data/exp2/raw/targeted_markets.json"),
+    ("exp5_settled", "data/exp5/all_settled_markets.json"),
+    ("exp2_settled", "data/exp2/raw/all_settled_markets.json"),
+    ("raw_settled", "data/raw/settled_markets_*.json"),
+    ("new_series", "data/new_series/*_markets.json"),
+]
+
+TYPED_COLUMNS = [
+    "ticker", "series", "event_ticker", "source", "status", "result", "strike_type",
+    "floor_strike", "cap_strike", "volume", "open_interest",
+    "open_ts", "close_ts", "settlement_ts",
+]
+
+_SCHEMA = """
+CREATE TABLE markets (
+    ticker        TEXT PRIMARY KEY,
+    series        TEXT,
+    event_ticker  TEXT,
+    source        TEXT,
+    status        TEXT,
+    result        TEXT,
+    strike_type   TEXT,
+    floor_strike  REAL,
+    cap_strike    REAL,
+    volume        INTEGER,
+    open_interest INTEGER,
+    open_ts       INTEGER,
+    close_ts      INTEGER,
+    settlement_ts INTEGER,
+    raw           TEXT
+);
+CREATE INDEX idx_markets_series ON markets(series);
+CREATE INDEX idx_markets_event ON markets(event_ticker);
+CREATE INDEX idx_markets_settlement ON markets(settlement_ts);
+CREATE INDEX idx_markets_source ON markets(source);
+CREATE TABLE source_files (
+    path     TEXT PRIMARY KEY,
+    source   TEXT,
+    size     INTEGER,
+    mtime_ns INTEGER
+);
+"""
+
+
+def _float(value) -> float | None:
+    try:
+        return float(value) if value not in (None, "") else None
+    except (ValueError, TypeError):
+        return None
+
+
+def _int(value) -> int | None:
+    f = _float(value)
+    return int(f) if f is not None else None
+
+
+def _epoch(value) -> int | None:
+    """ISO-8601 string (or epoch number) to unix seconds."""
+    if value in (None, ""):
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    try:
+        return int(datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp())
+    except ValueError:
+        return None
+
+
+def _row(market: dict, source: str) -> tuple:
+    ticker = market["ticker"]
+    series = market.get("series_ticker") or ticker.split("-")[0]
+    parts = ticker.split("-")
+    event = market.get("event_ticker") or ("-".join(parts[:-1]) if len(parts) >= 3 else ticker)
+    return (
+        ticker, series, event, source,
+        market.get("status"), market.get("result"), market.get("strike_type"),
+        _float(market.get("floor_strike")), _float(market.get("cap_strike")),
+        _int(market.get("volume")), _int(market.get("open_interest")),
+        _epoch(market.get("open_time")), _epoch(market.get("close_time")),
+        _epoch(market.get("settlement_ts")),
+        json.dumps(market, default=str),
+    )
+
+
+def _source_files(sources: list[tuple[str, str]]) -> list[tuple[str, str, int, int]]:
+    files = []
+    for name, pattern in sources:
+        for path in sorted(glob.glob(pattern)):
+            st = os.stat(path)
+            files.append((path, name, st.st_size, st.st_mtime_ns))
+    return files
+
+
+class MarketStore:
+    """
+    Query interface over the SQLite metadata store.
+
+    Arguments:
+        path: SQLite file built by build_market_store().
+    """
+
+    def __init__(self, path: str = STORE_PATH):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+
+    def close(self):
+        self.conn.close()
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM markets").fetchone()[0]
+
+    def _where(self, tickers=None, series=None, event=None, sources=None, status=None,
+               result=None, settled_after=None, settled_before=None) -> tuple[str, list]:
+        clauses, args = [], []
+
+        def _in(column, values):
+            values = [values] if isinstance(values, str) else list(values)
+            clauses.append(f"{column} IN ({','.join('?' * len(values))})")
+            args.extend(values)
+
+        if tickers is not None:
+            _in("ticker", tickers)
+        if series is not None:
+            _in("series", series)
+        if event is not None:
+            _in("event_ticker", event)
+        if sources is not None:
+            _in("source", sources)
+        if status is not None:
+            _in("status", status)
+        if result is not None:
+            _in("result", result)
+        if settled_after is not None:
+            clauses.append("settlement_ts >= ?")
+            args.append(_epoch(settled_after))
+        if settled_before is not None:
+            clauses.append("settlement_ts < ?")
+            args.append(_epoch(settled_before))
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", args
+
+    def markets(self, **filters) -> list[dict]:
+        """Raw market dicts matching the filters, in source/file order.
+
+        Filters (all optional, combined with AND): tickers, series, event,
+        sources, status, result (each a str or iterable of str), and
+        settled_after / settled_before (ISO string or unix seconds; half-open
+        interval).
+        """
+        where, args = self._where(**filters)
+        rows = self.conn.execute(f"SELECT raw FROM markets{where} ORDER BY rowid", args)
+        return [json.loads(raw) for (raw,) in rows]
+
+    def frame(self, **filters) -> pd.DataFrame:
+        """Typed columns (no raw payload) for markets matching the filters."""
+        where, args = self._where(**filters)
+        return pd.read_sql_query(
+            f"SELECT {', '.join(TYPED_COLUMNS)} FROM markets{where} ORDER BY rowid",
+            self.conn, params=args,
+        )
+
+    def get(self, ticker: str) -> dict | None:
+        row = self.conn.execute("SELECT raw FROM markets WHERE ticker = ?", (ticker,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def tickers(self, **filters) -> list[str]:
+        where, args = self._where(**filters)
+        return [t for (t,) in self.conn.execute(f"SELECT ticker FROM markets{where} ORDER BY rowid", args)]
+
+    def is_current(self, sources: list[tuple[str, str]] = DEFAULT_SOURCES) -> bool:
+        """True if the source files on disk match the ones the store was built from."""
+        stored = sorted(self.conn.execute("SELECT path, source, size, mtime_ns FROM source_files"))
+        return stored == sorted(_source_files(sources))
+
+
+def build_market_store(
+    path: str = STORE_PATH,
+    sources: list[tuple[str, str]] = DEFAULT_SOURCES,
+) -> dict:
+    """(Re)build the store from the JSON caches. Returns per-source counts.
+
+    Args:
+        path: SQLite file to write (replaced atomically)
+        sources: (name, glob pattern) pairs, highest priority first
+    """
+    files = _source_files(sources)
+    tmp_path = f"{path}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    conn = sqlite3.connect(tmp_path)
+    conn.executescript(_SCHEMA)
+    counts = {}
+    for file_path, name, size, mtime_ns in files:
+        try:
+            with open(file_path) as f:
+                markets = json.load(f)
+        except (json.JSONDecodeError, IOError) as e:
+            print(f"  Skipping unreadable market cache {file_path}: {e}")
+            continue
+        rows = [_row(m, name) for m in markets if isinstance(m, dict) and m.get("ticker")]
+        before = conn.total_changes
+        conn.executemany(f"INSERT OR IGNORE INTO markets VALUES ({','.join('?' * 15)})", rows)
+        counts[name] = counts.get(name, 0) + conn.total_changes - before
+        conn.execute("INSERT INTO source_files VALUES (?, ?, ?, ?)", (file_path, name, size, mtime_ns))
+    conn.commit()
+    conn.close()
+    os.replace(tmp_path, path)
+    return counts
+
+
+def load_market_store(
+    path: str = STORE_PATH,
+    sources: list[tuple[str, str]] = DEFAULT_SOURCES,
+) -> MarketStore | None:
+    """Open the store, rebuilding it first if any source cache changed.
+
+    Returns None if none of the source caches exist.
+    """
+    if not _source_files(sources):
+        return None
+    if os.path.exists(path):
+        store = MarketStore(path)
+        try:
+            if store.is_current(sources):
+                return store
+        except sqlite3.DatabaseError:
+            pass
+        store.close()
+    build_market_store(path, sources)
+    return MarketStore(path)
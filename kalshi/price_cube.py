@@ -0,0 +1,278 @@
+"""
+kalshi/price_cube.py
+
+Memory-mapped, time-aligned price cube for multi-strike events.
+
+Experiments 7, 12 and 13 rebuild one pd.Series per strike market and align
+them by timestamp for every event they touch. The cube does that once:
+for each event it stores an (hour × strike) block of close, yes_bid and
+yes_ask prices, NaN where a strike has no candle for that hour. Blocks are
+concatenated into flat .npy files that any process opens with
+np.load(mmap_mode="r"), so parallel workers share the OS page cache instead of
+each parsing and holding their own copy.
+
+Layout (under CUBE_DIR):
+    close.npy, yes_bid.npy, yes_ask.npy   float64, all event blocks, row-major
+    ts.npy                                int64, hour axis of every event
+    index.json                            {event_ticker: {offset, ts_offset,
+                                           n_hours, n_strikes, tickers, strikes,
+                                           sources}}
+
+sources holds each ticker's candle-manifest [size, mtime_ns] at build time
+(None if it had no JSON file). Readers check an event with
+PriceCube.is_current() and load per ticker instead when a candle file has
+been refreshed or fetched since the build.
+
+Events have different lifetimes and strike counts, so the "cube" is ragged —
+each event block is dense, but blocks are not padded to a common shape.
+
+Build it with:
+    uv run python -m kalshi.price_cube --build
+
+Usage:
+    from kalshi.price_cube import open_price_cube
+    cube = open_price_cube()             # None if not built
+    block = cube.event("KXCPI-25JAN")
+    block["ts"], block["strikes"], block["close"]   # (h,), (s,), (h, s)
+"""
+
+import os
+import json
+import argparse
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from kalshi.candle_manifest import load_manifest
+from kalshi.candle_store import CANDLE_DIR, STORE_DIR, candles_to_columns, open_store
+
+CUBE_DIR = "data/exp7/price_cube"
+PRICE_FIELDS = ("close", "yes_bid", "yes_ask")
+
+
+class PriceCube:
+    """Read-only view of a built price cube. Arrays are memory-mapped."""
+
+    def __init__(self, root: str = CUBE_DIR):
+        self.root = root
+        with open(os.path.join(root, "index.json")) as f:
+            meta = json.load(f)
+        self.built_at = meta.get("built_at")
+        self.index = meta["events"]
+        self.ts = np.load(os.path.join(root, "ts.npy"), mmap_mode="r")
+        self.fields = {
+            name: np.load(os.path.join(root, f"{name}.npy"), mmap_mode="r")
+            for name in PRICE_FIELDS
+        }
+
+    def __contains__(self, event_ticker: str) -> bool:
+        return event_ticker in self.index
+
+    def events(self) -> list[str]:
+        return sorted(self.index)
+
+    def is_current(self, event_ticker: str, tickers: list[str], candle_dir: str = CANDLE_DIR) -> bool:
+        """True if the cube holds all of tickers for the event, as their candle files stand now.
+
+        Compares the sources recorded at build time with candle_dir's
+        manifest; cubes built before sources were recorded are never current.
+        """
+        entry = self.index.get(event_ticker)
+        if entry is None or "sources" not in entry:
+            return False
+        recorded = dict(zip(entry["tickers"], entry["sources"]))
+        if not set(tickers) <= set(recorded):
+            return False
+        manifest = load_manifest(candle_dir)
+        return all(recorded[t] == _source(manifest, t) for t in tickers)
+
+    def event(self, event_ticker: str) -> dict | None:
+        """One event's block: ts (h,), tickers/strikes (s,), and (h, s) price views."""
+        entry = self.index.get(event_ticker)
+        if entry is None:
+            return None
+        h, s = entry["n_hours"], entry["n_strikes"]
+        lo = entry["offset"]
+        block = {
+            "ts": self.ts[entry["ts_offset"]:entry["ts_offset"] + h],
+            "tickers": entry["tickers"],
+            "strikes": np.asarray(entry["strikes"], dtype=np.float64),
+        }
+        for name, arr in self.fields.items():
+            block[name] = arr[lo:lo + h * s].reshape(h, s)
+        return block
+
+    def price_series(self, event_ticker: str, field: str = "close") -> dict[str, pd.Series]:
+        """Per-ticker Series (NaN hours dropped), as load_candle_prices() would return."""
+        block = self.event(event_ticker)
+        if block is None:
+            return {}
+        idx = pd.to_datetime(np.asarray(block["ts"]), unit="s", utc=True)
+        out = {}
+        for j, ticker in enumerate(block["tickers"]):
+            col = np.asarray(block[field][:, j])
+            mask = ~np.isnan(col)
+            if mask.any():
+                out[ticker] = pd.Series(col[mask], index=idx[mask], name=ticker)
+        return out
+
+
+_open_cubes: dict[str, tuple[float, PriceCube]] = {}
+
+
+def open_price_cube(root: str = CUBE_DIR) -> PriceCube | None:
+    """Return the PriceCube at root, or None if it hasn't been built.
+
+    Cubes are cached per process and reopened only when index.json changes.
+    """
+    index_path = os.path.join(root, "index.json")
+    if not os.path.exists(index_path):
+        return None
+    mtime = os.path.getmtime(index_path)
+    cached = _open_cubes.get(root)
+    if cached is None or cached[0] != mtime:
+        cached = (mtime, PriceCube(root))
+        _open_cubes[root] = cached
+    return cached[1]
+
+
+def _source(manifest, ticker: str) -> list[int] | None:
+    """[size, mtime_ns] of a ticker's candle file per the manifest, None if absent."""
+    entry = manifest.get(ticker)
+    return [entry["size"], entry["mtime_ns"]] if entry is not None else None
+
+
+def _ticker_columns(ticker: str, store, candle_dir: str) -> dict | None:
+    """Typed candle columns from the columnar store, else the JSON cache."""
+    if store is not None and store.has(ticker):
+        return store.get(ticker)
+    path = os.path.join(candle_dir, f"{ticker}_60.json")
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path) as f:
+            return candles_to_columns(json.load(f))
+    except (json.JSONDecodeError, IOError):
+        return None
+
+
+def _event_block(tickers: list[str], store, candle_dir: str) -> tuple[np.ndarray, dict]:
+    cols_by_ticker = [_ticker_columns(t, store, candle_dir) for t in tickers]
+    present = [c for c in cols_by_ticker if c is not None and len(c["ts"])]
+    if not present:
+        return np.array([], dtype=np.int64), {}
+
+    ts = np.unique(np.concatenate([c["ts"] for c in present]))
+    ts = ts[ts != 0]
+    blocks = {name: np.full((len(ts), len(tickers)), np.nan) for name in PRICE_FIELDS}
+    for j, cols in enumerate(cols_by_ticker):
+        if cols is None or not len(cols["ts"]):
+            continue
+        for name in PRICE_FIELDS:
+            keep = (cols["ts"] != 0) & ~np.isnan(cols[name])
+            rows = np.searchsorted(ts, cols["ts"][keep])
+            # Fancy assignment applies in order, so a repeated period keeps
+            # its later candle, as the dict-based loaders do.
+            blocks[name][rows, j] = cols[name][keep]
+    return ts, blocks
+
+
+def build_price_cube(
+    event_groups: dict[str, pd.DataFrame],
+    root: str = CUBE_DIR,
+    candle_dir: str = CANDLE_DIR,
+    store_root: str = STORE_DIR,
+) -> dict:
+    """Build the cube from candle data for every event in event_groups.
+
+    Args:
+        event_groups: {event_ticker: DataFrame with ticker and floor_strike},
+            e.g. experiment7.implied_distributions.group_by_event(). Strike
+            order within each event follows the DataFrame's row order.
+        root: Output directory (rewritten in full)
+        candle_dir: Per-ticker JSON cache, used for tickers missing from the store
+        store_root: Columnar candle store, preferred when present
+
+    Returns:
+        Summary counts
+    """
+    store = open_store(store_root, candle_dir=candle_dir)
+    manifest = load_manifest(candle_dir)
+    index = {}
+    ts_parts = []
+    field_parts = {name: [] for name in PRICE_FIELDS}
+    offset = ts_offset = 0
+
+    for event_ticker, event_markets in sorted(event_groups.items()):
+        tickers = event_markets["ticker"].tolist()
+        ts, blocks = _event_block(tickers, store, candle_dir)
+        if not len(ts):
+            continue
+        index[event_ticker] = {
+            "offset": offset,
+            "ts_offset": ts_offset,
+            "n_hours": len(ts),
+            "n_strikes": len(tickers),
+            "tickers": tickers,
+            "strikes": [float(s) for s in event_markets["floor_strike"]],
+            "sources": [_source(manifest, t) for t in tickers],
+        }
+        ts_parts.append(ts)
+        for name in PRICE_FIELDS:
+            field_parts[name].append(blocks[name].ravel())
+        offset += len(ts) * len(tickers)
+        ts_offset += len(ts)
+
+    os.makedirs(root, exist_ok=True)
+
+    def _save(name: str, parts: list, dtype):
+        arr = np.concatenate(parts).astype(dtype) if parts else np.array([], dtype=dtype)
+        tmp = os.path.join(root, f"{name}.tmp.npy")
+        np.save(tmp, arr)
+        os.replace(tmp, os.path.join(root, f"{name}.npy"))
+
+    _save("ts", ts_parts, np.int64)
+    for name in PRICE_FIELDS:
+        _save(name, field_parts[name], np.float64)
+
+    # index.json goes last: a reader never sees an index pointing past the arrays
+    tmp_index = os.path.join(root, "index.json.tmp")
+    with open(tmp_index, "w") as f:
+        json.dump({
+            "built_at": datetime.now(timezone.utc).isoformat(),
+            "fields": list(PRICE_FIELDS),
+            "events": index,
+        }, f)
+    os.replace(tmp_index, os.path.join(root, "index.json"))
+
+    return {"n_events": len(index), "n_hours": ts_offset, "n_cells": offset}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the memory-mapped strike price cube")
+    parser.add_argument("--build", action="store_true", help="(Re)build the cube from cached candles")
+    parser.add_argument("--root", default=CUBE_DIR)
+    args = parser.parse_args()
+
+    if args.build:
+        from experiment7.implied_distributions import (
+            load_targeted_markets,
+            extract_strike_markets,
+            group_by_event,
+        )
+
+        event_groups = group_by_event(extract_strike_markets(load_targeted_markets()))
+        summary = build_price_cube(event_groups, root=args.root)
+        print(f"✓ Price cube: {summary['n_events']} events, {summary['n_hours']} event-hours, "
+              f"{summary['n_cells']} cells → {args.root}")
+    else:
+        cube = open_price_cube(args.root)
+        if cube is None:
+            print(f"No cube at {args.root}; run with --build")
+            return
+        print(f"Price cube built {cube.built_at}: {len(cube.events())} events")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""
+kalshi/rate_limit.py
+
+Token-bucket rate limiting for the Kalshi API.
+
+Kalshi allows 100 requests/minute. Rather than sleeping a fixed amount after
+every call (which wastes the budget whenever a request is itself slow), every
+KalshiClient request takes one token from a bucket that refills continuously.
+Idle time accumulates tokens up to `capacity`, so short bursts go out
+immediately, and sustained load runs at `rate_per_min`.
+
+Two implementations:
+    TokenBucket      — in-process, thread-safe. One shared instance per process
+                       (see shared_bucket()) so every client and thread draws
+                       from the same budget.
+    FileTokenBucket  — state lives in a small JSON file guarded by flock(), so
+                       several processes (e.g. parallel backfill scripts) share
+                       one budget. Unix only.
+
+Usage:
+    bucket = shared_bucket()
+    bucket.acquire()          # blocks until a token is available
+    print(bucket.stats())
+"""
+
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+
+# Sustained rate + burst are chosen so that no 60s window exceeds 100 requests:
+# capacity + rate_per_min <= 100.
+DEFAULT_RATE_PER_MIN = 90
+DEFAULT_CAPACITY = 10
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+
+    Arguments:
+        rate_per_min: Sustained refill rate (tokens per minute).
+        capacity:     Max tokens that can accumulate (burst size).
+    """
+
+    def __init__(self, rate_per_min: float = DEFAULT_RATE_PER_MIN, capacity: float = DEFAULT_CAPACITY):
+        if rate_per_min <= 0 or capacity <= 0:
+            raise ValueError("rate_per_min and capacity must be positive")
+        self.rate_per_min = rate_per_min
+        self.rate = rate_per_min / 60.0  # tokens per second
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+
+        # Metrics
+        self._acquired = 0
+        self._n_waited = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def _refill(self, tokens: float, updated: float, now: float) -> float:
+        return min(self.capacity, tokens + (now - updated) * self.rate)
+
+    def _try_take(self, n: float) -> float:
+        """Take n tokens if available and return 0, else return seconds to wait."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = self._refill(self._tokens, self._updated, now)
+            self._updated = now
+            if self._tokens >= n:
+                self._tokens -= n
+                return 0.0
+            return (n - self._tokens) / self.rate
+
+    def acquire(self, n: float = 1) -> float:
+        """
+        Block until n tokens are available and take them.
+
+        Returns the number of seconds spent waiting.
+        """
+        if n > self.capacity:
+            raise ValueError(f"Cannot acquire {n} tokens from a bucket of capacity {self.capacity}")
+
+        waited = 0.0
+        while True:
+            wait = self._try_take(n)
+            if wait <= 0:
+                break
+            time.sleep(wait)
+            waited += wait
+
+        with self._lock:
+            self._acquired += 1
+            self._total_wait += waited
+            self._max_wait = max(self._max_wait, waited)
+            if waited > 0:
+                self._n_waited += 1
+        return waited
+
+    def tokens(self) -> float:
+        """Tokens currently available (after refill)."""
+        with self._lock:
+            return self._refill(self._tokens, self._updated, time.monotonic())
+
+    def stats(self) -> dict:
+        """Current tokens plus cumulative wait-time metrics for this process."""
+        tokens = self.tokens()
+        with self._lock:
+            return {
+                "tokens": round(tokens, 3),
+                "capacity": self.capacity,
+                "rate_per_min": self.rate_per_min,
+                "acquired": self._acquired,
+                "n_waited": self._n_waited,
+                "total_wait_s": round(self._total_wait, 3),
+                "mean_wait_s": round(self._total_wait / self._acquired, 4) if self._acquired else 0.0,
+                "max_wait_s": round(self._max_wait, 3),
+            }
+
+
+class FileTokenBucket(TokenBucket):
+    """
+    Token bucket whose state is shared across processes through `path`.
+
+    The file holds {"tokens": float, "updated": unix_time}; every take reads,
+    refills and rewrites it under an exclusive flock(). Wall-clock time is used
+    (not monotonic) because it has to be comparable between processes.
+    Wait-time metrics in stats() are still per-process.
+    """
+
+    def __init__(self, path: str, rate_per_min: float = DEFAULT_RATE_PER_MIN,
+                 capacity: float = DEFAULT_CAPACITY):
+        super().__init__(rate_per_min, capacity)
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    @contextmanager
+    def _locked_state(self):
+        import fcntl
+
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        with os.fdopen(fd, "r+") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                raw = f.read()
+                try:
+                    state = json.loads(raw) if raw else {}
+                except json.JSONDecodeError:
+                    state = {}
+                now = time.time()
+                tokens = float(state.get("tokens", self.capacity))
+                updated = float(state.get("updated", now))
+                state = {"tokens": self._refill(tokens, updated, now), "updated": now}
+
+                yield state
+
+                f.seek(0)
+                f.truncate()
+                f.write(json.dumps(state))
+                f.flush()
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _try_take(self, n: float) -> float:
+        with self._locked_state() as state:
+            if state["tokens"] >= n:
+                state["tokens"] -= n
+                return 0.0
+            return (n - state["tokens"]) / self.rate
+
+    def tokens(self) -> float:
+        with self._locked_state() as state:
+            return state["tokens"]
+
+
+_shared_bucket = None
+_shared_lock = threading.Lock()
+
+
+def shared_bucket() -> TokenBucket:
+    """
+    Return the process-wide bucket used by every KalshiClient by default.
+
+    If KALSHI_RATE_LIMIT_FILE is set, the bucket is file-backed at that path so
+    all processes pointing at the same file share one budget.
+    """
+    global _shared_bucket
+    with _shared_lock:
+        if _shared_bucket is None:
+            path = os.getenv("KALSHI_RATE_LIMIT_FILE")
+            _shared_bucket = FileTokenBucket(path) if path else TokenBucket()
+        return _shared_bucket
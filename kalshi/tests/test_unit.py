@@ -0,0 +1,848 @@
+"""
+kalshi/tests/test_unit.py
+
+Unit tests for the shared Kalshi client and data utilities.
+Tests use a throwaway RSA key and a local HTTP server — no real API calls.
+"""
+
+import json
+import time
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pytest
+
+
+class _JSONHandler(BaseHTTPRequestHandler):
+    """Serves canned JSON responses keyed by path; records every request."""
+
+    protocol_version = "HTTP/1.1"  # required for keep-alive
+
+    def do_GET(self):
+        server = self.server
+        server.requests_seen.append(self.path)
+        status, body, headers = server.respond(self.path)
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for k, v in headers.items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def local_server():
+    """Local HTTP server. Set `server.respond = fn(path) -> (status, body, headers)`."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _JSONHandler)
+    server.requests_seen = []
+    server.respond = lambda path: (200, {}, {})
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def client_factory(tmp_path, monkeypatch):
+    """Build KalshiClients signed with a throwaway key, pointed at a local server."""
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import rsa
+
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    key_path = tmp_path / "key.pem"
+    key_path.write_bytes(key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.TraditionalOpenSSL,
+        serialization.NoEncryption(),
+    ))
+    monkeypatch.setenv("KALSHI_KEY_ID", "test-key")
+    monkeypatch.setenv("KALSHI_PRIVATE_KEY_PATH", str(key_path))
+
+    from kalshi.client import KalshiClient
+    from kalshi.rate_limit import TokenBucket
+
+    def make(server, **kwargs):
+        kwargs.setdefault("rate_limiter", TokenBucket(rate_per_min=1e6, capacity=100))
+        client = KalshiClient(**kwargs)
+        client.BASE_URL = f"http://127.0.0.1:{server.server_address[1]}"
+        return client
+
+    return make
+
+
+# =============================================================================
+# Test Connection Pooling
+# =============================================================================
+
+
+class TestConnectionPool:
+    def test_get_reuses_connection(self, local_server, client_factory):
+        """Serial requests through one client should share a single connection."""
+        local_server.respond = lambda path: (200, {"ok": True}, {})
+        with client_factory(local_server) as client:
+            for _ in range(5):
+                assert client.get("/markets") == {"ok": True}
+            stats = client.connection_stats()
+
+        assert stats["requests"] == 5
+        assert stats["connections_opened"] == 1
+        assert stats["connections_reused"] == 4
+
+    def test_keep_alive_disabled_opens_new_connections(self, local_server, client_factory):
+        local_server.respond = lambda path: (200, {}, {})
+        with client_factory(local_server, keep_alive=False) as client:
+            for _ in range(3):
+                client.get("/markets")
+            stats = client.connection_stats()
+
+        assert stats["requests"] == 3
+        assert stats["connections_opened"] == 3
+        assert stats["reuse_rate"] == 0.0
+
+    def test_stats_empty_before_first_request(self, local_server, client_factory):
+        client = client_factory(local_server)
+        assert client.connection_stats()["requests"] == 0
+        client.close()
+
+
+# =============================================================================
+# Test Rate Limiting
+# =============================================================================
+
+
+class TestTokenBucket:
+    def test_burst_then_throttle(self):
+        """A full bucket serves `capacity` requests at once, then waits for refill."""
+        from kalshi.rate_limit import TokenBucket
+
+        bucket = TokenBucket(rate_per_min=600, capacity=5)  # 10 tokens/s
+        for _ in range(5):
+            assert bucket.acquire() == 0.0
+        waited = bucket.acquire()
+        assert 0.05 < waited < 0.3
+
+        stats = bucket.stats()
+        assert stats["acquired"] == 6
+        assert stats["n_waited"] == 1
+        assert stats["tokens"] < 1
+
+    def test_sustained_rate(self):
+        """After the burst, throughput converges to rate_per_min."""
+        from kalshi.rate_limit import TokenBucket
+
+        bucket = TokenBucket(rate_per_min=1200, capacity=1)  # 20 tokens/s
+        start = time.monotonic()
+        for _ in range(11):
+            bucket.acquire()
+        elapsed = time.monotonic() - start
+        assert 0.45 < elapsed < 0.8  # 10 refills at 50ms each
+
+    def test_threads_share_budget(self):
+        from kalshi.rate_limit import TokenBucket
+
+        bucket = TokenBucket(rate_per_min=1200, capacity=4)
+        threads = [threading.Thread(target=bucket.acquire) for _ in range(8)]
+        start = time.monotonic()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert time.monotonic() - start > 0.15  # 4 beyond the burst, 50ms each
+        assert bucket.stats()["acquired"] == 8
+
+    def test_file_bucket_shared_between_instances(self, tmp_path):
+        """Two file-backed buckets on the same path draw from one budget."""
+        from kalshi.rate_limit import FileTokenBucket
+
+        path = str(tmp_path / "bucket.json")
+        a = FileTokenBucket(path, rate_per_min=60, capacity=3)
+        b = FileTokenBucket(path, rate_per_min=60, capacity=3)
+        a.acquire()
+        a.acquire()
+        assert b.tokens() == pytest.approx(1, abs=0.1)
+        b.acquire()
+        assert a.tokens() < 0.2
+
+    def test_client_get_draws_token(self, local_server, client_factory):
+        from kalshi.rate_limit import TokenBucket
+
+        bucket = TokenBucket(rate_per_min=60, capacity=10)
+        client = client_factory(local_server, rate_limiter=bucket)
+        client.get("/markets")
+        client.get("/markets")
+        stats = client.rate_limit_stats()
+        assert stats["acquired"] == 2
+        assert stats["tokens"] == pytest.approx(8, abs=0.2)
+        client.close()
+
+
+# =============================================================================
+# Test Retry Policy
+# =============================================================================
+
+
+class TestRetry:
+    def _flaky(self, failures):
+        """respond() that returns each (status, headers) in failures, then 200."""
+        queue = list(failures)
+
+        def respond(path):
+            if queue:
+                status, headers = queue.pop(0)
+                return status, {"error": "transient"}, headers
+            return 200, {"ok": True}, {}
+        return respond
+
+    def test_transient_errors_are_retried(self, local_server, client_factory):
+        from kalshi.client import RetryPolicy
+
+        local_server.respond = self._flaky([(503, {}), (502, {})])
+        client = client_factory(local_server, retry=RetryPolicy(backoff_base=0.01))
+        assert client.get("/markets") == {"ok": True}
+        assert len(local_server.requests_seen) == 3
+        assert client.n_retries == 2
+        client.close()
+
+    def test_retry_after_is_honoured(self, local_server, client_factory):
+        from kalshi.client import RetryPolicy
+
+        local_server.respond = self._flaky([(429, {"Retry-After": "0.3"})])
+        client = client_factory(local_server, retry=RetryPolicy(backoff_base=0.01))
+        start = time.monotonic()
+        assert client.get("/markets") == {"ok": True}
+        assert time.monotonic() - start >= 0.3
+        client.close()
+
+    def test_client_errors_not_retried(self, local_server, client_factory):
+        import requests
+        from kalshi.client import RetryPolicy
+
+        local_server.respond = self._flaky([(404, {})])
+        client = client_factory(local_server, retry=RetryPolicy(backoff_base=0.01))
+        with pytest.raises(requests.HTTPError):
+            client.get("/markets")
+        assert len(local_server.requests_seen) == 1
+        client.close()
+
+    def test_gives_up_after_max_retries(self, local_server, client_factory):
+        import requests
+        from kalshi.client import RetryPolicy
+
+        local_server.respond = self._flaky([(500, {})] * 10)
+        client = client_factory(local_server, retry=RetryPolicy(max_retries=2, backoff_base=0.01))
+        with pytest.raises(requests.HTTPError):
+            client.get("/markets")
+        assert len(local_server.requests_seen) == 3
+        client.close()
+
+    def test_non_idempotent_methods_never_retried(self):
+        import requests
+        from kalshi.client import RetryPolicy
+
+        policy = RetryPolicy()
+        err = requests.ConnectionError("reset")
+        assert policy.should_retry("GET", 0, error=err)
+        assert not policy.should_retry("POST", 0, error=err)
+
+    def test_backoff_bounded_and_jittered(self):
+        from kalshi.client import RetryPolicy
+
+        policy = RetryPolicy(backoff_base=1.0, backoff_max=4.0)
+        delays = [policy.backoff(attempt=5) for _ in range(200)]
+        assert all(0 <= d <= 4.0 for d in delays)
+        assert len(set(delays)) > 100
+
+
+# =============================================================================
+# Test Pagination
+# =============================================================================
+
+
+class TestPagination:
+    def _paged(self, n_pages, page_size=2, fail_on_page=None):
+        """respond() serving n_pages of markets via cursor "p{k}"; optional failing page."""
+        state = {"fail_on_page": fail_on_page}
+
+        def respond(path):
+            from urllib.parse import urlparse, parse_qs
+            query = parse_qs(urlparse(path).query)
+            page = int(query.get("cursor", ["p0"])[0][1:])
+            if page == state["fail_on_page"]:
+                return 500, {"error": "boom"}, {}
+            items = [{"ticker": f"M-{page}-{i}"} for i in range(page_size)]
+            cursor = f"p{page + 1}" if page + 1 < n_pages else ""
+            return 200, {"markets": items, "cursor": cursor}, {}
+        return respond, state
+
+    def test_iter_pages_streams_all_items(self, local_server, client_factory):
+        local_server.respond, _ = self._paged(3)
+        client = client_factory(local_server)
+        items = list(client.iter_pages("/markets", page_limit=2))
+        assert [m["ticker"] for m in items] == [f"M-{p}-{i}" for p in range(3) for i in range(2)]
+        assert client.get_all_pages("/markets", page_limit=2) == items
+        client.close()
+
+    def test_iter_pages_resumes_from_checkpoint(self, local_server, client_factory, tmp_path):
+        from kalshi.client import RetryPolicy
+
+        respond, state = self._paged(4, fail_on_page=2)
+        local_server.respond = respond
+        client = client_factory(local_server, retry=RetryPolicy(max_retries=0))
+        ckpt = str(tmp_path / "crawl.json")
+
+        seen = []
+        with pytest.raises(Exception):
+            for m in client.iter_pages("/markets", page_limit=2, checkpoint_path=ckpt):
+                seen.append(m["ticker"])
+        assert len(seen) == 4
+        assert json.load(open(ckpt))["cursor"] == "p2"
+
+        state["fail_on_page"] = None
+        n_before = len(local_server.requests_seen)
+        rest = [m["ticker"] for m in client.iter_pages("/markets", page_limit=2, checkpoint_path=ckpt)]
+        assert rest == [f"M-{p}-{i}" for p in (2, 3) for i in range(2)]
+        assert len(local_server.requests_seen) - n_before == 2  # pages 0-1 not re-fetched
+        assert not (tmp_path / "crawl.json").exists()
+        client.close()
+
+    def test_fetch_all_resumable_survives_crash(self, local_server, client_factory, tmp_path):
+        from kalshi.client import RetryPolicy, fetch_all_resumable
+
+        respond, state = self._paged(4, fail_on_page=3)
+        local_server.respond = respond
+        client = client_factory(local_server, retry=RetryPolicy(max_retries=0))
+        cache = str(tmp_path / "markets.json")
+
+        with pytest.raises(Exception):
+            fetch_all_resumable(client, "/markets", cache, page_limit=2, show_progress=False)
+        assert not (tmp_path / "markets.json").exists()
+
+        state["fail_on_page"] = None
+        n_before = len(local_server.requests_seen)
+        items = fetch_all_resumable(client, "/markets", cache, page_limit=2, show_progress=False)
+        assert len(local_server.requests_seen) - n_before == 1
+        assert [m["ticker"] for m in items] == [f"M-{p}-{i}" for p in range(4) for i in range(2)]
+        assert json.load(open(cache)) == items
+        assert not list(tmp_path.glob("markets.json.*"))  # side files cleaned up
+        client.close()
+
+
+# =============================================================================
+# Test Incremental Candle Refresh
+# =============================================================================
+
+
+class _FakeCandleClient:
+    """Serves hourly candles ending at multiples of 3600 within the requested range."""
+
+    def __init__(self, closes: dict):
+        self.closes = closes  # {end_period_ts: close}
+        self.calls = []
+
+    def get_all_pages(self, path, params=None, result_key="markets", **kwargs):
+        self.calls.append(dict(params))
+        return [
+            {"end_period_ts": ts, "price": {"close_dollars": close}}
+            for ts, close in sorted(self.closes.items())
+            if params["start_ts"] <= ts <= params["end_ts"]
+        ]
+
+
+class TestRefreshCandles:
+    def test_fetches_only_after_last_cached(self):
+        from kalshi.candles import refresh_candles
+
+        client = _FakeCandleClient({h * 3600: 0.5 for h in range(1, 11)})
+        cached = [{"end_period_ts": h * 3600, "price": {"close_dollars": 0.5}} for h in range(1, 6)]
+        candles, n_new = refresh_candles(client, "T", "S", cached, 0, 10 * 3600)
+
+        assert n_new == 5
+        assert [c["end_period_ts"] for c in candles] == [h * 3600 for h in range(1, 11)]
+        assert client.calls[0]["start_ts"] == 4 * 3600  # one period before last cached
+
+    def test_partial_last_candle_replaced(self):
+        from kalshi.candles import refresh_candles
+
+        client = _FakeCandleClient({3600: 0.4, 7200: 0.6})
+        cached = [{"end_period_ts": 3600, "price": {"close_dollars": 0.4}},
+                  {"end_period_ts": 7200, "price": {"close_dollars": 0.55}}]
+        candles, n_new = refresh_candles(client, "T", "S", cached, 0, 9000)
+
+        assert n_new == 1
+        assert candles[-1]["price"]["close_dollars"] == 0.6
+
+    def test_complete_cache_makes_no_request(self):
+        from kalshi.candles import refresh_candles
+
+        client = _FakeCandleClient({})
+        cached = [{"end_period_ts": 7200}]
+        candles, n_new = refresh_candles(client, "T", "S", cached, 0, 7200)
+        assert candles == cached and n_new == 0
+        assert client.calls == []
+
+    def test_empty_cache_fetches_full_range(self):
+        from kalshi.candles import refresh_candles
+
+        client = _FakeCandleClient({3600: 0.5})
+        candles, n_new = refresh_candles(client, "T", "S", [], 100, 7200)
+        assert n_new == 1
+        assert client.calls[0]["start_ts"] == 100
+
+
+# =============================================================================
+# Test Async Client
+# =============================================================================
+
+
+class TestAsyncClient:
+    def test_fetch_many_candles_bounded_concurrency(self, local_server, client_factory, tmp_path):
+        """All tickers are fetched, cached, and never more than max_concurrency in flight."""
+        from kalshi.async_client import AsyncKalshiClient
+
+        in_flight = {"now": 0, "peak": 0}
+        lock = threading.Lock()
+
+        def respond(path):
+            with lock:
+                in_flight["now"] += 1
+                in_flight["peak"] = max(in_flight["peak"], in_flight["now"])
+            time.sleep(0.05)
+            with lock:
+                in_flight["now"] -= 1
+            ticker = path.split("/markets/")[1].split("/")[0]
+            return 200, {"candlesticks": [{"end_period_ts": 1, "ticker": ticker}]}, {}
+
+        local_server.respond = respond
+        client = client_factory(local_server)
+        aclient = AsyncKalshiClient(client, max_concurrency=3)
+        specs = [(f"T-{i}", "SER", 0, 100) for i in range(12)]
+
+        result = asyncio.run(aclient.fetch_many_candles(
+            specs, cache_dir=str(tmp_path), show_progress=False,
+        ))
+
+        assert set(result) == {f"T-{i}" for i in range(12)}
+        assert result["T-5"][0]["ticker"] == "T-5"
+        assert 1 < in_flight["peak"] <= 3
+        assert (tmp_path / "T-0_60.json").exists()
+
+    def test_fetch_many_candles_failure_is_none(self, local_server, client_factory):
+        """A failed fetch maps to None so it is not mistaken for an empty market."""
+        from kalshi.async_client import fetch_many_candles
+
+        local_server.respond = lambda path: (404, {"error": "not found"}, {})
+        client = client_factory(local_server)
+        result = fetch_many_candles([("T-0", "SER", 0, 100)], client=client, show_progress=False)
+        assert result == {"T-0": None}
+
+    def test_fetch_many_candles_closes_only_own_client(self, local_server, client_factory, monkeypatch):
+        """A client created for the call is closed; a caller's client stays open."""
+        from kalshi import async_client
+
+        local_server.respond = lambda path: (404, {"error": "not found"}, {})
+        closed = []
+
+        def tracked_client(name):
+            client = client_factory(local_server)
+            monkeypatch.setattr(client, "close", lambda: closed.append(name))
+            return client
+
+        monkeypatch.setattr(async_client, "KalshiClient", lambda **kwargs: tracked_client("own"))
+        async_client.fetch_many_candles([("T-0", "SER", 0, 100)], show_progress=False)
+        assert closed == ["own"]
+
+        async_client.fetch_many_candles(
+            [("T-0", "SER", 0, 100)], client=tracked_client("shared"), show_progress=False,
+        )
+        assert closed == ["own"]
+
+
+def _candle(ts, close=None, bid=None, ask=None, volume=0, oi=0):
+    return {
+        "end_period_ts": ts,
+        "price": {"close_dollars": close},
+        "yes_bid": {"close_dollars": bid},
+        "yes_ask": {"close_dollars": ask},
+        "volume": volume,
+        "open_interest": oi,
+    }
+
+
+class TestCandleStore:
+    def test_round_trip(self, tmp_path):
+        from kalshi.candle_store import CandleStore
+
+        store = CandleStore(str(tmp_path))
+        store.write_series("KXCPI", {
+            "KXCPI-25JAN-T0.3": [_candle(7200, "0.40"), _candle(3600, "0.35", "0.34", "0.36")],
+            "KXCPI-25JAN-T0.4": [],
+        })
+
+        cols = store.get("KXCPI-25JAN-T0.3")
+        assert cols["ts"].tolist() == [3600, 7200]  # sorted by time
+        assert cols["close"].tolist() == [0.35, 0.40]
+        assert cols["yes_bid"][0] == 0.34
+        assert np.isnan(cols["yes_bid"][1])  # missing value -> NaN
+        assert len(store.get("KXCPI-25JAN-T0.4")["ts"]) == 0
+        assert store.get("KXGDP-25Q1-T2") is None
+        assert store.tickers() == ["KXCPI-25JAN-T0.3", "KXCPI-25JAN-T0.4"]
+
+    def test_close_prices_matches_json_semantics(self, tmp_path):
+        from kalshi.candle_store import CandleStore
+
+        store = CandleStore(str(tmp_path))
+        store.put("KXGDP-25Q1-T2", [_candle(3600, "0.5"), _candle(7200, None), _candle(3600, "0.6")])
+        prices = store.close_prices("KXGDP-25Q1-T2")
+        assert prices.tolist() == [0.6]  # NaN close dropped, later duplicate wins
+        assert str(prices.index.tz) == "UTC"
+
+    def test_put_keeps_other_tickers(self, tmp_path):
+        from kalshi.candle_store import CandleStore
+
+        store = CandleStore(str(tmp_path))
+        store.put("KXCPI-A", [_candle(1, "0.1")])
+        store.put("KXCPI-B", [_candle(2, "0.2")])
+        store.put("KXCPI-A", [_candle(3, "0.3")])
+        assert store.get("KXCPI-A")["ts"].tolist() == [3]
+        assert store.get("KXCPI-B")["ts"].tolist() == [2]
+
+    def test_migrate_json_cache(self, tmp_path):
+        from kalshi.candle_store import CandleStore, migrate_json_cache
+
+        candle_dir = tmp_path / "candles"
+        candle_dir.mkdir()
+        (candle_dir / "KXCPI-25JAN-T0.3_60.json").write_text(json.dumps([_candle(3600, "0.35")]))
+        (candle_dir / "KXGDP-25Q1-T2_60.json").write_text(json.dumps([_candle(3600, "0.5")] * 2))
+        (candle_dir / "KXGDP-25Q1-T3_60.json").write_text("{not json")
+
+        summary = migrate_json_cache(str(candle_dir), str(tmp_path / "store"))
+        assert summary == {"n_series": 2, "n_tickers": 2, "n_candles": 3, "n_skipped": 1}
+
+        store = CandleStore(str(tmp_path / "store"))
+        assert store.series_list() == ["KXCPI", "KXGDP"]
+        assert store.get("KXCPI-25JAN-T0.3")["close"].tolist() == [0.35]
+
+    def test_refreshed_json_bypasses_store(self, tmp_path):
+        from kalshi.candle_manifest import load_manifest, record_candles
+        from kalshi.candle_query import CandleQuery
+        from kalshi.candle_store import migrate_json_cache, open_store
+
+        candle_dir = tmp_path / "candles"
+        candle_dir.mkdir()
+        (candle_dir / "KXCPI-25JAN-T0.3_60.json").write_text(json.dumps([_candle(3600, "0.35")]))
+        (candle_dir / "KXCPI-25JAN-T0.4_60.json").write_text(json.dumps([_candle(3600, "0.15")]))
+        store_root = str(tmp_path / "store")
+        migrate_json_cache(str(candle_dir), store_root)
+        load_manifest(str(candle_dir), refresh=True)
+
+        store = open_store(store_root, candle_dir=str(candle_dir))
+        assert store.has("KXCPI-25JAN-T0.3")
+
+        # A refresh rewrites one file and a new market is fetched; neither is migrated
+        refreshed = [_candle(3600, "0.35"), _candle(7200, "0.45")]
+        (candle_dir / "KXCPI-25JAN-T0.3_60.json").write_text(json.dumps(refreshed))
+        record_candles(str(candle_dir), "KXCPI-25JAN-T0.3", refreshed)
+        (candle_dir / "KXCPI-25FEB-T0.3_60.json").write_text(json.dumps([_candle(1, "0.5")]))
+        record_candles(str(candle_dir), "KXCPI-25FEB-T0.3", [_candle(1, "0.5")])
+
+        store = open_store(store_root, candle_dir=str(candle_dir))
+        assert not store.has("KXCPI-25JAN-T0.3")
+        assert store.get("KXCPI-25JAN-T0.3") is None
+        assert store.has("KXCPI-25JAN-T0.4")
+        assert "KXCPI-25JAN-T0.3" in store.tickers()
+
+        q = CandleQuery(str(candle_dir), store_root=store_root)
+        assert q.columns("KXCPI-25JAN-T0.3")["close"].tolist() == [0.35, 0.45]
+        assert q.columns("KXCPI-25FEB-T0.3")["close"].tolist() == [0.5]
+
+
+class TestPriceCube:
+    def _event_groups(self):
+        import pandas as pd
+
+        return {
+            "KXCPI-25JAN": pd.DataFrame({
+                "ticker": ["KXCPI-25JAN-T0.2", "KXCPI-25JAN-T0.3"],
+                "floor_strike": [0.2, 0.3],
+            }),
+        }
+
+    def test_build_and_slice(self, tmp_path):
+        from kalshi.price_cube import build_price_cube, open_price_cube
+
+        candle_dir = tmp_path / "candles"
+        candle_dir.mkdir()
+        (candle_dir / "KXCPI-25JAN-T0.2_60.json").write_text(json.dumps([
+            _candle(3600, "0.8", "0.79", "0.81"), _candle(7200, "0.7"),
+        ]))
+        (candle_dir / "KXCPI-25JAN-T0.3_60.json").write_text(json.dumps([
+            _candle(7200, "0.4"), _candle(10800, None, "0.3", "0.5"),
+        ]))
+
+        root = str(tmp_path / "cube")
+        summary = build_price_cube(self._event_groups(), root=root,
+                                   candle_dir=str(candle_dir), store_root=str(tmp_path / "none"))
+        assert summary == {"n_events": 1, "n_hours": 3, "n_cells": 6}
+
+        cube = open_price_cube(root)
+        block = cube.event("KXCPI-25JAN")
+        assert block["ts"].tolist() == [3600, 7200, 10800]
+        assert block["strikes"].tolist() == [0.2, 0.3]
+        np.testing.assert_array_equal(block["close"], [[0.8, np.nan], [0.7, 0.4], [np.nan, np.nan]])
+        assert block["yes_ask"][2, 1] == 0.5
+        assert isinstance(cube.fields["close"], np.memmap)
+
+        series = cube.price_series("KXCPI-25JAN")
+        assert series["KXCPI-25JAN-T0.3"].tolist() == [0.4]
+        assert cube.event("KXGDP-25Q1") is None
+
+    def test_is_current_tracks_candle_files(self, tmp_path):
+        from kalshi.candle_manifest import record_candles
+        from kalshi.price_cube import build_price_cube, open_price_cube
+
+        candle_dir = tmp_path / "candles"
+        candle_dir.mkdir()
+        (candle_dir / "KXCPI-25JAN-T0.2_60.json").write_text(json.dumps([_candle(3600, "0.8")]))
+        root = str(tmp_path / "cube")
+        build_price_cube(self._event_groups(), root=root,
+                         candle_dir=str(candle_dir), store_root=str(tmp_path / "none"))
+
+        cube = open_price_cube(root)
+        tickers = ["KXCPI-25JAN-T0.2", "KXCPI-25JAN-T0.3"]
+        assert cube.is_current("KXCPI-25JAN", tickers, str(candle_dir))
+        assert not cube.is_current("KXCPI-25JAN", tickers + ["KXCPI-25JAN-T0.4"], str(candle_dir))
+        assert not cube.is_current("KXGDP-25Q1", [], str(candle_dir))
+
+        # A strike fetched after the build makes the event stale; the other stays current
+        candles = [_candle(3600, "0.4")]
+        (candle_dir / "KXCPI-25JAN-T0.3_60.json").write_text(json.dumps(candles))
+        record_candles(str(candle_dir), "KXCPI-25JAN-T0.3", candles)
+        assert not cube.is_current("KXCPI-25JAN", tickers, str(candle_dir))
+        assert cube.is_current("KXCPI-25JAN", ["KXCPI-25JAN-T0.2"], str(candle_dir))
+
+    def test_missing_cube(self, tmp_path):
+        from kalshi.price_cube import open_price_cube
+
+        assert open_price_cube(str(tmp_path)) is None
+
+
+class TestCandleManifest:
+    def _write(self, candle_dir, ticker, candles):
+        (candle_dir / f"{ticker}_60.json").write_text(json.dumps(candles))
+
+    def test_build_and_lookup(self, tmp_path):
+        from kalshi.candle_manifest import CandleManifest
+
+        self._write(tmp_path, "KXCPI-25JAN-T0.2", [_candle(3600), _candle(7200)])
+        self._write(tmp_path, "KXCPI-25JAN-T0.3", [])
+        self._write(tmp_path, "KXGDP-25Q1-T2", [_candle(100)])
+        (tmp_path / "KXGDP-25Q1-T3_60.json").write_text("{broken")
+
+        m = CandleManifest.load(str(tmp_path))
+        assert m.tickers_for_event("KXCPI-25JAN") == ["KXCPI-25JAN-T0.2", "KXCPI-25JAN-T0.3"]
+        assert m.tickers_for_series("KXGDP") == ["KXGDP-25Q1-T2"]
+        assert m.get("KXCPI-25JAN-T0.2")["rows"] == 2
+        assert (m.get("KXCPI-25JAN-T0.2")["first_ts"], m.get("KXCPI-25JAN-T0.2")["last_ts"]) == (3600, 7200)
+        assert m.path("KXGDP-25Q1-T2") == str(tmp_path / "KXGDP-25Q1-T2_60.json")
+        assert m.missing(["KXGDP-25Q1-T3", "KXGDP-25Q1-T2", "X-1-T1"]) == ["KXGDP-25Q1-T3", "X-1-T1"]
+        assert (tmp_path / "manifest.60m.json").exists()
+
+    def test_sync_picks_up_changes(self, tmp_path):
+        from kalshi.candle_manifest import CandleManifest
+
+        self._write(tmp_path, "KXCPI-25JAN-T0.2", [_candle(3600)])
+        self._write(tmp_path, "KXCPI-25JAN-T0.3", [_candle(3600)])
+        CandleManifest.load(str(tmp_path))
+
+        (tmp_path / "KXCPI-25JAN-T0.3_60.json").unlink()
+        self._write(tmp_path, "KXCPI-25JAN-T0.2", [_candle(3600), _candle(7200), _candle(10800)])
+        self._write(tmp_path, "KXCPI-25FEB-T0.2", [_candle(1)])
+
+        m = CandleManifest.load(str(tmp_path))
+        assert m.tickers() == ["KXCPI-25FEB-T0.2", "KXCPI-25JAN-T0.2"]
+        assert m.get("KXCPI-25JAN-T0.2")["rows"] == 3
+
+    def test_record_appends_journal(self, tmp_path):
+        from kalshi.candle_manifest import CandleManifest
+
+        m = CandleManifest.load(str(tmp_path))
+        candles = [_candle(3600)]
+        self._write(tmp_path, "KXCPI-25JAN-T0.2", candles)
+        m.record("KXCPI-25JAN-T0.2", candles)
+        assert m.has("KXCPI-25JAN-T0.2")
+        assert (tmp_path / "manifest.60m.journal.jsonl").exists()
+
+        # Reload without a directory sync: the journal alone carries the entry
+        reloaded = CandleManifest.load(str(tmp_path), sync=False)
+        assert reloaded.get("KXCPI-25JAN-T0.2")["last_ts"] == 3600
+        assert not (tmp_path / "manifest.60m.journal.jsonl").exists()
+
+    def test_record_into_empty_cached_manifest(self, tmp_path):
+        from kalshi.candle_manifest import load_manifest, record_candles
+
+        assert len(load_manifest(str(tmp_path))) == 0  # cached while still empty
+        candles = [_candle(3600)]
+        self._write(tmp_path, "KXCPI-25JAN-T0.2", candles)
+        record_candles(str(tmp_path), "KXCPI-25JAN-T0.2", candles)
+        assert load_manifest(str(tmp_path)).path("KXCPI-25JAN-T0.2") == str(tmp_path / "KXCPI-25JAN-T0.2_60.json")
+
+
+class TestMarketStore:
+    def _sources(self, tmp_path):
+        targeted = [
+            {"ticker": "KXCPI-25JAN-T0.3", "floor_strike": "0.3", "volume": 120, "result": "yes",
+             "status": "finalized", "settlement_ts": "2025-02-12T13:30:00Z"},
+            {"ticker": "KXCPI-25JAN-T0.3", "volume": 1},  # duplicate within a file
+            {"ticker": "", "volume": 5},
+        ]
+        generic = [
+            {"ticker": "KXCPI-25JAN-T0.3", "volume": 999},  # lower-priority duplicate
+            {"ticker": "KXNBA-25FEB01-LAL", "series_ticker": "KXNBA", "result": "no",
+             "status": "finalized", "settlement_ts": "2025-02-02T05:00:00Z"},
+        ]
+        (tmp_path / "targeted.json").write_text(json.dumps(targeted))
+        (tmp_path / "generic.json").write_text(json.dumps(generic))
+        return [("targeted", str(tmp_path / "targeted.json")),
+                ("generic", str(tmp_path / "generic.json")),
+                ("missing", str(tmp_path / "nothing_*.json"))]
+
+    def test_dedupe_and_queries(self, tmp_path):
+        from kalshi.market_store import load_market_store
+
+        store = load_market_store(str(tmp_path / "markets.sqlite"), self._sources(tmp_path))
+        assert len(store) == 2
+        assert [m["ticker"] for m in store.markets()] == ["KXCPI-25JAN-T0.3", "KXNBA-25FEB01-LAL"]
+        assert store.get("KXCPI-25JAN-T0.3")["volume"] == 120  # first source and first row win
+
+        assert store.tickers(series="KXNBA") == ["KXNBA-25FEB01-LAL"]
+        assert store.tickers(event="KXCPI-25JAN") == ["KXCPI-25JAN-T0.3"]
+        assert store.tickers(settled_after="2025-02-10T00:00:00Z") == ["KXCPI-25JAN-T0.3"]
+        assert store.tickers(sources="generic", result=["yes", "no"]) == ["KXNBA-25FEB01-LAL"]
+
+        frame = store.frame(series="KXCPI")
+        assert frame.loc[0, "floor_strike"] == 0.3
+        assert frame.loc[0, "settlement_ts"] == 1739367000
+        store.close()
+
+    def test_rebuilds_when_source_changes(self, tmp_path):
+        from kalshi.market_store import load_market_store
+
+        sources = self._sources(tmp_path)
+        db = str(tmp_path / "markets.sqlite")
+        store = load_market_store(db, sources)
+        assert store.is_current(sources)
+        store.close()
+
+        (tmp_path / "nothing_1.json").write_text(json.dumps([{"ticker": "KXGDP-25Q1-T2"}]))
+        store = load_market_store(db, sources)
+        assert store.get("KXGDP-25Q1-T2") is not None
+        store.close()
+
+    def test_no_sources(self, tmp_path):
+        from kalshi.market_store import load_market_store
+
+        assert load_market_store(str(tmp_path / "m.sqlite"), [("x", str(tmp_path / "x.json"))]) is None
+
+
+class TestCandleQuery:
+    def test_nearest_rows_ties_and_duplicates(self):
+        from kalshi.candle_query import nearest_rows
+
+        ts = np.array([100, 200, 200, 400])
+        # exact, tie (earlier wins), before first, after last, duplicate run
+        rows = nearest_rows(ts, [100, 150, 0, 999, 210])
+        assert rows.tolist() == [0, 0, 0, 3, 1]
+        assert nearest_rows(np.array([], dtype=np.int64), [1, 2]).tolist() == [-1, -1]
+
+    def test_batched_lookup(self, tmp_path):
+        from kalshi.candle_query import CandleQuery
+
+        (tmp_path / "KXCPI-25JAN-T0.2_60.json").write_text(json.dumps([
+            _candle(3600, "0.8", "0.79", "0.81"), _candle(7200, None, "0.6", "0.7"),
+        ]))
+        q = CandleQuery(str(tmp_path), store_root=str(tmp_path / "no_store"))
+        out = q.at(["KXCPI-25JAN-T0.2", "KXCPI-25JAN-T0.2", "MISSING-1-T1"], [3000, 9000, 3600])
+        assert out["found"].tolist() == [True, True, False]
+        assert out["ts"].tolist()[:2] == [3600, 7200]
+        assert out["close"].iloc[0] == 0.8 and np.isnan(out["close"].iloc[1])
+        assert out["gap"].tolist()[:2] == [600, 1800]
+
+        capped = q.at(["KXCPI-25JAN-T0.2"], [9000], max_gap=1000)
+        assert not capped["found"].iloc[0]
+
+
+class TestResampling:
+    def _sample(self, n=30):
+        rng = np.random.default_rng(0)
+        crps = rng.gamma(2.0, 1.0, n)
+        return crps, crps * rng.uniform(0.5, 2.0, n)
+
+    def test_ratios_match_resample_loop(self):
+        from kalshi.resampling import bootstrap_ratios, circular_block_indices
+
+        crps, mae = self._sample(14)
+        rng = np.random.default_rng(7)
+        loop = []
+        for _ in range(500):
+            idx = rng.integers(0, 14, size=14)
+            loop.append(crps[idx].mean() / mae[idx].mean())
+        np.testing.assert_allclose(bootstrap_ratios(crps, mae, n_boot=500, seed=7), loop, rtol=1e-12)
+
+        idx = circular_block_indices(5, 2, n_boot=1, seed=np.random.RandomState(0))
+        start = np.random.RandomState(0).randint(0, 5, size=3)[0]
+        assert idx.shape == (1, 5)
+        assert idx[0, :2].tolist() == [start, (start + 1) % 5]
+
+    def test_bca_matches_scipy_paired(self):
+        from scipy import stats
+        from kalshi.resampling import ratio_of_means_ci
+
+        crps, mae = self._sample()
+        ratio, lo, hi, method = ratio_of_means_ci(crps, mae, method="bca")
+        ref = stats.bootstrap(
+            (crps, mae), lambda c, m, axis: c.mean(axis=axis) / m.mean(axis=axis),
+            paired=True, n_resamples=10000, method="BCa", rng=np.random.default_rng(42),
+        ).confidence_interval
+        assert method == "BCa"
+        assert ratio == pytest.approx(crps.mean() / mae.mean())
+        assert (lo, hi) == (pytest.approx(ref.low, rel=1e-9), pytest.approx(ref.high, rel=1e-9))
+
+    def test_studentized_and_fallbacks(self):
+        from kalshi.resampling import ratio_of_means_ci
+
+        crps, mae = self._sample()
+        ratio, lo, hi, method = ratio_of_means_ci(crps, mae, method="studentized")
+        assert method == "studentized" and lo < ratio < hi
+
+        # Constant data: every resample equals the estimate, BCa is undefined
+        assert ratio_of_means_ci(np.ones(5), np.ones(5))[3] == "percentile"
+        assert ratio_of_means_ci([1.0, 2.0], [0.0, 0.0])[0] == float("inf")
+        with pytest.raises(ValueError):
+            ratio_of_means_ci(crps, mae, method="bca", block_len=2)
+
+    def test_permutation_test_matches_loop_and_stops_early(self):
+        from kalshi.resampling import group_sums, permutation_test
+
+        values = np.r_[np.zeros(10), np.ones(10)] + np.random.default_rng(1).normal(0, 0.1, 20)
+        diff = lambda perms: values[perms[:, :10]].mean(axis=1) - values[perms[:, 10:]].mean(axis=1)
+
+        rng = np.random.RandomState(3)
+        loop = [diff(rng.permutation(20)[None, :])[0] for _ in range(300)]
+        res = permutation_test(diff, 20, n_perm=300, seed=np.random.RandomState(3), block_size=64)
+        np.testing.assert_allclose(res["null"], loop)
+        assert res["p_value"] == np.mean(np.abs(loop) >= abs(res["observed"]))
+
+        labels = np.array([[0, 1, 1], [1, 1, 0]])
+        assert group_sums(labels, [1.0, 2.0, 4.0], 2).tolist() == [[1.0, 6.0], [4.0, 3.0]]
+
+        early = permutation_test(diff, 20, n_perm=100000, seed=0, alpha=0.05)
+        assert early["stopped_early"] and early["n_permutations"] < 100000
+        assert early["p_value"] < 0.05
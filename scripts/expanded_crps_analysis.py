@@ -43,6 +43,7 @@ from experiment12.distributional_calibration import (
     fetch_historical_gdp,
     fetch_historical_fed_rate,
 )
+from kalshi.resampling import ratio_of_means_ci
 
 OUTPUT_DIR = "data/expanded_analysis"
 
@@ -165,40 +166,7 @@ def compute_crps_for_all_events(event_groups, historical):
 
 def compute_crps_mae_ratio_with_ci(crps_arr, mae_arr, n_boot=10000, seed=42):
     """Compute CRPS/MAE ratio with BCa bootstrap CI."""
-    mean_crps = crps_arr.mean()
-    mean_mae = mae_arr.mean()
-    ratio = mean_crps / mean_mae if mean_mae > 0 else float("inf")
-
-    def _ratio_of_means(crps, mae, axis=None):
-        crps_means = np.mean(crps, axis=axis)
-        mae_means = np.mean(mae, axis=axis)
-        with np.errstate(divide='ignore', invalid='ignore'):
-            return crps_means / mae_means
-
-    try:
-        bca_result = stats.bootstrap(
-            (crps_arr, mae_arr),
-            statistic=_ratio_of_means,
-            n_resamples=n_boot,
-            method='BCa',
-            confidence_level=0.95,
-            random_state=np.random.default_rng(seed),
-        )
-        ci_lo = float(bca_result.confidence_interval.low)
-        ci_hi = float(bca_result.confidence_interval.high)
-    except Exception:
-        # Fallback to percentile bootstrap
-        rng = np.random.default_rng(seed)
-        boot_ratios = []
-        for _ in range(n_boot):
-            idx = rng.integers(0, len(crps_arr), size=len(crps_arr))
-            boot_crps = crps_arr[idx].mean()
-            boot_mae = mae_arr[idx].mean()
-            if boot_mae > 0:
-                boot_ratios.append(boot_crps / boot_mae)
-        ci_lo = float(np.percentile(boot_ratios, 2.5))
-        ci_hi = float(np.percentile(boot_ratios, 97.5))
-
+    ratio, ci_lo, ci_hi, _ = ratio_of_means_ci(crps_arr, mae_arr, method="BCa", n_boot=n_boot, seed=seed)
     return ratio, ci_lo, ci_hi
 
 
@@ -12,16 +12,16 @@ This script:
 import os
 import sys
 import json
-import time
 import numpy as np
 import pandas as pd
 from datetime import datetime, timezone
-from scipy import stats
 from collections import defaultdict
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from kalshi.client import KalshiClient
+from kalshi.async_client import fetch_many_candles
+from kalshi.resampling import ratio_of_means_ci
 from experiment12.distributional_calibration import compute_crps
 
 OUTPUT_DIR = "data/new_series"
@@ -83,36 +83,6 @@ def group_markets_by_event(markets):
     return {et: ms for et, ms in events.items() if len(ms) >= 2}
 
 
-def fetch_candles_for_market(client, series_ticker, ticker, open_time=None, close_time=None, max_retries=3):
-    """Fetch candlestick data using the CORRECT API path with required timestamps."""
-    params = {'period_interval': 60}  # hourly
-
-    # API REQUIRES start_ts and end_ts — without them it returns 400
-    if open_time and close_time:
-        if isinstance(open_time, str):
-            open_time = datetime.fromisoformat(open_time.replace('Z', '+00:00'))
-        if isinstance(close_time, str):
-            close_time = datetime.fromisoformat(close_time.replace('Z', '+00:00'))
-        params['start_ts'] = int(open_time.timestamp())
-        params['end_ts'] = int(close_time.timestamp())
-
-    for attempt in range(max_retries):
-        try:
-            # FIXED: Use /series/{series}/markets/{ticker}/candlesticks
-            candles = client.get_all_pages(
-                f'/series/{series_ticker}/markets/{ticker}/candlesticks',
-                params=params,
-                result_key='candlesticks',
-            )
-            return candles
-        except Exception as e:
-            if attempt < max_retries - 1:
-                time.sleep(2)
-            else:
-                print(f"  Failed to fetch candles for {ticker}: {e}")
-                return None
-
-
 def build_cdf_from_candles(event_markets, candles_by_ticker):
     """Build CDF snapshots from candle data for an event."""
     tickers_and_strikes = []
@@ -319,19 +289,19 @@ def process_series(client, series_ticker):
 
     if not use_cache:
         print(f"  Fetching candles for {len(all_market_tickers)} markets (FIXED API path + timestamps)...")
-        candles_by_ticker = {}
-        for i, ticker in enumerate(sorted(all_market_tickers)):
+        specs = []
+        for ticker in sorted(all_market_tickers):
             m_info = market_lookup.get(ticker, {})
-            candles = fetch_candles_for_market(
-                client, series_ticker, ticker,
-                open_time=m_info.get('open_time'),
-                close_time=m_info.get('close_time'),
-            )
-            if candles:
-                candles_by_ticker[ticker] = candles
-            if (i + 1) % 10 == 0:
-                print(f"    {i+1}/{len(all_market_tickers)} markets fetched ({len(candles_by_ticker)} with data)")
-            time.sleep(0.7)
+            open_time, close_time = m_info.get('open_time'), m_info.get('close_time')
+            if not open_time or not close_time:
+                continue  # API requires start_ts/end_ts
+            specs.append((
+                ticker, series_ticker,
+                int(datetime.fromisoformat(open_time.replace('Z', '+00:00')).timestamp()),
+                int(datetime.fromisoformat(close_time.replace('Z', '+00:00')).timestamp()),
+            ))
+        fetched = fetch_many_candles(specs, client=client, max_concurrency=8)
+        candles_by_ticker = {t: c for t, c in fetched.items() if c}
 
         print(f"  Got candles for {len(candles_by_ticker)}/{len(all_market_tickers)} markets")
 
@@ -402,40 +372,8 @@ def process_series(client, series_ticker):
 
 
 def compute_crps_mae_with_bca(crps_arr, mae_arr, n_boot=10000, seed=42):
-    """Compute CRPS/MAE with true BCa CI."""
-    ratio = crps_arr.mean() / mae_arr.mean() if mae_arr.mean() > 0 else float('inf')
-
-    def _ratio_of_means(crps, mae, axis=None):
-        crps_m = np.mean(crps, axis=axis)
-        mae_m = np.mean(mae, axis=axis)
-        with np.errstate(divide='ignore', invalid='ignore'):
-            return crps_m / mae_m
-
-    try:
-        bca = stats.bootstrap(
-            (crps_arr, mae_arr),
-            statistic=_ratio_of_means,
-            n_resamples=n_boot,
-            method='BCa',
-            confidence_level=0.95,
-            random_state=np.random.default_rng(seed),
-        )
-        ci_lo = float(bca.confidence_interval.low)
-        ci_hi = float(bca.confidence_interval.high)
-        method = 'BCa'
-    except Exception as e:
-        print(f"    BCa failed ({e}), falling back to percentile")
-        rng = np.random.default_rng(seed)
-        boot = []
-        for _ in range(n_boot):
-            idx = rng.integers(0, len(crps_arr), size=len(crps_arr))
-            br = crps_arr[idx].mean() / mae_arr[idx].mean() if mae_arr[idx].mean() > 0 else float('inf')
-            boot.append(br)
-        ci_lo = float(np.percentile(boot, 2.5))
-        ci_hi = float(np.percentile(boot, 97.5))
-        method = 'percentile'
-
-    return ratio, ci_lo, ci_hi, method
+    """Compute CRPS/MAE with true BCa CI (percentile if BCa is undefined)."""
+    return ratio_of_means_ci(crps_arr, mae_arr, method="BCa", n_boot=n_boot, seed=seed)
 
 
 def compute_loo(crps_arr, mae_arr):
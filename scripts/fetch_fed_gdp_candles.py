@@ -1,7 +1,6 @@
 """Fetch hourly candle data for FED and GDP old-prefix markets."""
 import os
 import json
-import time
 import re
 from datetime import datetime
 from tqdm import tqdm
@@ -65,7 +64,6 @@ def main():
         except Exception as e:
             tqdm.write(f"  Failed {ticker}: {e}")
             failed += 1
-        time.sleep(0.7)
 
     print(f"\nDone: {success} success, {empty} empty, {failed} failed")
 
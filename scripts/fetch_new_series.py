@@ -5,16 +5,15 @@ Targets: KXPCECORE, KXU3, KXADP, KXISMPMI, KXCPICORE
 import os
 import sys
 import json
-import time
 import numpy as np
 import pandas as pd
 from datetime import datetime, timezone
-from scipy import stats
 from collections import defaultdict
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from kalshi.client import KalshiClient
+from kalshi.resampling import ratio_of_means_ci
 from experiment12.distributional_calibration import compute_crps
 
 OUTPUT_DIR = "data/new_series"
@@ -52,22 +51,17 @@ def group_markets_by_event(markets):
     return {et: ms for et, ms in events.items() if len(ms) >= 2}
 
 
-def fetch_candles_for_market(client, ticker, max_retries=3):
-    """Fetch candlestick data for a single market."""
-    for attempt in range(max_retries):
-        try:
-            candles = client.get_all_pages(
-                f'/markets/{ticker}/candlesticks',
-                params={'period_interval': 60},  # hourly
-                result_key='candlesticks',
-            )
-            return candles
-        except Exception as e:
-            if attempt < max_retries - 1:
-                time.sleep(2)
-            else:
-                print(f"  Failed to fetch candles for {ticker}: {e}")
-                return None
+def fetch_candles_for_market(client, ticker):
+    """Fetch candlestick data for a single market (client retries transient errors)."""
+    try:
+        return client.get_all_pages(
+            f'/markets/{ticker}/candlesticks',
+            params={'period_interval': 60},  # hourly
+            result_key='candlesticks',
+        )
+    except Exception as e:
+        print(f"  Failed to fetch candles for {ticker}: {e}")
+        return None
 
 
 def build_cdf_from_candles(event_markets, candles_by_ticker):
@@ -252,7 +246,6 @@ def process_series(client, series_ticker):
             candles_by_ticker[ticker] = candles
         if (i + 1) % 20 == 0:
             print(f"    {i+1}/{len(all_market_tickers)} markets fetched")
-        time.sleep(0.7)
 
     print(f"  Got candles for {len(candles_by_ticker)}/{len(all_market_tickers)} markets")
 
@@ -329,39 +322,8 @@ def process_series(client, series_ticker):
 
 
 def compute_crps_mae_with_bca(crps_arr, mae_arr, n_boot=10000, seed=42):
-    """Compute CRPS/MAE with true BCa CI."""
-    ratio = crps_arr.mean() / mae_arr.mean() if mae_arr.mean() > 0 else float('inf')
-
-    def _ratio_of_means(crps, mae, axis=None):
-        crps_m = np.mean(crps, axis=axis)
-        mae_m = np.mean(mae, axis=axis)
-        with np.errstate(divide='ignore', invalid='ignore'):
-            return crps_m / mae_m
-
-    try:
-        bca = stats.bootstrap(
-            (crps_arr, mae_arr),
-            statistic=_ratio_of_means,
-            n_resamples=n_boot,
-            method='BCa',
-            confidence_level=0.95,
-            random_state=np.random.default_rng(seed),
-        )
-        ci_lo = float(bca.confidence_interval.low)
-        ci_hi = float(bca.confidence_interval.high)
-        method = 'BCa'
-    except Exception:
-        rng = np.random.default_rng(seed)
-        boot = []
-        for _ in range(n_boot):
-            idx = rng.integers(0, len(crps_arr), size=len(crps_arr))
-            br = crps_arr[idx].mean() / mae_arr[idx].mean() if mae_arr[idx].mean() > 0 else float('inf')
-            boot.append(br)
-        ci_lo = float(np.percentile(boot, 2.5))
-        ci_hi = float(np.percentile(boot, 97.5))
-        method = 'percentile'
-
-    return ratio, ci_lo, ci_hi, method
+    """Compute CRPS/MAE with true BCa CI (percentile if BCa is undefined)."""
+    return ratio_of_means_ci(crps_arr, mae_arr, method="BCa", n_boot=n_boot, seed=seed)
 
 
 def main():
@@ -4,7 +4,6 @@ that exist in targeted_markets.json but lack candle files.
 """
 import os
 import json
-import time
 import re
 from datetime import datetime, timezone
 from tqdm import tqdm
@@ -113,8 +112,6 @@ def main():
             tqdm.write(f"  Failed {ticker} (series={series_ticker}): {e}")
             failed += 1
 
-        time.sleep(0.7)  # Rate limiting
-
     print(f"\nDone: {success} success, {empty} empty, {failed} failed")
 
 
@@ -23,6 +23,7 @@ from collections import defaultdict
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from kalshi.client import KalshiClient
+from kalshi.resampling import ratio_of_means_ci
 from experiment12.distributional_calibration import compute_crps
 
 OUTPUT_DIR = "data/new_series"
@@ -217,32 +218,8 @@ def compute_event_crps_mae(event_markets, candles_by_ticker, series_ticker):
 
 
 def compute_bca_ci(crps_arr, mae_arr, n_boot=10000, seed=42):
-    """Compute CRPS/MAE with BCa CI."""
-    ratio = crps_arr.mean() / mae_arr.mean() if mae_arr.mean() > 0 else float('inf')
-    def _ratio_of_means(crps, mae, axis=None):
-        crps_m = np.mean(crps, axis=axis)
-        mae_m = np.mean(mae, axis=axis)
-        with np.errstate(divide='ignore', invalid='ignore'):
-            return crps_m / mae_m
-    try:
-        bca = stats.bootstrap(
-            (crps_arr, mae_arr),
-            statistic=_ratio_of_means,
-            n_resamples=n_boot,
-            method='BCa',
-            confidence_level=0.95,
-            random_state=np.random.default_rng(seed),
-        )
-        return ratio, float(bca.confidence_interval.low), float(bca.confidence_interval.high), 'BCa'
-    except Exception as e:
-        print(f"  BCa failed ({e}), falling back to percentile")
-        rng = np.random.default_rng(seed)
-        boot = []
-        for _ in range(n_boot):
-            idx = rng.integers(0, len(crps_arr), size=len(crps_arr))
-            br = crps_arr[idx].mean() / mae_arr[idx].mean() if mae_arr[idx].mean() > 0 else float('inf')
-            boot.append(br)
-        return ratio, float(np.percentile(boot, 2.5)), float(np.percentile(boot, 97.5)), 'percentile'
+    """Compute CRPS/MAE with BCa CI (percentile if BCa is undefined)."""
+    return ratio_of_means_ci(crps_arr, mae_arr, method="BCa", n_boot=n_boot, seed=seed)
 
 
 # ============================================================
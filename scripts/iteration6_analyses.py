@@ -18,6 +18,7 @@ from collections import defaultdict
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from experiment12.distributional_calibration import compute_crps
+from kalshi.resampling import bootstrap_means
 
 OUTPUT_DIR = "data/iteration6"
 os.makedirs(OUTPUT_DIR, exist_ok=True)
@@ -288,11 +289,7 @@ for series_ticker in NEW_SERIES:
     n = len(pit_arr)
 
     # Bootstrap CI on mean
-    rng = np.random.default_rng(42)
-    boot_means = []
-    for _ in range(10000):
-        boot_idx = rng.integers(0, n, size=n)
-        boot_means.append(pit_arr[boot_idx].mean())
+    boot_means = bootstrap_means(pit_arr, n_boot=10000, seed=42)
     ci_lo = float(np.percentile(boot_means, 2.5))
     ci_hi = float(np.percentile(boot_means, 97.5))
 
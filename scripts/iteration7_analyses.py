@@ -311,6 +311,8 @@ print("=" * 70)
 # using the same approach as iteration6_analyses.py
 
 from scripts.iteration6_analyses import build_cdf_from_candles, parse_expiration_value_fixed
+from kalshi.candle_manifest import load_manifest
+from experiment12.distributional_calibration import align_candle_prices, build_pit_table
 
 # Load exp7 strike_markets for market info
 sm_df = pd.read_csv("data/exp7/strike_markets.csv")
@@ -334,35 +336,25 @@ for _, row in fed_events_df.iterrows():
 exp2_candles_dir = "data/exp2/raw/candles"
 
 def compute_pit_for_series(events_df, candles_dir, strike_markets_df=None):
-    """Compute PIT values from candle data."""
-    pit_values = []
-
-    for _, row in events_df.iterrows():
-        event_ticker = row["event_ticker"]
-        realized = row["realized"]
-
-        # Find market tickers for this event
-        # Pattern: event_ticker + "-T" or "-B" suffix
-        import glob as glob_module
-        event_candle_files = glob_module.glob(os.path.join(candles_dir, f"{event_ticker}*_60.json"))
-
-        if not event_candle_files:
+    """Compute mid-life PIT values from candle data."""
+    manifest = load_manifest(candles_dir)
+    aligned = {}
+
+    for event_ticker in events_df["event_ticker"].unique():
+        # Market tickers for this event: event_ticker + "-T" or "-B" suffix
+        event_tickers = manifest.tickers_for_event(event_ticker)
+        if not event_tickers:
             print(f"    {event_ticker}: no candle files found")
             continue
 
-        # Load candles and build CDF
         tickers_and_strikes = []
         candles_by_ticker = {}
 
-        for candle_file in event_candle_files:
-            basename = os.path.basename(candle_file).replace("_60.json", "")
+        for ticker in event_tickers:
             # Extract strike from ticker name
             # Pattern: EVENT-TICKER-T{strike} or EVENT-TICKER-B{strike}
-            parts = basename.split("-")
-
-            # Find the T or B part (strike value)
             strike = None
-            for p in parts:
+            for p in ticker.split("-"):
                 if p.startswith("T") or p.startswith("B"):
                     try:
                         strike = float(p[1:])
@@ -373,13 +365,12 @@ def compute_pit_for_series(events_df, candles_dir, strike_markets_df=None):
             if strike is None:
                 continue
 
-            with open(candle_file) as f:
+            with open(manifest.path(ticker)) as f:
                 candles = json.load(f)
 
             if not candles:
                 continue
 
-            ticker = basename
             tickers_and_strikes.append((ticker, strike))
             candles_by_ticker[ticker] = candles
 
@@ -387,80 +378,18 @@ def compute_pit_for_series(events_df, candles_dir, strike_markets_df=None):
             print(f"    {event_ticker}: only {len(tickers_and_strikes)} strikes")
             continue
 
-        tickers_and_strikes.sort(key=lambda x: x[1])
-
-        # Build price series from candles
-        price_series = {}
-        for ticker, strike in tickers_and_strikes:
-            candles = candles_by_ticker[ticker]
-            prices = {}
-            for c in candles:
-                ts = c.get("end_period_ts") or c.get("period_start")
-                if not ts:
-                    continue
-                close_price = None
-                yes_price = c.get("yes_price", {})
-                if isinstance(yes_price, dict) and yes_price.get("close") is not None:
-                    close_price = yes_price["close"]
-                if close_price is None:
-                    price_obj = c.get("price", {})
-                    if isinstance(price_obj, dict) and price_obj.get("close") is not None:
-                        close_price = price_obj["close"]
-                if close_price is None:
-                    yes_bid = c.get("yes_bid", {})
-                    yes_ask = c.get("yes_ask", {})
-                    bid_close = yes_bid.get("close") if isinstance(yes_bid, dict) else None
-                    ask_close = yes_ask.get("close") if isinstance(yes_ask, dict) else None
-                    if bid_close is not None and ask_close is not None:
-                        close_price = (float(bid_close) + float(ask_close)) / 2.0
-                    elif bid_close is not None:
-                        close_price = float(bid_close)
-                    elif ask_close is not None:
-                        close_price = float(ask_close)
-                if close_price is not None:
-                    try:
-                        prices[ts] = float(close_price) / 100.0
-                    except (ValueError, TypeError):
-                        continue
-            if prices:
-                price_series[ticker] = prices
-
-        if len(price_series) < 2:
-            print(f"    {event_ticker}: only {len(price_series)} tickers with price data")
-            continue
-
-        # Build CDF snapshots
-        all_ts = set()
-        for ps in price_series.values():
-            all_ts.update(ps.keys())
-
-        snapshots = []
-        for ts in sorted(all_ts):
-            cdf_points = []
-            for ticker, strike in tickers_and_strikes:
-                if ticker in price_series and ts in price_series[ticker]:
-                    cdf_points.append((strike, price_series[ticker][ts]))
-            if len(cdf_points) >= 2:
-                cdf_points.sort(key=lambda x: x[0])
-                snapshots.append({
-                    "strikes": [p[0] for p in cdf_points],
-                    "cdf_values": [p[1] for p in cdf_points],  # survival P(X > strike)
-                })
-
-        if len(snapshots) < 2:
-            print(f"    {event_ticker}: only {len(snapshots)} snapshots")
+        event_prices = align_candle_prices(tickers_and_strikes, candles_by_ticker)
+        if event_prices is None:
+            print(f"    {event_ticker}: fewer than 2 tickers with price data")
             continue
+        aligned[event_ticker] = event_prices
 
-        # Use mid-life snapshot
-        mid_snap = snapshots[len(snapshots) // 2]
-        strikes = mid_snap["strikes"]
-        cdf_vals = mid_snap["cdf_values"]
-
-        # PIT = 1 - interp(survival at realized)
-        survival = np.interp(realized, strikes, cdf_vals)
-        pit = 1.0 - survival
-        pit_values.append({"event_ticker": event_ticker, "pit": float(pit)})
-        print(f"    {event_ticker}: PIT={pit:.3f} (realized={realized}, {len(snapshots)} snapshots)")
+    # PIT = 1 - interp(survival at realized), mid-life snapshot
+    table = build_pit_table(events_df[["event_ticker", "realized"]], aligned_prices=aligned)
+    pit_values = []
+    for row in table.itertuples():
+        pit_values.append({"event_ticker": row.event_ticker, "pit": float(row.pit)})
+        print(f"    {row.event_ticker}: PIT={row.pit:.3f} (realized={row.realized}, {row.n_snapshots} snapshots)")
 
     return pit_values
 
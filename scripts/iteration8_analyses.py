@@ -63,26 +63,18 @@ orig_df = pd.read_csv("data/expanded_analysis/expanded_crps_per_event.csv")
 exp2_candles_dir = "data/exp2/raw/candles"
 
 def compute_pit_for_series(events_df, candles_dir):
-    """Compute PIT values from candle data."""
-    import glob as glob_module
-    pit_values = []
-
-    for _, row in events_df.iterrows():
-        event_ticker = row["event_ticker"]
-        realized = row["realized"]
-
-        event_candle_files = glob_module.glob(os.path.join(candles_dir, f"{event_ticker}*_60.json"))
-        if not event_candle_files:
-            continue
+    """Compute mid-life PIT values from candle data."""
+    from kalshi.candle_manifest import load_manifest
+    from experiment12.distributional_calibration import align_candle_prices, build_pit_table
 
+    manifest = load_manifest(candles_dir)
+    aligned = {}
+    for event_ticker in events_df["event_ticker"].unique():
         tickers_and_strikes = []
         candles_by_ticker = {}
-
-        for candle_file in event_candle_files:
-            basename = os.path.basename(candle_file).replace("_60.json", "")
-            parts = basename.split("-")
+        for ticker in manifest.tickers_for_event(event_ticker):
             strike = None
-            for p in parts:
+            for p in ticker.split("-"):
                 if p.startswith("T") or p.startswith("B"):
                     try:
                         strike = float(p[1:])
@@ -92,87 +84,23 @@ def compute_pit_for_series(events_df, candles_dir):
             if strike is None:
                 continue
 
-            with open(candle_file) as f:
+            with open(manifest.path(ticker)) as f:
                 candles = json.load(f)
             if not candles:
                 continue
 
-            tickers_and_strikes.append((basename, strike))
-            candles_by_ticker[basename] = candles
-
-        if len(tickers_and_strikes) < 2:
-            continue
-
-        tickers_and_strikes.sort(key=lambda x: x[1])
-
-        price_series = {}
-        for ticker, strike in tickers_and_strikes:
-            candles = candles_by_ticker[ticker]
-            prices = {}
-            for c in candles:
-                ts = c.get("end_period_ts") or c.get("period_start")
-                if not ts:
-                    continue
-                close_price = None
-                yes_price = c.get("yes_price", {})
-                if isinstance(yes_price, dict) and yes_price.get("close") is not None:
-                    close_price = yes_price["close"]
-                if close_price is None:
-                    price_obj = c.get("price", {})
-                    if isinstance(price_obj, dict) and price_obj.get("close") is not None:
-                        close_price = price_obj["close"]
-                if close_price is None:
-                    yes_bid = c.get("yes_bid", {})
-                    yes_ask = c.get("yes_ask", {})
-                    bid_close = yes_bid.get("close") if isinstance(yes_bid, dict) else None
-                    ask_close = yes_ask.get("close") if isinstance(yes_ask, dict) else None
-                    if bid_close is not None and ask_close is not None:
-                        close_price = (float(bid_close) + float(ask_close)) / 2.0
-                    elif bid_close is not None:
-                        close_price = float(bid_close)
-                    elif ask_close is not None:
-                        close_price = float(ask_close)
-                if close_price is not None:
-                    try:
-                        prices[ts] = float(close_price) / 100.0
-                    except (ValueError, TypeError):
-                        continue
-            if prices:
-                price_series[ticker] = prices
-
-        if len(price_series) < 2:
-            continue
-
-        all_ts = set()
-        for ps in price_series.values():
-            all_ts.update(ps.keys())
-
-        snapshots = []
-        for ts in sorted(all_ts):
-            cdf_points = []
-            for ticker, strike in tickers_and_strikes:
-                if ticker in price_series and ts in price_series[ticker]:
-                    cdf_points.append((strike, price_series[ticker][ts]))
-            if len(cdf_points) >= 2:
-                cdf_points.sort(key=lambda x: x[0])
-                snapshots.append({
-                    "strikes": [p[0] for p in cdf_points],
-                    "cdf_values": [p[1] for p in cdf_points],
-                })
-
-        if len(snapshots) < 2:
-            continue
-
-        mid_snap = snapshots[len(snapshots) // 2]
-        strikes = mid_snap["strikes"]
-        cdf_vals = mid_snap["cdf_values"]
-
-        survival = np.interp(realized, strikes, cdf_vals)
-        pit = 1.0 - survival
-        pit_values.append(float(pit))
-        print(f"    {event_ticker}: PIT={pit:.3f}")
-
-    return pit_values
+            tickers_and_strikes.append((ticker, strike))
+            candles_by_ticker[ticker] = candles
+
+        if len(tickers_and_strikes) >= 2:
+            event_prices = align_candle_prices(tickers_and_strikes, candles_by_ticker)
+            if event_prices is not None:
+                aligned[event_ticker] = event_prices
+
+    table = build_pit_table(events_df[["event_ticker", "realized"]], aligned_prices=aligned)
+    for row in table.itertuples():
+        print(f"    {row.event_ticker}: PIT={row.pit:.3f}")
+    return [float(p) for p in table["pit"]]
 
 gdp_events_df = orig_df[orig_df["canonical_series"] == "GDP"]
 fed_events_df = orig_df[orig_df["canonical_series"] == "FED"]
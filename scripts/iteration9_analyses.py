@@ -11,10 +11,12 @@ import json
 import numpy as np
 import pandas as pd
 from scipy import stats
-import glob as glob_module
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from kalshi.candle_manifest import load_manifest
+from experiment12.distributional_calibration import align_candle_prices, build_pit_table
+
 OUTPUT_DIR = "data/iteration9"
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
@@ -168,30 +170,40 @@ def extract_strike_from_ticker(ticker):
     return None
 
 
-def compute_pit_from_exp2_candles(event_ticker, realized):
-    """Compute PIT from exp2 candle files (CPI, GDP, FED, JC)."""
-    event_candle_files = glob_module.glob(os.path.join(exp2_candles_dir, f"{event_ticker}*_60.json"))
-    if not event_candle_files:
-        return None
-
+def exp2_event_candles(event_ticker):
+    """(tickers_and_strikes, candles_by_ticker) for an event in the exp2 candle cache."""
+    manifest = load_manifest(exp2_candles_dir)
     tickers_and_strikes = []
     candles_by_ticker = {}
 
-    for candle_file in event_candle_files:
-        basename = os.path.basename(candle_file).replace("_60.json", "")
-        strike = extract_strike_from_ticker(basename)
+    for ticker in manifest.tickers_for_event(event_ticker):
+        strike = extract_strike_from_ticker(ticker)
         if strike is None:
             continue
 
-        with open(candle_file) as f:
+        with open(manifest.path(ticker)) as f:
             candles = json.load(f)
         if not candles:
             continue
 
-        tickers_and_strikes.append((basename, strike))
-        candles_by_ticker[basename] = candles
+        tickers_and_strikes.append((ticker, strike))
+        candles_by_ticker[ticker] = candles
+
+    return tickers_and_strikes, candles_by_ticker
 
-    return _compute_pit_from_candle_data(tickers_and_strikes, candles_by_ticker, realized)
+
+def compute_pits_from_exp2_candles(events_df):
+    """Mid-life PIT for every event in events_df from exp2 candle files (CPI, GDP, FED, JC).
+
+    Returns build_pit_table()'s table: events_df's columns plus pit, for the
+    events with usable candles.
+    """
+    aligned = {}
+    for event_ticker in events_df["event_ticker"].unique():
+        event_prices = _align_event_candles(*exp2_event_candles(event_ticker))
+        if event_prices is not None:
+            aligned[event_ticker] = event_prices
+    return build_pit_table(events_df, aligned_prices=aligned, clip=True)
 
 
 def compute_pit_from_new_series_candles(event_ticker, series_key, realized):
@@ -243,78 +255,23 @@ def compute_pit_from_new_series_candles(event_ticker, series_key, realized):
     return _compute_pit_from_candle_data(tickers_and_strikes, candles_by_ticker, realized)
 
 
-def _compute_pit_from_candle_data(tickers_and_strikes, candles_by_ticker, realized):
-    """Core PIT computation from candle data."""
+def _align_event_candles(tickers_and_strikes, candles_by_ticker):
     if len(tickers_and_strikes) < 2:
         return None
+    return align_candle_prices(tickers_and_strikes, candles_by_ticker)
 
-    tickers_and_strikes.sort(key=lambda x: x[1])
-
-    price_series = {}
-    for ticker, strike in tickers_and_strikes:
-        candles = candles_by_ticker[ticker]
-        prices = {}
-        for c in candles:
-            ts = c.get("end_period_ts") or c.get("period_start")
-            if not ts:
-                continue
-            close_price = None
-            yes_price = c.get("yes_price", {})
-            if isinstance(yes_price, dict) and yes_price.get("close") is not None:
-                close_price = yes_price["close"]
-            if close_price is None:
-                price_obj = c.get("price", {})
-                if isinstance(price_obj, dict) and price_obj.get("close") is not None:
-                    close_price = price_obj["close"]
-            if close_price is None:
-                yes_bid = c.get("yes_bid", {})
-                yes_ask = c.get("yes_ask", {})
-                bid_close = yes_bid.get("close") if isinstance(yes_bid, dict) else None
-                ask_close = yes_ask.get("close") if isinstance(yes_ask, dict) else None
-                if bid_close is not None and ask_close is not None:
-                    close_price = (float(bid_close) + float(ask_close)) / 2.0
-                elif bid_close is not None:
-                    close_price = float(bid_close)
-                elif ask_close is not None:
-                    close_price = float(ask_close)
-            if close_price is not None:
-                try:
-                    prices[ts] = float(close_price) / 100.0
-                except (ValueError, TypeError):
-                    continue
-        if prices:
-            price_series[ticker] = prices
-
-    if len(price_series) < 2:
-        return None
-
-    all_ts = set()
-    for ps in price_series.values():
-        all_ts.update(ps.keys())
-
-    snapshots = []
-    for ts in sorted(all_ts):
-        cdf_points = []
-        for ticker, strike in tickers_and_strikes:
-            if ticker in price_series and ts in price_series[ticker]:
-                cdf_points.append((strike, price_series[ticker][ts]))
-        if len(cdf_points) >= 2:
-            cdf_points.sort(key=lambda x: x[0])
-            snapshots.append({
-                "strikes": [p[0] for p in cdf_points],
-                "cdf_values": [p[1] for p in cdf_points],
-            })
 
-    if len(snapshots) < 2:
+def _compute_pit_from_candle_data(tickers_and_strikes, candles_by_ticker, realized):
+    """Core PIT computation from candle data (mid-life snapshot)."""
+    event_prices = _align_event_candles(tickers_and_strikes, candles_by_ticker)
+    if event_prices is None:
         return None
-
-    mid_snap = snapshots[len(snapshots) // 2]
-    strikes = mid_snap["strikes"]
-    cdf_vals = mid_snap["cdf_values"]
-
-    survival = np.interp(realized, strikes, cdf_vals)
-    pit = 1.0 - survival
-    return float(np.clip(pit, 0, 1))
+    table = build_pit_table(
+        pd.DataFrame([{"event_ticker": "event", "realized": realized}]),
+        aligned_prices={"event": event_prices},
+        clip=True,
+    )
+    return float(table["pit"].iloc[0]) if len(table) else None
 
 
 # ============================================================
@@ -419,20 +376,18 @@ for series_key in series_canonical_map.keys():
 # For original CPI/GDP/FED/JC: compute PIT from exp2 candles
 print("\n--- Computing PIT from candles for CPI/GDP/FED/JC ---")
 
-for _, row in orig_df.iterrows():
-    if row["mae_interior"] <= 0 or pd.isna(row["kalshi_crps"]):
-        continue
-    pit = compute_pit_from_exp2_candles(row["event_ticker"], row["realized"])
-    if pit is not None:
-        matched_events.append({
-            "event_ticker": row["event_ticker"],
-            "canonical_series": row["canonical_series"],
-            "pit": pit,
-            "pit_deviation": abs(pit - 0.5),
-            "crps_mae_ratio": row["kalshi_crps"] / row["mae_interior"],
-            "kalshi_crps": row["kalshi_crps"],
-            "mae_interior": row["mae_interior"],
-        })
+eligible = orig_df[~((orig_df["mae_interior"] <= 0) | orig_df["kalshi_crps"].isna())]
+for _, row in compute_pits_from_exp2_candles(eligible).iterrows():
+    pit = row["pit"]
+    matched_events.append({
+        "event_ticker": row["event_ticker"],
+        "canonical_series": row["canonical_series"],
+        "pit": pit,
+        "pit_deviation": abs(pit - 0.5),
+        "crps_mae_ratio": row["kalshi_crps"] / row["mae_interior"],
+        "kalshi_crps": row["kalshi_crps"],
+        "mae_interior": row["mae_interior"],
+    })
 
 # Add KXCPI and KXJOBLESSCLAIMS from exp13 with their PIT values
 for series_key in ["KXCPI", "KXJOBLESSCLAIMS"]:
@@ -4,133 +4,207 @@ Monte Carlo simulation: How much does CRPS inflate when you have fewer strikes?
 Takes known distributions (Normal, Uniform, Skew-Normal), constructs
 piecewise-linear CDFs with 2, 3, 4, and 5 strikes at realistic spacing,
 computes CRPS against the same realized outcomes, and reports the inflation.
+
+All realizations for a scenario are drawn at once and scored with a
+vectorized kernel (prefix integrals over the CDF's segments plus a binary
+search per realization), so 1M-trial runs take seconds. run_grid() sweeps
+distribution family x strike spacing x strike count x trial count:
+
+    uv run python scripts/strike_count_simulation.py --trials 1000000
+    uv run python scripts/strike_count_simulation.py --grid --grid-trials 10000 1000000
 """
+import os
+import sys
+import argparse
 import numpy as np
+import pandas as pd
 from scipy import stats
 
-def crps_piecewise_linear(strikes, cdf_values, realized):
-    """Compute CRPS for a piecewise-linear CDF defined by (strikes, cdf_values).
-
-    CDF = 0 below min strike, 1 above max strike, linear interpolation between.
-    CRPS = integral of (F(x) - 1[x >= realized])^2 dx
-    """
-    # Build extended points: (-inf side, strikes, +inf side)
-    # We integrate from a lower bound to an upper bound
-    # For numerical purposes, extend domain
-    lower = min(strikes[0], realized) - abs(realized - strikes[0]) - 10
-    upper = max(strikes[-1], realized) + abs(realized - strikes[-1]) + 10
-
-    # Build breakpoints
-    breakpoints = sorted(set([lower, upper, realized] + list(strikes)))
-
-    total = 0.0
-    for i in range(len(breakpoints) - 1):
-        a, b = breakpoints[i], breakpoints[i+1]
-        if a >= b:
-            continue
-
-        # F(x) at endpoints
-        def F(x):
-            if x <= strikes[0]:
-                return 0.0
-            elif x >= strikes[-1]:
-                return 1.0
-            else:
-                # Linear interpolation
-                idx = np.searchsorted(strikes, x, side='right') - 1
-                idx = max(0, min(idx, len(strikes) - 2))
-                t = (x - strikes[idx]) / (strikes[idx+1] - strikes[idx])
-                return cdf_values[idx] + t * (cdf_values[idx+1] - cdf_values[idx])
-
-        fa, fb = F(a), F(b)
-
-        # Heaviside: H(x) = 1 if x >= realized, else 0
-        if b <= realized:
-            # Below realized: integrand = F(x)^2
-            # F is linear on [a,b]: F(x) = fa + (fb-fa)/(b-a) * (x-a)
-            # integral of (fa + slope*(x-a))^2 dx from a to b
-            h = b - a
-            total += h * (fa**2 + fa*(fb-fa) + (fb-fa)**2/3)
-        elif a >= realized:
-            # Above realized: integrand = (F(x) - 1)^2
-            ga, gb = fa - 1, fb - 1
-            h = b - a
-            total += h * (ga**2 + ga*(gb-ga) + (gb-ga)**2/3)
-        else:
-            # Straddles realized: split at realized
-            # Below part [a, realized]
-            t = (realized - a) / (b - a)
-            fr = fa + t * (fb - fa)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-            h1 = realized - a
-            if h1 > 0:
-                total += h1 * (fa**2 + fa*(fr-fa) + (fr-fa)**2/3)
+from experiment12.distributional_calibration import (
+    compute_normal_crps,
+    compute_skew_normal_crps,
+    compute_uniform_crps,
+)
 
-            # Above part [realized, b]
-            gr, gb2 = fr - 1, fb - 1
-            h2 = b - realized
-            if h2 > 0:
-                total += h2 * (gr**2 + gr*(gb2-gr) + (gb2-gr)**2/3)
+STRIKE_COUNTS = [2, 3, 4, 5, 7, 10]
+SPACINGS = ["uniform", "clustered"]
+DISTRIBUTIONS = ["normal", "uniform", "skewnormal"]
 
-    return total
 
+def crps_piecewise_linear(strikes, cdf_values, realized):
+    """Compute CRPS for a piecewise-linear CDF defined by (strikes, cdf_values).
 
-def _run_scenario(scenario_name, params, rng, n_trials):
-    """Run one distribution scenario across varying strike counts."""
-    mu, sigma = params['mu'], params['sigma']
-    lo, hi = params['strike_range']
-    dist_type = params.get('distribution', 'normal')
+    CDF = 0 below min strike, 1 above max strike, linear interpolation between.
+    CRPS = integral of (F(x) - 1[x >= realized])^2 dx
 
-    # Generate realized values from the true distribution
+    realized may be a scalar or an array; every value is scored against the
+    same CDF. Segment integrals of F^2 and (1 - F)^2 are accumulated once,
+    so each realization only needs its segment (binary search) and the
+    partial integrals on either side of it.
+    """
+    strikes = np.asarray(strikes, dtype=float)
+    f = np.asarray(cdf_values, dtype=float)
+    y = np.asarray(realized, dtype=float)
+
+    # Integral of F^2 and (1 - F)^2 over each segment (F linear on each)
+    h = np.diff(strikes)
+    f0, f1 = f[:-1], f[1:]
+    g0, g1 = 1.0 - f0, 1.0 - f1
+    below = h * (f0 * f0 + f0 * f1 + f1 * f1) / 3.0
+    above = h * (g0 * g0 + g0 * g1 + g1 * g1) / 3.0
+    below_cum = np.concatenate([[0.0], np.cumsum(below)])              # int_{s0}^{s_k} F^2
+    above_cum = np.concatenate([np.cumsum(above[::-1])[::-1], [0.0]])  # int_{s_k}^{s_last} (1-F)^2
+
+    # Segment holding each realization (tails clamp to the end segments)
+    yc = np.clip(y, strikes[0], strikes[-1])
+    k = np.clip(np.searchsorted(strikes, yc, side="right") - 1, 0, len(strikes) - 2)
+    a, b = strikes[k], strikes[k + 1]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        t = np.where(b > a, (yc - a) / (b - a), 0.0)
+    fy = f0[k] + (f1[k] - f0[k]) * t
+    gy = 1.0 - fy
+
+    crps = (
+        below_cum[k] + (yc - a) * (f0[k] * f0[k] + f0[k] * fy + fy * fy) / 3.0
+        + above_cum[k + 1] + (b - yc) * (gy * gy + gy * g1[k] + g1[k] * g1[k]) / 3.0
+        # Tails: F = 0 below the first strike and 1 above the last, so the
+        # integrand is 1 between y and the strike range when y falls outside it
+        + np.maximum(strikes[0] - y, 0.0) + np.maximum(y - strikes[-1], 0.0)
+    )
+    return float(crps) if crps.ndim == 0 else crps
+
+
+def _distribution(dist_type, mu, sigma, skew_alpha=4):
+    """(sample(rng, n), cdf(x), exact_crps(y)) for one distribution family."""
     if dist_type == 'normal':
-        realized_values = rng.normal(mu, sigma, n_trials)
-        cdf_func = lambda x: stats.norm.cdf(x, mu, sigma)
-    elif dist_type == 'uniform':
+        return (
+            lambda rng, n: rng.normal(mu, sigma, n),
+            lambda x: stats.norm.cdf(x, mu, sigma),
+            lambda y: compute_normal_crps(mu, sigma, y),
+        )
+    if dist_type == 'uniform':
         a_unif = mu - sigma * np.sqrt(3)  # match mean and std
         b_unif = mu + sigma * np.sqrt(3)
-        realized_values = rng.uniform(a_unif, b_unif, n_trials)
-        cdf_func = lambda x: stats.uniform.cdf(x, loc=a_unif, scale=b_unif - a_unif)
-    elif dist_type == 'skewnormal':
-        skew_alpha = params.get('skew_alpha', 4)  # positive skew
+        return (
+            lambda rng, n: rng.uniform(a_unif, b_unif, n),
+            lambda x: stats.uniform.cdf(x, loc=a_unif, scale=b_unif - a_unif),
+            lambda y: compute_uniform_crps(a_unif, b_unif, y),
+        )
+    if dist_type == 'skewnormal':
         # scipy skewnorm: loc, scale, a (shape)
-        realized_values = stats.skewnorm.rvs(skew_alpha, loc=mu, scale=sigma, size=n_trials, random_state=rng)
-        cdf_func = lambda x: stats.skewnorm.cdf(x, skew_alpha, loc=mu, scale=sigma)
-    else:
-        raise ValueError(f"Unknown distribution: {dist_type}")
-
-    crps_by_nstrikes = {}
+        return (
+            lambda rng, n: stats.skewnorm.rvs(skew_alpha, loc=mu, scale=sigma, size=n, random_state=rng),
+            lambda x: stats.skewnorm.cdf(x, skew_alpha, loc=mu, scale=sigma),
+            lambda y: compute_skew_normal_crps(mu, sigma, skew_alpha, y),
+        )
+    raise ValueError(f"Unknown distribution: {dist_type}")
+
+
+def _place_strikes(lo, hi, n_strikes, spacing, mu):
+    strikes = np.linspace(lo, hi, n_strikes)
+    if spacing == 'uniform':
+        return strikes
+    if spacing == 'clustered':
+        # Clustered near mean (realistic for Jobless Claims)
+        return np.sort(mu + (strikes - mu) * 0.7)
+    raise ValueError(f"Unknown spacing: {spacing}")
+
+
+def _run_scenario(scenario_name, params, rng, n_trials, strike_counts=STRIKE_COUNTS):
+    """Run one distribution scenario across varying strike counts.
+
+    Returns mean CRPS per strike count, the 100-strike approximation
+    ('true_approx') and the closed-form CRPS of the true distribution
+    ('exact'), all over the same realized values.
+    """
+    mu, sigma = params['mu'], params['sigma']
+    lo, hi = params['strike_range']
+    sample, cdf_func, exact_crps = _distribution(
+        params.get('distribution', 'normal'), mu, sigma, params.get('skew_alpha', 4)
+    )
 
-    for n_strikes in [2, 3, 4, 5, 7, 10]:
-        if params['spacing'] == 'uniform':
-            strikes = np.linspace(lo, hi, n_strikes)
-        else:
-            # Clustered near mean (realistic for Jobless Claims)
-            strikes = np.linspace(lo, hi, n_strikes)
-            strikes = mu + (strikes - mu) * 0.7  # Slight clustering
-            strikes = np.sort(strikes)
+    # Generate realized values from the true distribution
+    realized_values = sample(rng, n_trials)
 
+    crps_by_nstrikes = {}
+    for n_strikes in strike_counts:
+        strikes = _place_strikes(lo, hi, n_strikes, params['spacing'], mu)
         # True CDF values at these strikes
-        cdf_values = cdf_func(strikes)
-
-        crps_vals = []
-        for realized in realized_values:
-            c = crps_piecewise_linear(strikes, cdf_values, realized)
-            crps_vals.append(c)
-
-        crps_by_nstrikes[n_strikes] = np.mean(crps_vals)
+        crps_by_nstrikes[n_strikes] = np.mean(
+            crps_piecewise_linear(strikes, cdf_func(strikes), realized_values)
+        )
 
     # Also compute "true" CRPS (many strikes = good approximation)
     many_strikes = np.linspace(lo - 2*sigma, hi + 2*sigma, 100)
-    many_cdf = cdf_func(many_strikes)
-    crps_true = []
-    for realized in realized_values:
-        c = crps_piecewise_linear(many_strikes, many_cdf, realized)
-        crps_true.append(c)
-    crps_by_nstrikes['true_approx'] = np.mean(crps_true)
+    crps_by_nstrikes['true_approx'] = np.mean(
+        crps_piecewise_linear(many_strikes, cdf_func(many_strikes), realized_values)
+    )
+    crps_by_nstrikes['exact'] = np.mean(exact_crps(realized_values))
 
     return crps_by_nstrikes
 
 
+def run_grid(
+    base_scenarios=None,
+    distributions=DISTRIBUTIONS,
+    spacings=SPACINGS,
+    strike_counts=STRIKE_COUNTS,
+    trial_counts=(10000,),
+    seed=42,
+    skew_alpha=4,
+):
+    """Sweep distribution family x spacing x strike count x trial count.
+
+    Args:
+        base_scenarios: {name: {mu, sigma, strike_range}}; defaults to the
+            CPI-like and JC-like settings used by run_simulation()
+        distributions: Families to simulate ('normal', 'uniform', 'skewnormal')
+        spacings: Strike placement schemes ('uniform', 'clustered')
+        strike_counts: Numbers of strikes per CDF
+        trial_counts: Numbers of realizations per cell
+        seed: Seed for the shared RandomState (cells are drawn in grid order)
+        skew_alpha: Shape parameter for the skew-normal family
+
+    Returns:
+        DataFrame with one row per (scenario, distribution, spacing, n_trials,
+        n_strikes): mean CRPS, its standard error, the closed-form CRPS of
+        the true distribution and the inflation over it
+    """
+    if base_scenarios is None:
+        base_scenarios = {
+            'CPI-like': {'mu': 0.3, 'sigma': 0.1, 'strike_range': (0.1, 0.5)},
+            'JC-like': {'mu': 225, 'sigma': 8, 'strike_range': (205, 245)},
+        }
+    rng = np.random.RandomState(seed)
+    rows = []
+    for scenario, base in base_scenarios.items():
+        mu, sigma = base['mu'], base['sigma']
+        lo, hi = base['strike_range']
+        for dist_type in distributions:
+            sample, cdf_func, exact_crps = _distribution(dist_type, mu, sigma, skew_alpha)
+            for n_trials in trial_counts:
+                realized_values = sample(rng, n_trials)
+                exact = np.mean(exact_crps(realized_values))
+                for spacing in spacings:
+                    for n_strikes in strike_counts:
+                        strikes = _place_strikes(lo, hi, n_strikes, spacing, mu)
+                        crps = crps_piecewise_linear(strikes, cdf_func(strikes), realized_values)
+                        rows.append({
+                            'scenario': scenario,
+                            'distribution': dist_type,
+                            'spacing': spacing,
+                            'n_trials': n_trials,
+                            'n_strikes': n_strikes,
+                            'crps': crps.mean(),
+                            'crps_se': crps.std(ddof=1) / np.sqrt(n_trials),
+                            'exact_crps': exact,
+                            'inflation_pct': (crps.mean() / exact - 1) * 100,
+                        })
+    return pd.DataFrame(rows)
+
+
 def run_simulation(n_trials=10000, seed=42):
     """Run Monte Carlo: known distributions (Normal, Uniform, Skew-Normal), varying strike counts."""
     rng = np.random.RandomState(seed)
@@ -179,6 +253,7 @@ def run_simulation(n_trials=10000, seed=42):
         true_crps = crps_dict['true_approx']
         print(f"\n--- {scenario_name} ---")
         print(f"  True CRPS (100-strike approx): {true_crps:.6f}")
+        print(f"  Exact CRPS (closed form):      {crps_dict['exact']:.6f}")
         print(f"  {'Strikes':<10} {'CRPS':<12} {'Inflation vs True':<20} {'Inflation 2→N':<20}")
 
         crps_2 = crps_dict[2]
@@ -227,5 +302,27 @@ def run_simulation(n_trials=10000, seed=42):
     print(f"  Conclusion: strike-count confound accounts for <5% of the 32% penalty")
     print(f"  regardless of distributional assumption.")
 
+def main():
+    parser = argparse.ArgumentParser(description="CRPS inflation from coarse strike grids")
+    parser.add_argument("--trials", type=int, default=10000, help="Realizations per scenario")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--grid", action="store_true",
+                        help="Sweep family x spacing x strike count x trial count instead")
+    parser.add_argument("--grid-trials", type=int, nargs="+", default=[10000],
+                        help="Trial counts for --grid")
+    parser.add_argument("--output", help="CSV path for --grid results")
+    args = parser.parse_args()
+
+    if args.grid:
+        grid = run_grid(trial_counts=args.grid_trials, seed=args.seed)
+        with pd.option_context("display.max_rows", None, "display.width", 120):
+            print(grid.to_string(index=False, float_format=lambda v: f"{v:.6f}"))
+        if args.output:
+            grid.to_csv(args.output, index=False)
+            print(f"\nSaved {len(grid)} rows to {args.output}")
+    else:
+        run_simulation(n_trials=args.trials, seed=args.seed)
+
+
 if __name__ == '__main__':
-    run_simulation()
+    main()